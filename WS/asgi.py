@@ -9,16 +9,31 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 import django
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
-import motiontrack.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'WS.settings')
 django.setup()
+http_application = get_asgi_application()
+
+# 앱 로딩이 끝난 뒤 consumer를 import합니다. (모델은 import 시 로드되지 않음)
+import motiontrack.routing  # noqa: E402
+from dnn import model_loader  # noqa: E402
+from motiontrack.inference import INFERENCE_MODE  # noqa: E402
+
+# "remote" 모드에서는 추론 워커(manage.py inference_worker)가 모델을 로드하므로 여기서는 하지 않습니다.
+if INFERENCE_MODE == "local":
+    # 워커가 바로 연결을 받을 수 있도록 모델 로드와 더미 배치 추론은 백그라운드에서 진행 (/ready/로 완료 확인)
+    if getattr(settings, "POSE_WARMUP_ON_BOOT", True):
+        model_loader.start_warm_up()
+    # 활성 모델 버전이 바뀌면 재시작 없이 새 모델로 교체 (진행 중인 프레임은 이전 모델로 마무리)
+    if model_loader.REGISTRY_DIR and model_loader.RELOAD_INTERVAL > 0:
+        model_loader.start_reload_watcher()
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": http_application,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             motiontrack.routing.websocket_urlpatterns
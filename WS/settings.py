@@ -38,7 +38,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoiseMiddleware의 async 지원판 (동기 전용 미들웨어가 있으면 async 뷰도 스레드에서 실행됨)
+    "motiontrack.middleware.AsyncWhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,12 +93,27 @@ DATABASES = {
 """
 
 
+# Redis 노드 목록 (쉼표로 구분, 예: "redis://10.0.0.1:6379/0,redis://10.0.0.2:6379/0")
+# 노드가 여러 개이면 캐시(세션 상태) 키는 consistent hashing으로, channel layer는 채널 이름의 해시로 노드에 나눔
+REDIS_HOSTS = [url.strip() for url in os.getenv(
+    'REDIS_HOSTS', os.getenv('REDIS_LOCATION', "redis://127.0.0.1:6379/0")).split(",") if url.strip()]
+# channel layer만 다른 노드를 쓰려면 CHANNEL_REDIS_HOSTS (기본: REDIS_HOSTS)
+CHANNEL_REDIS_HOSTS = [url.strip() for url in os.getenv('CHANNEL_REDIS_HOSTS', ",".join(REDIS_HOSTS)).split(",")
+                       if url.strip()]
+# 워커 프로세스 하나가 노드마다 여는 최대 연결 수 (워커 수 × 노드별 풀 크기가 Redis maxclients를 넘지 않게)
+REDIS_POOL_SIZE = int(os.getenv('REDIS_POOL_SIZE', "32"))
+
 # Redis 캐시 (테스트용)
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": os.getenv('REDIS_LOCATION', "redis://127.0.0.1:6379/0"),
-        "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        "LOCATION": REDIS_HOSTS if len(REDIS_HOSTS) > 1 else REDIS_HOSTS[0],
+        "OPTIONS": {
+            # 여러 노드: 키별 consistent hashing + 노드별 pipeline (motiontrack/redis_shards.py)
+            "CLIENT_CLASS": ("motiontrack.redis_shards.PipelinedShardClient" if len(REDIS_HOSTS) > 1
+                             else "django_redis.client.DefaultClient"),
+            "CONNECTION_POOL_KWARGS": {"max_connections": REDIS_POOL_SIZE},
+        },
     }
 }
 
@@ -105,7 +121,7 @@ CACHES = {
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {"hosts": [("127.0.0.1", 6379)]},
+        "CONFIG": {"hosts": [{"address": url, "max_connections": REDIS_POOL_SIZE} for url in CHANNEL_REDIS_HOSTS]},
     },
 }
 
@@ -124,6 +140,87 @@ CHANNEL_LAYERS = {
 }
 """
 
+# 자세 추론 (WebSocket)
+# True: AsyncPoseConsumer (모든 연결의 프레임을 묶어 배치 추론), False: 동기 PoseConsumer
+POSE_ASYNC_CONSUMER = True
+# 추론 백엔드: "numpy" (BatchNorm을 접은 pose_model.npz, TensorFlow 불필요) 또는 "keras" (pose_model.h5)
+POSE_INFERENCE_BACKEND = os.getenv('POSE_INFERENCE_BACKEND', "numpy")
+# True이면 ASGI 워커 부팅 시 백그라운드에서 모델 로드 + 더미 배치 추론 (완료 전까지 /ready/는 503)
+POSE_WARMUP_ON_BOOT = True
+# 버전별 모델 저장소 (manage.py pose_model로 등록·승격·롤백). 활성 버전이 없으면 dnn/model의 파일을 사용
+POSE_MODEL_REGISTRY_DIR = BASE_DIR / "dnn" / "registry"
+# 워커가 활성 버전을 확인하는 주기(초). 바뀌면 백그라운드에서 로드·워밍업 후 교체 (0이면 감시하지 않음)
+POSE_MODEL_RELOAD_INTERVAL = 5.0
+# "local": WebSocket 워커 안에서 추론 / "remote": 배치를 channel layer(POSE_INFERENCE_CHANNEL)로
+#   manage.py inference_worker 프로세스 풀에 보내고 응답을 기다림 (WebSocket 워커는 모델을 로드하지 않음)
+POSE_INFERENCE_MODE = os.getenv('POSE_INFERENCE_MODE', "local")
+POSE_INFERENCE_CHANNEL = "pose-inference"
+# 원격 배치 응답 대기 시간(초)과 WebSocket 워커 프로세스당 동시에 보낼 수 있는 배치 수
+POSE_INFERENCE_TIMEOUT = 2.0
+POSE_INFERENCE_MAX_IN_FLIGHT = 8
+# 클라이언트 특징 모드: 브라우저가 63차원 특징을 계산해 보내면 서버는 모양·유한값·스키마 버전만 확인하고,
+# POSE_CLIENT_FEATURES_SAMPLE_RATE 비율의 프레임만 서버 추출기와 비교 (오차가 POSE_CLIENT_FEATURES_TOLERANCE를 넘으면 그 연결은 서버에서 계산)
+POSE_CLIENT_FEATURES = True
+POSE_CLIENT_FEATURES_SAMPLE_RATE = 0.05
+POSE_CLIENT_FEATURES_TOLERANCE = 1e-2
+# 자세 유지 중 예측 재사용: 정규화 좌표 변화가 POSE_PREDICTION_CACHE_TOLERANCE 미만이면 직전 예측 사용 (0이면 끔),
+# 그래도 POSE_PREDICTION_CACHE_MAX_AGE(초)마다 한 번은 실제로 추론
+POSE_PREDICTION_CACHE_TOLERANCE = 0.02
+POSE_PREDICTION_CACHE_MAX_AGE = 0.5
+# 예측 평활 필터: "ema" | "one_euro" | "hysteresis" (옵션 예: {"min_cutoff": 1.0, "beta": 0.5} / {"min_dwell": 0.3})
+# 모든 연결의 평활 상태는 슬롯 배열에 모아 두며 POSE_SMOOTHING_CAPACITY개에서 시작해 필요하면 두 배씩 늘림
+POSE_SMOOTHING_FILTER = "ema"
+POSE_SMOOTHING_OPTIONS = {}
+POSE_SMOOTHING_CAPACITY = 256
+# 배치 최대 크기와 첫 프레임 이후 최대 대기 시간(ms)
+POSE_BATCH_MAX_SIZE = 64
+POSE_BATCH_MAX_WAIT_MS = 5
+# 목표 자세 유지 중 프레임 기록 링 버퍼 용량(프레임)과 Redis 플러시 주기(초)
+POSE_BUFFER_CAPACITY = 180
+POSE_BUFFER_FLUSH_INTERVAL = 1.0
+# 서버가 허용하는 클라이언트 프레임 전송률(fps)과 감속 기준
+# 처리 지연(EMA)이 POSE_LATENCY_HIGH_MS를 넘거나 버려진 프레임 비율이 POSE_DROP_RATIO_HIGH를 넘으면
+# 클라이언트에 더 낮은 max_fps를 보내고, 여유가 생기면 POSE_MAX_FPS까지 다시 올립니다.
+POSE_MAX_FPS = 20
+POSE_MIN_FPS = 5
+POSE_LATENCY_HIGH_MS = 100
+POSE_DROP_RATIO_HIGH = 0.25
+# True이면 연결 시 바이너리 랜드마크 프레임(motiontrack/protocol.py)을 알리고, 클라이언트는 JSON 대신 이를 사용
+POSE_BINARY_FRAMES = True
+# 연결별 게임 상태 저장소
+#   "hybrid": 프로세스 메모리가 기준, Redis(CACHES)에는 POSE_STATE_FLUSH_INTERVAL마다 모아서 비동기 반영
+#   "cache": 매 프레임 Redis에 바로 쓰기, "memory": 프로세스 메모리만 사용 (재연결/재시작 시 복구 불가)
+POSE_STATE_BACKEND = "hybrid"
+POSE_STATE_FLUSH_INTERVAL = 0.2
+# 연결이 끊긴 뒤 같은 세션 토큰으로 재연결하면 상태를 복구할 수 있는 시간(초)
+POSE_STATE_RECONNECT_TTL = 60
+# 연결 중인 세션 상태 키의 만료 시간(초, 쓸 때마다 연장). 워커가 죽어도 상태 키가 Redis에 영구히 남지 않음
+POSE_STATE_TTL = 300
+# 이 시간(초) 동안 메시지가 없는 연결에는 ping을 보내고, POSE_IDLE_TIMEOUT 동안 프레임도 pong도 없으면 서버가 닫음
+POSE_HEARTBEAT_INTERVAL = 15.0
+POSE_IDLE_TIMEOUT = 45.0
+# 동시 게임 수 상한 (None이면 제한 없음). 워커당 상한은 manage.py bench_admission이 찾은 지속 가능 세션 수,
+# 클러스터 상한(POSE_MAX_SESSIONS)은 그 × 워커 수를 기준으로 잡고, 넘는 연결은 대기실(FIFO)에서 순번을 받으며 기다림
+POSE_MAX_SESSIONS_PER_WORKER = int(os.getenv('POSE_MAX_SESSIONS_PER_WORKER', 200))
+POSE_MAX_SESSIONS = int(os.environ['POSE_MAX_SESSIONS']) if os.getenv('POSE_MAX_SESSIONS') else None
+# 클러스터 자리 키(Redis)의 만료 시간(초)과 다른 워커에서 난 자리를 확인하는 주기(초), 대기실 최대 인원
+POSE_ADMISSION_LEASE_TTL = 30
+POSE_ADMISSION_POLL_INTERVAL = 1.0
+POSE_WAITING_ROOM_SIZE = 1000
+# True이면 프레임 처리 단계별 시간과 연결/프레임 카운터를 수집해 /metrics/에 Prometheus 형식으로 노출
+# False이면 계측 코드가 프레임 처리 경로에서 완전히 빠지고 /metrics/는 404를 반환
+POSE_METRICS_ENABLED = True
+
+# 점수 저장 (/submit_score/)
+# "buffered": 로컬 스풀(POSE_SCORE_SPOOL_DIR)에 쓰고 바로 응답, POSE_SCORE_BATCH_SIZE개 또는
+#             POSE_SCORE_FLUSH_INTERVAL(초)마다 모아서 bulk_create / "sync": 요청마다 바로 DB에 저장
+POSE_SCORE_INGEST = "buffered"
+POSE_SCORE_BATCH_SIZE = 200
+POSE_SCORE_FLUSH_INTERVAL = 0.5
+POSE_SCORE_SPOOL_DIR = BASE_DIR / "spool" / "scores"
+# 리더보드에 캐시해 두는 기간별 상위 점수 개수
+POSE_LEADERBOARD_SIZE = 10
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -152,7 +249,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    # collectstatic이 빌드 단계: posemodule ES 모듈 번들·최소화, 내용 해시 이름, gzip/brotli 사본 (motiontrack/static_assets.py)
+    # 해시 이름의 파일은 whitenoise가 immutable 캐시 헤더로 서빙
+    "staticfiles": {"BACKEND": "motiontrack.static_assets.PoseStaticFilesStorage"},
+}
+# {번들 이름: 진입 ES 모듈}. pose.html은 번들이 있으면 해시 이름의 번들 하나만 불러옴
+POSE_STATIC_BUNDLES = {
+    "js/pose.bundle.js": "js/posemodule/main.js",
+    "js/pose3d.bundle.js": "js/posemodule/main3d.js",
+}
+POSE_STATIC_MINIFY = True
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
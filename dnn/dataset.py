@@ -0,0 +1,259 @@
+"""
+학습 데이터 빌더: data/train/<label>/*.jpg → 13개 관절 랜드마크 → 63차원 특징 CSV
+
+- 이미지를 프로세스 풀에 나누어 처리하며, 워커마다 랜드마크 추출기(MediaPipe Pose)를 하나씩 만듭니다.
+- 추출한 원본 랜드마크는 (이미지 내용 해시, 추출기 설정)을 키로 캐시하므로,
+  다시 실행하면 새로 추가되었거나 바뀐 이미지만 추출합니다. (감지 실패도 캐시)
+- 결과는 처리되는 대로 임시 파일에 한 줄씩 쓰고, 끝나면 출력 파일로 교체합니다.
+- 학습용으로는 열 단위 바이너리 형식(output_dir)을 함께 씁니다:
+    features.npy  float32 (N, 63)   — np.load(mmap_mode="r")로 복사 없이 읽음
+    labels.npy    int16 (N,)        — manifest의 label_names 인덱스
+    manifest.json 행 수, label_names, 특징 스키마 (feature_names, landmark_indices, torso_size_multiplier)
+- 추출기는 "모듈:클래스" 문자열로 바꿀 수 있습니다. (테스트에서는 MediaPipe 없이 스텁 사용)
+  추출기 클래스는 __init__(**options), extract(image_bytes) → (13, 3) 배열 또는 None, close()를 제공합니다.
+"""
+import csv
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dnn.features import (
+    FEATURE_NAMES, LANDMARK_INDICES, NUM_JOINTS, check_feature_schema, extract_features, feature_schema,
+)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DEFAULT_EXTRACTOR = "dnn.dataset:MediaPipeExtractor"
+DEFAULT_EXTRACTOR_OPTIONS = {"model_complexity": 1}
+DEFAULT_CACHE_DIR = os.path.join("data", ".landmark_cache")
+# 캐시 항목 형식이 바뀌면 올려서 기존 캐시를 무효화합니다.
+CACHE_VERSION = 1
+
+# 열 단위 학습 데이터 파일
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+MANIFEST_FILE = "manifest.json"
+TRAINING_DATA_VERSION = 1
+
+
+class MediaPipeExtractor:
+    """MediaPipe Pose (static_image_mode)로 선택된 13개 관절의 (x, y, z)를 추출합니다."""
+
+    def __init__(self, model_complexity=1):
+        import cv2
+        import mediapipe as mp
+
+        self._cv2 = cv2
+        self._pose = mp.solutions.pose.Pose(static_image_mode=True, model_complexity=model_complexity)
+
+    def extract(self, image_bytes):
+        image = self._cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), self._cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        results = self._pose.process(self._cv2.cvtColor(image, self._cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks:
+            return None
+        landmark = results.pose_landmarks.landmark
+        return np.array([[landmark[idx].x, landmark[idx].y, landmark[idx].z] for idx in LANDMARK_INDICES])
+
+    def close(self):
+        self._pose.close()
+
+
+def load_extractor(spec):
+    """"모듈:클래스" → 추출기 클래스"""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def extractor_key(spec, options):
+    """추출기 종류·설정·관절 순서가 같을 때만 캐시를 공유하도록 만드는 키"""
+    config = {"version": CACHE_VERSION, "extractor": spec, "options": options,
+              "landmark_indices": LANDMARK_INDICES}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class LandmarkCache:
+    """
+    이미지 내용 해시별 랜드마크 캐시 (<cache_dir>/<extractor_key>/<해시 앞 2자리>/<해시>.npy)
+    감지에 실패한 이미지는 빈 배열로 저장합니다. 항목은 임시 파일에 쓴 뒤 rename하므로
+    여러 워커가 동시에 써도, 중간에 중단되어도 깨진 항목이 남지 않습니다.
+    """
+
+    def __init__(self, directory, key):
+        self.directory = os.path.join(directory, key)
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.npy")
+
+    def get(self, digest):
+        """(캐시 적중 여부, 랜드마크 또는 None)"""
+        try:
+            landmarks = np.load(self._path(digest))
+        except (FileNotFoundError, ValueError, EOFError):
+            return False, None
+        return True, (landmarks if landmarks.size else None)
+
+    def put(self, digest, landmarks):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        value = np.empty((0, 3)) if landmarks is None else np.asarray(landmarks, dtype=np.float64)
+        _replace_atomically(path, lambda f: np.save(f, value))
+
+
+def scan_images(data_dir):
+    """data_dir/<label>/<이미지> → 정렬된 (경로, 라벨) 목록"""
+    items = []
+    for label in sorted(os.listdir(data_dir)):
+        folder = os.path.join(data_dir, label)
+        if not os.path.isdir(folder):
+            continue
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(folder, file_name), label))
+    return items
+
+
+def _replace_atomically(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_training_data(directory, features, labels):
+    """(N, 63) 특징과 N개의 문자열 라벨을 열 단위 형식으로 저장합니다. manifest는 마지막에 교체합니다."""
+    os.makedirs(directory, exist_ok=True)
+    features = np.asarray(features, dtype=np.float32).reshape(-1, len(FEATURE_NAMES))
+    label_names = sorted(set(labels))
+    codes = np.searchsorted(label_names, labels).astype(np.int16) if labels else np.zeros(0, np.int16)
+    manifest = {"version": TRAINING_DATA_VERSION, "rows": len(features), "label_names": label_names,
+                **feature_schema()}
+    _replace_atomically(os.path.join(directory, FEATURES_FILE), lambda f: np.save(f, features))
+    _replace_atomically(os.path.join(directory, LABELS_FILE), lambda f: np.save(f, codes))
+    _replace_atomically(os.path.join(directory, MANIFEST_FILE),
+                        lambda f: f.write(json.dumps(manifest, indent=2, ensure_ascii=False).encode()))
+    return manifest
+
+
+def load_training_data(directory, mmap=True):
+    """
+    열 단위 학습 데이터 → (features (N, 63) float32, labels (N,) 문자열, manifest)
+    mmap=True이면 features는 파일을 메모리 매핑한 읽기 전용 배열입니다.
+    특징 스키마가 서빙 특징 추출기(dnn.features)와 다르면 ValueError를 냅니다.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != TRAINING_DATA_VERSION:
+        raise ValueError(f"지원하지 않는 학습 데이터 버전입니다: {manifest.get('version')}")
+    check_feature_schema(manifest)
+    features = np.load(os.path.join(directory, FEATURES_FILE), mmap_mode="r" if mmap else None)
+    codes = np.load(os.path.join(directory, LABELS_FILE))
+    if features.shape != (manifest["rows"], len(FEATURE_NAMES)) or codes.shape != (manifest["rows"],):
+        raise ValueError("학습 데이터 파일의 행 수가 manifest와 다릅니다.")
+    return features, np.asarray(manifest["label_names"])[codes], manifest
+
+
+# 워커 프로세스별 상태 (_init_worker에서 한 번 설정)
+_worker = {}
+
+
+def _init_worker(spec, options, cache_dir):
+    _worker["spec"] = spec
+    _worker["options"] = options
+    _worker["extractor"] = None
+    _worker["cache"] = LandmarkCache(cache_dir, extractor_key(spec, options))
+
+
+def _close_worker():
+    extractor = _worker.get("extractor")
+    if extractor is not None:
+        extractor.close()
+        _worker["extractor"] = None
+
+
+def _process_image(path):
+    """이미지 한 장 → (경로, 랜드마크 또는 None, 캐시 적중 여부). 추출기는 캐시 미스가 처음 날 때 만듭니다."""
+    with open(path, "rb") as f:
+        image_bytes = f.read()
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    cache = _worker["cache"]
+    hit, landmarks = cache.get(digest)
+    if hit:
+        return path, landmarks, True
+    if _worker["extractor"] is None:
+        _worker["extractor"] = load_extractor(_worker["spec"])(**_worker["options"])
+    landmarks = _worker["extractor"].extract(image_bytes)
+    cache.put(digest, landmarks)
+    return path, landmarks, False
+
+
+def _results(paths, spec, options, cache_dir, workers, chunksize):
+    """입력 순서대로 _process_image 결과를 내보냅니다. workers=0이면 현재 프로세스에서 처리"""
+    if workers == 0:
+        _init_worker(spec, options, cache_dir)
+        try:
+            yield from map(_process_image, paths)
+        finally:
+            _close_worker()
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(spec, options, cache_dir)) as pool:
+        yield from pool.map(_process_image, paths, chunksize=chunksize)
+
+
+def build_dataset(data_dir, output_csv=None, output_dir=None, extractor=DEFAULT_EXTRACTOR,
+                  extractor_options=None, cache_dir=DEFAULT_CACHE_DIR, workers=None, chunksize=8, log=print):
+    """
+    data_dir의 이미지로 특징 CSV(output_csv)와 열 단위 학습 데이터(output_dir)를 만들고 처리 통계를 반환합니다.
+    CSV 행은 처리되는 대로 output_csv 옆의 임시 파일에 추가되며, 모두 끝나면 output_csv로 교체됩니다.
+    """
+    options = DEFAULT_EXTRACTOR_OPTIONS if extractor_options is None else extractor_options
+    if workers is None:
+        workers = os.cpu_count() or 1
+    items = scan_images(data_dir)
+    labels = dict(items)
+    stats = {"images": len(items), "rows": 0, "cached": 0, "extracted": 0, "undetected": 0}
+    rows, row_labels = [], []
+
+    csv_file = writer = None
+    if output_csv:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_csv)), suffix=".csv.tmp")
+        csv_file = os.fdopen(fd, "w", newline="")
+        writer = csv.writer(csv_file)
+        writer.writerow(FEATURE_NAMES + ["label"])
+    try:
+        for path, landmarks, cached in _results([p for p, _ in items], extractor, options,
+                                                cache_dir, workers, chunksize):
+            stats["cached" if cached else "extracted"] += 1
+            if landmarks is None:
+                stats["undetected"] += 1
+                log(f"Pose landmarks를 감지하지 못했습니다: {path}")
+                continue
+            # 서빙과 동일한 dnn.features로 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12) 계산
+            features = extract_features(np.asarray(landmarks).reshape(1, NUM_JOINTS, 3))[0]
+            if writer:
+                writer.writerow([repr(float(v)) for v in features] + [labels[path]])
+            rows.append(features)
+            row_labels.append(labels[path])
+            stats["rows"] += 1
+            if not cached:
+                log(f"Processed: {path}")
+        if csv_file:
+            csv_file.close()
+            os.replace(tmp_path, output_csv)
+    except BaseException:
+        if csv_file:
+            csv_file.close()
+            os.unlink(tmp_path)
+        raise
+    if output_dir:
+        write_training_data(output_dir, np.array(rows).reshape(-1, len(FEATURE_NAMES)), row_labels)
+    return stats
@@ -0,0 +1,106 @@
+"""
+학습된 Keras 자세 모델(.h5)을 NumpyPoseModel용 가중치 파일(.npz)로 내보냅니다.
+BatchNormalization은 추론 시 고정된 affine 변환이므로 인접한 Dense 레이어에 접어 넣습니다.
+
+사용법: python -m dnn.export_weights dnn/model/pose_model.h5 dnn/model/pose_model.npz \
+            --label-encoder dnn/model/label_encoder.pkl
+"""
+import argparse
+import json
+import os
+import pickle
+
+import numpy as np
+
+from dnn.numpy_model import NumpyPoseModel
+
+
+def _batchnorm_affine(layer):
+    """BatchNormalization 레이어를 y = x * scale + shift 형태로 변환합니다."""
+    config = layer.get_config()
+    mean = np.asarray(layer.moving_mean, dtype=np.float64)
+    variance = np.asarray(layer.moving_variance, dtype=np.float64)
+    gamma = np.asarray(layer.gamma, dtype=np.float64) if config.get("scale", True) else 1.0
+    beta = np.asarray(layer.beta, dtype=np.float64) if config.get("center", True) else 0.0
+    scale = gamma / np.sqrt(variance + config["epsilon"])
+    shift = beta - mean * scale
+    return scale, shift
+
+
+def fold_model(keras_model) -> NumpyPoseModel:
+    """
+    Sequential 모델의 레이어를 순서대로 읽어 Dense 가중치에 BatchNormalization을 접습니다.
+    - Dense(linear) 뒤의 BN: 해당 Dense의 출력 쪽에 접음
+    - 활성화 뒤의 BN (poseModel.py 구조): 다음 Dense의 입력 쪽에 접음
+    Dropout은 추론 시 항등 함수이므로 무시합니다.
+    """
+    kernels, biases, activations = [], [], []
+    pending = None  # 다음 Dense 입력에 적용할 (scale, shift)
+
+    for layer in keras_model.layers:
+        kind = layer.__class__.__name__
+        if kind == "Dense":
+            kernel, bias = [w.astype(np.float64) for w in layer.get_weights()]
+            if pending is not None:
+                scale, shift = pending
+                bias = bias + shift @ kernel
+                kernel = kernel * scale[:, None]
+                pending = None
+            kernels.append(kernel)
+            biases.append(bias)
+            activations.append(layer.get_config()["activation"])
+        elif kind == "BatchNormalization":
+            scale, shift = _batchnorm_affine(layer)
+            if activations and activations[-1] == "linear" and pending is None:
+                kernels[-1] = kernels[-1] * scale[None, :]
+                biases[-1] = biases[-1] * scale + shift
+            elif pending is None:
+                pending = (scale, shift)
+            else:
+                prev_scale, prev_shift = pending
+                pending = (prev_scale * scale, prev_shift * scale + shift)
+        elif kind in ("Dropout", "InputLayer"):
+            continue
+        else:
+            raise ValueError(f"내보낼 수 없는 레이어입니다: {layer.name} ({kind})")
+
+    if pending is not None:
+        raise ValueError("마지막 Dense 뒤의 BatchNormalization은 접을 수 없습니다.")
+    return NumpyPoseModel(kernels, biases, activations)
+
+
+def export(h5_path, output_path):
+    from tensorflow.keras.models import load_model
+
+    numpy_model = fold_model(load_model(h5_path, compile=False))
+    numpy_model.save(output_path)
+    return numpy_model
+
+
+def export_label_classes(label_encoder_path, output_path):
+    """LabelEncoder.classes_를 JSON으로 저장합니다. (서빙 시 scikit-learn 없이 라벨 복원)"""
+    with open(label_encoder_path, "rb") as f:
+        classes = [str(c) for c in pickle.load(f).classes_]
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(classes, f, ensure_ascii=False)
+    return classes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keras .h5 자세 모델을 NumPy 가중치 파일로 내보냅니다.")
+    parser.add_argument("h5_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--label-encoder", help="label_encoder.pkl (주면 같은 폴더에 label_classes.json도 저장)")
+    args = parser.parse_args()
+
+    numpy_model = export(args.h5_path, args.output_path)
+    shapes = " → ".join([str(numpy_model.input_dim)] + [str(k.shape[1]) for k in numpy_model.kernels])
+    print(f"가중치 저장 완료: {args.output_path} ({shapes})")
+    if args.label_encoder:
+        classes_path = os.path.join(os.path.dirname(args.output_path), "label_classes.json")
+        classes = export_label_classes(args.label_encoder, classes_path)
+        print(f"라벨 저장 완료: {classes_path} ({classes})")
+
+
+if __name__ == "__main__":
+    main()
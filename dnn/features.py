@@ -0,0 +1,134 @@
+"""
+학습(poseLandmark_csv.py)과 서빙(consumers)이 공유하는 랜드마크 특징 추출 모듈입니다.
+(N, 13, 3) 랜드마크 배열을 받아 (N, 63) 특징을 반환하며, 관절별 파이썬 루프 없이 벡터 연산만 사용합니다.
+특징 구성: 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12)
+"""
+from itertools import combinations
+
+import numpy as np
+
+# 13개 관절 인덱스 (MediaPipe Pose 기준)와 이름
+LANDMARK_INDICES = [0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+LANDMARK_NAMES = {
+    0: "Nose",
+    11: "LeftShoulder",
+    12: "RightShoulder",
+    13: "LeftElbow",
+    14: "RightElbow",
+    15: "LeftWrist",
+    16: "RightWrist",
+    23: "LeftHip",
+    24: "RightHip",
+    25: "LeftKnee",
+    26: "RightKnee",
+    27: "LeftAnkle",
+    28: "RightAnkle"
+}
+NUM_JOINTS = len(LANDMARK_INDICES)
+
+# 정규화 파라미터
+TORSO_SIZE_MULTIPLIER = 2.5
+
+# 각도 계산용 연결 관계 (내부 관절 인덱스 기준): 중심 관절 → 이웃 관절들
+CONNECTIONS = {
+    1: [0, 3, 7],
+    2: [0, 4, 8],
+    3: [1, 5],
+    4: [2, 6],
+    7: [1, 9],
+    8: [2, 10],
+    9: [7, 11],
+    10: [8, 12]
+}
+
+# (중심, 이웃 i, 이웃 j) 인덱스 배열 — 모듈 로드 시 한 번만 계산
+_TRIPLETS = np.array([
+    (joint, i, j)
+    for joint, neighbors in CONNECTIONS.items()
+    for (i, j) in combinations(neighbors, 2)
+])
+ANGLE_CENTER, ANGLE_FIRST, ANGLE_SECOND = _TRIPLETS.T
+NUM_ANGLES = len(_TRIPLETS)
+
+FEATURE_DIM = NUM_JOINTS * 3 + NUM_ANGLES * 2
+# 클라이언트가 계산해 보내는 특징(static/js/posemodule/mathutils.js computeFeatures)의 스키마 버전
+# feature_schema()나 정규화·각도 계산 방식이 바뀌면 올려서, 이전 버전 클라이언트 특징은 받지 않도록 합니다.
+FEATURE_SCHEMA_VERSION = 1
+
+# 특징 이름 (CSV 헤더와 동일한 순서)
+FEATURE_NAMES = [
+    f"{LANDMARK_NAMES[idx]}_{axis}" for idx in LANDMARK_INDICES for axis in ("x", "y", "z")
+] + [
+    f"angle_{dim}_{joint}_{i}_{j}" for dim in ("2d", "3d") for joint, i, j in _TRIPLETS.tolist()
+]
+
+
+def as_landmark_batch(landmarks) -> np.ndarray:
+    """(39,), (13, 3), (N, 39), (N, 13, 3) 입력을 (N, 13, 3) float64 배열로 맞춥니다."""
+    array = np.asarray(landmarks, dtype=np.float64)
+    if array.size % (NUM_JOINTS * 3) != 0:
+        raise ValueError("좌표 길이가 올바르지 않습니다. 39개의 값이 필요합니다.")
+    return array.reshape(-1, NUM_JOINTS, 3)
+
+
+def normalize_landmarks(landmarks: np.ndarray) -> np.ndarray:
+    """
+    (N, 13, 3) 랜드마크를 학습 시 전처리와 동일하게 정규화합니다.
+    중심은 왼쪽/오른쪽 엉덩이의 평균(x, y), 기준 거리는 max(torso 크기 × multiplier, 중심에서 가장 먼 관절 거리)이며
+    z는 중심 보정 없이 기준 거리로만 나눕니다.
+    """
+    center = (landmarks[:, 7, :2] + landmarks[:, 8, :2]) / 2.0
+    shoulders = (landmarks[:, 1, :2] + landmarks[:, 2, :2]) / 2.0
+    torso_size = np.linalg.norm(shoulders - center, axis=1)
+    distances = np.linalg.norm(landmarks[:, :, :2] - center[:, None, :], axis=2)
+    max_distance = np.maximum(torso_size * TORSO_SIZE_MULTIPLIER, distances.max(axis=1))
+
+    normalized = landmarks.copy()
+    normalized[:, :, :2] -= center[:, None, :]
+    normalized /= max_distance[:, None, None]
+    return normalized
+
+
+def compute_joint_angles(landmarks: np.ndarray, dim="3d") -> np.ndarray:
+    """
+    (N, 13, 3) 정규화 랜드마크에서 CONNECTIONS 기반 관절 각도 (N, 12)를 계산합니다.
+    dim="2d"인 경우 x, y 좌표만 사용합니다.
+    """
+    points = landmarks[:, :, :2] if dim == "2d" else landmarks
+    center = points[:, ANGLE_CENTER]
+    v1 = points[:, ANGLE_FIRST] - center
+    v2 = points[:, ANGLE_SECOND] - center
+    v1 = v1 / (np.linalg.norm(v1, axis=2, keepdims=True) + 1e-8)
+    v2 = v2 / (np.linalg.norm(v2, axis=2, keepdims=True) + 1e-8)
+    cosine = np.clip(np.einsum("nak,nak->na", v1, v2), -1, 1)
+    return np.arccos(cosine)
+
+
+def extract_features(landmarks) -> np.ndarray:
+    """랜드마크 배치 → (N, 63) 특징 (정규화 좌표 39 + 2D 각도 12 + 3D 각도 12)"""
+    return features_from_normalized(normalize_landmarks(as_landmark_batch(landmarks)))
+
+
+def features_from_normalized(normalized: np.ndarray) -> np.ndarray:
+    """normalize_landmarks 결과 (N, 13, 3) → (N, 63) 특징"""
+    return np.concatenate([
+        normalized.reshape(len(normalized), -1),
+        compute_joint_angles(normalized, dim="2d"),
+        compute_joint_angles(normalized, dim="3d"),
+    ], axis=1)
+
+
+def feature_schema() -> dict:
+    """학습 데이터 manifest에 기록하는 특징 스키마 (서빙 추출기와 같아야 학습한 모델을 그대로 쓸 수 있습니다)"""
+    return {
+        "feature_names": list(FEATURE_NAMES),
+        "landmark_indices": list(LANDMARK_INDICES),
+        "torso_size_multiplier": TORSO_SIZE_MULTIPLIER,
+    }
+
+
+def check_feature_schema(schema: dict):
+    """schema가 현재 특징 추출기와 다르면 ValueError"""
+    mismatched = [key for key, value in feature_schema().items() if schema.get(key) != value]
+    if mismatched:
+        raise ValueError(f"학습 데이터의 특징 스키마가 서빙 특징 추출기와 다릅니다: {', '.join(mismatched)}")
@@ -1,21 +1,242 @@
+"""
+자세 분류 모델과 레이블 인코더를 처음 필요할 때 한 번만 로드하는 스레드 안전 접근자입니다.
+
+import만으로는 아무것도 로드하지 않으므로 manage.py migrate나 HTTP 전용 워커는 모델 비용을 치르지 않습니다.
+ASGI 워커는 부팅 시 start_warm_up()으로 백그라운드에서 모델을 로드하고 더미 배치를 한 번 돌리며,
+그동안 /ready/는 503을 반환합니다. (첫 실제 프레임이 로드·그래프 트레이싱 비용을 내지 않도록)
+
+POSE_MODEL_REGISTRY_DIR(dnn/registry.py)에 활성 버전이 있으면 그 버전을, 없으면 dnn/model의 파일을 로드합니다.
+start_reload_watcher()는 활성 버전이 바뀌면 새 모델을 백그라운드에서 로드·워밍업한 뒤 참조 하나만 바꿔 끼웁니다.
+이미 get_loaded()로 모델을 잡은 프레임·배치는 이전 모델로 끝나고, 이후 프레임부터 새 모델을 사용합니다.
+"""
+import json
+import logging
 import os
 import pickle
+import threading
+import time
+
+import numpy as np
 from django.conf import settings
-from tensorflow.keras.models import load_model
+
+from dnn.features import FEATURE_DIM
+from dnn.numpy_model import NumpyPoseModel
+from dnn.registry import (
+    KERAS_MODEL_FILE, LABEL_CLASSES_FILE, LABEL_ENCODER_FILE, WEIGHTS_FILE, ModelRegistry, RegistryError,
+)
+
+logger = logging.getLogger(__name__)
 
 # ─── 모델 및 레이블 인코더 경로 설정 ─────────────────────────────
 MODEL_DIR = os.path.join(settings.BASE_DIR, "dnn", "model")
 MODEL_PATH = os.path.join(MODEL_DIR, "pose_model.h5")
+WEIGHTS_PATH = os.path.join(MODEL_DIR, "pose_model.npz")
 LABEL_ENCODER_PATH = os.path.join(MODEL_DIR, "label_encoder.pkl")
+# LabelEncoder.classes_ (dnn/export_weights.py --label-encoder로 생성). 있으면 scikit-learn 없이 라벨을 복원합니다.
+LABEL_CLASSES_PATH = os.path.join(MODEL_DIR, "label_classes.json")
+
+# 추론 백엔드: "numpy" (기본, TensorFlow 불필요) 또는 "keras"
+INFERENCE_BACKEND = getattr(settings, "POSE_INFERENCE_BACKEND", "numpy")
+# 워밍업 더미 배치 크기: 단일 프레임(동기 consumer)과 최대 마이크로 배치
+WARMUP_BATCH_SIZES = (1, getattr(settings, "POSE_BATCH_MAX_SIZE", 64))
+# 버전별 모델 저장소 (None이면 위의 고정 경로만 사용)
+REGISTRY_DIR = getattr(settings, "POSE_MODEL_REGISTRY_DIR", None)
+# 활성 버전 확인 주기(초), 0이면 교체 감시를 하지 않음
+RELOAD_INTERVAL = getattr(settings, "POSE_MODEL_RELOAD_INTERVAL", 5.0)
+
+
+class LabelClasses:
+    """서빙에 필요한 LabelEncoder.inverse_transform만 제공하는 경량 대체 (scikit-learn import 비용 없음)"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, indices):
+        return self.classes_[np.asarray(indices)]
+
+
+def load_label_encoder(label_encoder_path=LABEL_ENCODER_PATH, label_classes_path=LABEL_CLASSES_PATH):
+    if label_classes_path and os.path.exists(label_classes_path):
+        with open(label_classes_path, encoding="utf-8") as f:
+            return LabelClasses(json.load(f))
+    if not os.path.exists(label_encoder_path):
+        raise FileNotFoundError(f"레이블 인코더 파일을 찾을 수 없습니다: {label_encoder_path}")
+    with open(label_encoder_path, "rb") as f:
+        return pickle.load(f)
+
+
+class LoadedModel:
+    """함께 로드된 모델과 레이블 인코더 한 쌍 (version: 저장소 버전, 고정 경로에서 로드했으면 None)"""
+
+    def __init__(self, model, label_encoder, version=None):
+        self.model = model
+        self.label_encoder = label_encoder
+        self.version = version
+
+
+def load_model_files(backend=INFERENCE_BACKEND, model_path=MODEL_PATH, weights_path=WEIGHTS_PATH,
+                     label_encoder_path=LABEL_ENCODER_PATH, label_classes_path=LABEL_CLASSES_PATH) -> LoadedModel:
+    # 파일 존재 여부 확인
+    if backend == "numpy":
+        if not os.path.exists(weights_path):
+            raise FileNotFoundError(f"가중치 파일을 찾을 수 없습니다: {weights_path} (dnn/export_weights.py로 생성)")
+    elif not os.path.exists(model_path):
+        raise FileNotFoundError(f"모델 파일을 찾을 수 없습니다: {model_path}")
+
+    if backend == "numpy":
+        # BatchNorm이 접힌 NumPy 런타임 (TensorFlow를 import하지 않음)
+        model = NumpyPoseModel.load(weights_path)
+    else:
+        from tensorflow.keras.models import load_model
+
+        # GCN 관련 custom_objects 제거하고 모델 로드
+        model = load_model(model_path)
+
+    return LoadedModel(model, load_label_encoder(label_encoder_path, label_classes_path))
+
+
+def get_registry():
+    return ModelRegistry(REGISTRY_DIR) if REGISTRY_DIR else None
+
+
+def load_version(registry, version, backend=INFERENCE_BACKEND) -> LoadedModel:
+    """저장소의 한 버전을 체크섬·특징 스키마 확인 후 로드합니다."""
+    registry.verify(version)
+    directory = registry.version_dir(version)
+    loaded = load_model_files(backend,
+                              model_path=os.path.join(directory, KERAS_MODEL_FILE),
+                              weights_path=os.path.join(directory, WEIGHTS_FILE),
+                              label_encoder_path=os.path.join(directory, LABEL_ENCODER_FILE),
+                              label_classes_path=os.path.join(directory, LABEL_CLASSES_FILE))
+    loaded.version = version
+    return loaded
+
+
+def load_active() -> LoadedModel:
+    registry = get_registry()
+    version = registry.active_version() if registry else None
+    if version is None:
+        return load_model_files()
+    return load_version(registry, version)
+
+
+_loaded = None
+_load_lock = threading.Lock()
+_warm_lock = threading.Lock()
+_ready = threading.Event()
+# 마지막 워밍업에 걸린 시간(초): 로드 + 더미 배치
+warmup_seconds = None
+# 로드에 실패한 활성 버전 (ACTIVE가 다시 바뀔 때까지 재시도하지 않음)
+_failed_version = None
+
+
+def get_loaded() -> LoadedModel:
+    """
+    현재 서빙 중인 모델. 프레임(또는 배치) 하나를 처리하는 동안에는 처음 받은 객체를 계속 사용해야
+    도중에 모델이 교체되어도 예측과 라벨 복원이 같은 버전으로 끝납니다.
+    """
+    global _loaded
+    loaded = _loaded
+    if loaded is None:
+        with _load_lock:
+            if _loaded is None:
+                _loaded = load_active()
+            loaded = _loaded
+    return loaded
+
+
+def get_model():
+    return get_loaded().model
+
+
+def get_label_encoder():
+    return get_loaded().label_encoder
+
+
+def warm_loaded(loaded):
+    """더미 배치로 예측과 라벨 복원을 한 번씩 실행합니다."""
+    for batch_size in WARMUP_BATCH_SIZES:
+        loaded.model.predict(np.zeros((batch_size, FEATURE_DIM), dtype=np.float32), verbose=0)
+    loaded.label_encoder.inverse_transform([0])
+
+
+def warm_up():
+    """모델을 로드하고 더미 배치로 예측을 한 번씩 실행한 뒤 준비 완료로 표시합니다. (여러 번 호출해도 한 번만 실행)"""
+    global warmup_seconds
+    with _warm_lock:
+        if _ready.is_set():
+            return warmup_seconds
+        started = time.perf_counter()
+        warm_loaded(get_loaded())
+        warmup_seconds = time.perf_counter() - started
+        _ready.set()
+        logger.info("자세 모델 워밍업 완료 (%.3fs, backend=%s)", warmup_seconds, INFERENCE_BACKEND)
+        return warmup_seconds
+
+
+def start_warm_up() -> threading.Thread:
+    """워커 부팅 시 호출: 서버가 바로 연결을 받을 수 있도록 워밍업을 백그라운드 스레드에서 실행합니다."""
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            logger.exception("자세 모델 워밍업에 실패했습니다.")
+
+    thread = threading.Thread(target=run, name="pose-model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait_ready(timeout=None) -> bool:
+    return _ready.wait(timeout)
+
+
+def reload_if_changed() -> bool:
+    """
+    저장소의 활성 버전이 서빙 중인 버전과 다르면 새 모델을 로드·워밍업한 뒤 교체하고 True를 반환합니다.
+    로드와 워밍업은 호출한 스레드에서 끝내고, 교체는 참조 대입 한 번이므로 서빙 경로는 멈추지 않습니다.
+    실패하면 기존 모델을 계속 사용합니다.
+    """
+    global _loaded, _failed_version
+    registry = get_registry()
+    current = _loaded
+    if registry is None or current is None:
+        return False
+    version = registry.active_version()
+    if version is None or version == current.version or version == _failed_version:
+        return False
+    try:
+        started = time.perf_counter()
+        loaded = load_version(registry, version)
+        warm_loaded(loaded)
+    except (RegistryError, OSError, ValueError):
+        _failed_version = version
+        logger.exception("모델 버전 %s를 로드하지 못해 %s를 계속 사용합니다.", version, current.version)
+        return False
+    with _load_lock:
+        _loaded = loaded
+    _failed_version = None
+    logger.info("자세 모델을 %s에서 %s로 교체했습니다 (%.3fs)", current.version, version,
+                time.perf_counter() - started)
+    return True
+
 
-# 파일 존재 여부 확인
-if not os.path.exists(MODEL_PATH):
-    raise FileNotFoundError(f"모델 파일을 찾을 수 없습니다: {MODEL_PATH}")
-if not os.path.exists(LABEL_ENCODER_PATH):
-    raise FileNotFoundError(f"레이블 인코더 파일을 찾을 수 없습니다: {LABEL_ENCODER_PATH}")
+def start_reload_watcher(interval=None) -> threading.Thread:
+    """RELOAD_INTERVAL마다 활성 버전을 확인해 바뀌면 교체하는 데몬 스레드를 시작합니다."""
+    interval = RELOAD_INTERVAL if interval is None else interval
 
-# GCN 관련 custom_objects 제거하고 모델 로드
-model = load_model(MODEL_PATH)
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                reload_if_changed()
+            except Exception:
+                logger.exception("모델 버전 확인에 실패했습니다.")
 
-with open(LABEL_ENCODER_PATH, "rb") as f:
-    label_encoder = pickle.load(f)
+    thread = threading.Thread(target=run, name="pose-model-reload", daemon=True)
+    thread.start()
+    return thread
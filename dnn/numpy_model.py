@@ -0,0 +1,64 @@
+import numpy as np
+
+# 학습 코드(poseModel.py)의 Dense 활성화 함수 중 런타임이 지원하는 것
+SUPPORTED_ACTIVATIONS = ("linear", "relu", "softmax")
+
+
+def _apply_activation(x: np.ndarray, activation: str) -> np.ndarray:
+    if activation == "relu":
+        return np.maximum(x, 0.0, out=x)
+    if activation == "softmax":
+        x = x - x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
+    return x
+
+
+class NumpyPoseModel:
+    """
+    export_weights.py가 만든 가중치 파일(.npz)로 자세 MLP를 NumPy만으로 추론합니다.
+    BatchNormalization은 내보내기 단계에서 Dense에 접혀 있으므로 Dense + 활성화만 계산합니다.
+    """
+
+    def __init__(self, kernels, biases, activations):
+        self.kernels = [np.ascontiguousarray(k, dtype=np.float32) for k in kernels]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        for activation in self.activations:
+            if activation not in SUPPORTED_ACTIVATIONS:
+                raise ValueError(f"지원하지 않는 활성화 함수입니다: {activation}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            num_layers = int(data["num_layers"])
+            kernels = [data[f"kernel_{i}"] for i in range(num_layers)]
+            biases = [data[f"bias_{i}"] for i in range(num_layers)]
+            activations = [str(a) for a in data["activations"]]
+        return cls(kernels, biases, activations)
+
+    def save(self, path):
+        arrays = {"num_layers": np.int32(len(self.kernels)), "activations": np.array(self.activations)}
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        np.savez_compressed(path, **arrays)
+
+    @property
+    def input_dim(self) -> int:
+        return self.kernels[0].shape[0]
+
+    def predict(self, features, verbose=0) -> np.ndarray:
+        """
+        Keras Model.predict와 같은 방식으로 (N, 63) 입력에 대해 (N, 클래스 수) softmax 확률을 반환합니다.
+        verbose는 Keras 호출부와의 호환을 위해서만 받습니다.
+        """
+        x = np.asarray(features, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            x = x @ kernel
+            x += bias
+            x = _apply_activation(x, activation)
+        return x
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 import math
 from tensorflow.keras.models import Sequential
@@ -10,31 +9,19 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.utils import class_weight
 import pickle
+import json
 
-# CSV 파일 ("filtered_data.csv")에서 데이터 로드
-data = pd.read_csv("filtered_data.csv")
+from dnn.dataset import load_training_data
 
-if 'label' in data.columns:
-    feature_cols = [col for col in data.columns if col != 'label']
-    X = data[feature_cols].values
-    y = data['label'].values
-else:
-    X = data.iloc[:, :-1].values
-    y = data.iloc[:, -1].values
+# 저장소 루트에서 실행: python -m dnn.poseModel
+# 열 단위 학습 데이터 (python -m dnn.poseLandmark_csv로 생성)를 메모리 매핑으로 로드합니다.
+# 특징 스키마(feature_names, landmark_indices, torso_size_multiplier)가 서빙용 dnn.features와 다르면 ValueError
+X_combined, y, manifest = load_training_data("training_data")
 
-# X의 shape는 (num_samples, 63)
-num_samples = X.shape[0]
-input_dim = X.shape[1]  # 63
-
-# 세 그룹으로 분리: 좌표(앞 39), 2D 각도(다음 12), 3D 각도(마지막 12)
-# (정규화 제거: 원본 X 데이터를 그대로 사용합니다.)
-X_coords = X[:, :39]
-X_angles2d = X[:, 39:51]
-X_angles3d = X[:, 51:63]
-
-# 정규화 없이 결합 (또는 단순히 원본 X 사용)
-X_combined = np.concatenate([X_coords, X_angles2d, X_angles3d], axis=1)
-# 또는 X_combined = X 와 같이 사용할 수도 있습니다.
+# X의 shape는 (num_samples, 63): 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12)
+num_samples = X_combined.shape[0]
+input_dim = X_combined.shape[1]  # 63
+print(f"학습 데이터 로드: {num_samples}행, 라벨 {manifest['label_names']}")
 
 # 레이블 인코딩
 le = LabelEncoder()
@@ -80,5 +67,8 @@ model.fit(X_train, y_train, validation_data=(X_val, y_val),
 model.save("pose_model.h5")
 with open("label_encoder.pkl", "wb") as f:
     pickle.dump(le, f)
+# 서빙은 scikit-learn 없이 라벨만 복원하므로 classes_를 JSON으로도 저장합니다.
+with open("label_classes.json", "w", encoding="utf-8") as f:
+    json.dump([str(c) for c in le.classes_], f, ensure_ascii=False)
 
 print("학습 및 저장 완료!")
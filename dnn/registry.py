@@ -0,0 +1,158 @@
+"""
+버전별 자세 모델 저장소입니다.
+
+<registry>/
+    versions/<version>/        pose_model.npz, pose_model.h5(선택), label_classes.json, label_encoder.pkl(선택)
+    versions/<version>/manifest.json
+        {"version", "created_at", "files": {파일 이름: sha256}, "feature_schema": dnn.features.feature_schema()}
+    ACTIVE                     서빙할 버전 이름 (os.replace로 원자적으로 교체)
+    history.json               활성화된 버전 기록 (rollback에 사용)
+
+워커는 ACTIVE를 주기적으로 확인하고, 바뀌면 백그라운드에서 새 버전을 로드·워밍업한 뒤 교체합니다.
+(dnn/model_loader.py의 start_reload_watcher)
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+from dnn.features import check_feature_schema, feature_schema
+
+MANIFEST_FILE = "manifest.json"
+ACTIVE_FILE = "ACTIVE"
+HISTORY_FILE = "history.json"
+WEIGHTS_FILE = "pose_model.npz"
+KERAS_MODEL_FILE = "pose_model.h5"
+LABEL_CLASSES_FILE = "label_classes.json"
+LABEL_ENCODER_FILE = "label_encoder.pkl"
+ARTIFACT_FILES = (WEIGHTS_FILE, KERAS_MODEL_FILE, LABEL_CLASSES_FILE, LABEL_ENCODER_FILE)
+
+
+class RegistryError(Exception):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomically(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    def __init__(self, root):
+        self.root = str(root)
+
+    def version_dir(self, version):
+        return os.path.join(self.root, "versions", version)
+
+    def versions(self):
+        versions_dir = os.path.join(self.root, "versions")
+        if not os.path.isdir(versions_dir):
+            return []
+        return sorted(v for v in os.listdir(versions_dir)
+                      if os.path.exists(os.path.join(versions_dir, v, MANIFEST_FILE)))
+
+    def manifest(self, version):
+        try:
+            with open(os.path.join(self.version_dir(version), MANIFEST_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RegistryError(f"등록되지 않은 모델 버전입니다: {version}") from None
+
+    def register(self, version, files):
+        """
+        files: {파일 이름: 원본 경로} (ARTIFACT_FILES 중 일부)
+        파일을 복사하고 체크섬과 현재 특징 스키마를 담은 manifest를 씁니다.
+        """
+        if not version or os.sep in version or version.startswith("."):
+            raise RegistryError(f"올바르지 않은 버전 이름입니다: {version!r}")
+        unknown = set(files) - set(ARTIFACT_FILES)
+        if unknown:
+            raise RegistryError(f"알 수 없는 모델 파일입니다: {sorted(unknown)}")
+        if WEIGHTS_FILE not in files and KERAS_MODEL_FILE not in files:
+            raise RegistryError(f"{WEIGHTS_FILE} 또는 {KERAS_MODEL_FILE}이 필요합니다.")
+        if LABEL_CLASSES_FILE not in files and LABEL_ENCODER_FILE not in files:
+            raise RegistryError(f"{LABEL_CLASSES_FILE} 또는 {LABEL_ENCODER_FILE}이 필요합니다.")
+        target = self.version_dir(version)
+        if os.path.exists(target):
+            raise RegistryError(f"이미 등록된 버전입니다: {version}")
+
+        # 임시 디렉터리에 모두 복사한 뒤 rename하므로 워커가 반쯤 복사된 버전을 보지 않습니다.
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(target), prefix=f".{version}.")
+        try:
+            checksums = {}
+            for name, source in files.items():
+                shutil.copyfile(source, os.path.join(staging, name))
+                checksums[name] = file_sha256(os.path.join(staging, name))
+            manifest = {
+                "version": version,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "files": checksums,
+                "feature_schema": feature_schema(),
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return manifest
+
+    def verify(self, version):
+        """체크섬과 특징 스키마를 확인하고 manifest를 반환합니다. 맞지 않으면 RegistryError"""
+        manifest = self.manifest(version)
+        for name, expected in manifest["files"].items():
+            path = os.path.join(self.version_dir(version), name)
+            if not os.path.exists(path) or file_sha256(path) != expected:
+                raise RegistryError(f"{version}/{name}의 체크섬이 manifest와 다릅니다.")
+        try:
+            check_feature_schema(manifest["feature_schema"])
+        except ValueError as e:
+            raise RegistryError(f"{version}: {e}") from None
+        return manifest
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def history(self):
+        try:
+            with open(os.path.join(self.root, HISTORY_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def activate(self, version, _record=True):
+        """검증을 통과한 버전을 ACTIVE로 지정합니다. 실행 중인 워커는 다음 확인 주기에 교체합니다."""
+        self.verify(version)
+        if _record:
+            history = self.history()
+            history.append(version)
+            _write_atomically(os.path.join(self.root, HISTORY_FILE), json.dumps(history, indent=2))
+        _write_atomically(os.path.join(self.root, ACTIVE_FILE), version + "\n")
+        return version
+
+    def rollback(self):
+        """직전에 활성화했던 버전으로 되돌리고 그 버전 이름을 반환합니다."""
+        history = self.history()
+        if len(history) < 2:
+            raise RegistryError("되돌릴 이전 버전이 없습니다.")
+        previous = history[-2]
+        self.activate(previous, _record=False)
+        _write_atomically(os.path.join(self.root, HISTORY_FILE), json.dumps(history[:-1], indent=2))
+        return previous
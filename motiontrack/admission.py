@@ -0,0 +1,246 @@
+"""
+/ws/pose_data/ 게임 세션 수 제한(admission control)과 대기실입니다.
+
+동시에 진행하는 게임이 너무 많으면 모든 플레이어의 지연이 함께 늘어나므로, 처리할 수 있는 만큼만 게임을 시작하고
+나머지 연결은 대기실에서 순서대로 기다리게 합니다. (None이면 그 상한을 두지 않음)
+  - POSE_MAX_SESSIONS_PER_WORKER: 워커(프로세스) 하나에서 동시에 진행하는 게임 수 상한
+  - POSE_MAX_SESSIONS: 클러스터 전체 상한. 캐시(Redis)의 "admission:slot:<i>" 키 POSE_MAX_SESSIONS개를 자리로 쓰고,
+    빈 자리를 cache.add(SET NX)로 원자적으로 차지합니다. 자리 키는 POSE_ADMISSION_LEASE_TTL 뒤 만료되고
+    게임 중에는 그 1/3마다 연장하므로, 워커가 죽어 반납하지 못한 자리도 잠시 뒤 다시 쓸 수 있습니다.
+    연장·반납은 키 값이 자기 세션일 때만 하므로(Redis에서는 Lua 스크립트로 원자적으로), 만료된 사이 다른 세션이
+    차지한 자리는 빼앗지 않습니다.
+자리가 없으면 연결은 워커의 FIFO 대기열에 들어가 {"control": "queue", "position": n, "waiting": 전체}로 순번을 받고,
+이 워커의 게임이 끝나면 바로, 다른 워커의 자리는 POSE_ADMISSION_POLL_INTERVAL마다 확인해 앞에서부터 게임을 시작합니다.
+대기열도 POSE_WAITING_ROOM_SIZE만큼 차 있으면 연결을 WAITING_ROOM_FULL_CLOSE_CODE로 닫습니다.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+POSE_MAX_SESSIONS = getattr(settings, "POSE_MAX_SESSIONS", None)
+POSE_MAX_SESSIONS_PER_WORKER = getattr(settings, "POSE_MAX_SESSIONS_PER_WORKER", None)
+POSE_ADMISSION_LEASE_TTL = getattr(settings, "POSE_ADMISSION_LEASE_TTL", 30)
+POSE_ADMISSION_POLL_INTERVAL = getattr(settings, "POSE_ADMISSION_POLL_INTERVAL", 1.0)
+POSE_WAITING_ROOM_SIZE = getattr(settings, "POSE_WAITING_ROOM_SIZE", 1000)
+# 대기실까지 꽉 차서 서버가 닫을 때의 WebSocket close 코드
+WAITING_ROOM_FULL_CLOSE_CODE = 4002
+
+SLOT_KEY = "admission:slot:{}"
+# 빈 자리로 보였지만 그 사이 다른 워커가 차지했을 때 다른 빈 자리를 시도하는 횟수
+LEASE_ATTEMPTS = 3
+# 자리 키의 값(owner)이 ARGV[1]일 때만 지우기/연장하기 (만료 후 다른 세션이 차지한 자리를 건드리지 않도록)
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+_TOUCH_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+
+
+def _acquire_lease(max_sessions, owner, ttl):
+    """빈 자리 키 하나를 owner로 차지해 키를 반환합니다. (모두 차 있으면 None)"""
+    keys = [SLOT_KEY.format(i) for i in range(max_sessions)]
+    taken = cache.get_many(keys)
+    free = [key for key in keys if key not in taken]
+    for key in random.sample(free, min(len(free), LEASE_ATTEMPTS)):
+        if cache.add(key, owner, timeout=ttl):
+            return key
+    return None
+
+
+def _redis_node(key):
+    """django-redis 캐시면 (key가 저장된 Redis 노드, 저장된 키 이름), 다른 캐시 백엔드면 None"""
+    client = getattr(cache, "client", None)
+    if not hasattr(client, "encode"):
+        return None
+    made = client.make_key(key)
+    return (client.get_server(made) if hasattr(client, "get_server") else client.get_client(write=True)), made
+
+
+def _release_lease(key, owner):
+    """자리 키가 아직 owner의 것일 때만 지웁니다. (만료된 뒤 다른 세션이 차지한 자리는 그대로 둠)"""
+    node = _redis_node(key)
+    if node is not None:
+        redis, made = node
+        redis.eval(_RELEASE_SCRIPT, 1, made, cache.client.encode(owner))
+    elif cache.get(key) == owner:
+        # 다른 캐시 백엔드는 비교와 삭제가 원자적이지 않지만, 그 사이에 만료되어 넘어갈 일은 드뭅니다.
+        cache.delete(key)
+
+
+def _touch_lease(key, owner, ttl) -> bool:
+    """자리 키가 아직 owner의 것이면 만료 시간을 늘리고 True를 반환합니다."""
+    node = _redis_node(key)
+    if node is not None:
+        redis, made = node
+        return bool(redis.eval(_TOUCH_SCRIPT, 1, made, cache.client.encode(owner), int(ttl * 1000)))
+    return cache.get(key) == owner and cache.touch(key, ttl)
+
+
+def _refresh_leases(leases, ttl):
+    """
+    {자리 키: owner}의 만료 시간을 늘립니다. 이미 만료된 자리는 비어 있으면 다시 차지합니다.
+    → 다른 세션에 넘어간 자리 키 목록
+    """
+    lost = [key for key, owner in leases.items()
+            if not _touch_lease(key, owner, ttl) and not cache.add(key, owner, timeout=ttl)]
+    if lost:
+        logger.warning("게임 중인 세션 %d개의 자리 키가 만료되어 다른 세션에 넘어갔습니다.", len(lost))
+    return lost
+
+
+class AdmissionController:
+    """
+    워커 하나의 게임 자리와 대기열입니다.
+    연결은 enter()로 들어와 자리가 있으면 바로, 없으면 대기열에서 차례가 되었을 때 consumer.start_session()이 호출되고,
+    연결이 끊기면 leave()로 자리(또는 대기 순번)를 반납합니다.
+    """
+
+    def __init__(self, max_sessions=POSE_MAX_SESSIONS, max_per_worker=POSE_MAX_SESSIONS_PER_WORKER,
+                 lease_ttl=POSE_ADMISSION_LEASE_TTL, poll_interval=POSE_ADMISSION_POLL_INTERVAL,
+                 max_waiting=POSE_WAITING_ROOM_SIZE):
+        self.max_sessions = max_sessions
+        self.max_per_worker = max_per_worker
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.max_waiting = max_waiting
+        # 게임 중인 consumer → 클러스터 자리 키 (클러스터 상한이 없으면 None)
+        self.admitted = {}
+        # 자리를 기다리는 consumer (dict는 넣은 순서를 유지하므로 FIFO 대기열로 씁니다)
+        self.waiting = {}
+        self._promoting = asyncio.Lock()
+        self._positions_changed = False
+        self._last_refresh = time.monotonic()
+        self._task = None
+
+    async def enter(self, consumer) -> bool:
+        """
+        자리가 있으면 바로 게임을 시작하고, 없으면 대기열에 넣고 순번을 보냅니다.
+        대기실이 꽉 차 있으면 False를 반환합니다. (consumer가 연결을 닫음)
+        """
+        if not self.waiting and await self._try_acquire(consumer):
+            await consumer.start_session()
+            return True
+        if len(self.waiting) >= self.max_waiting:
+            metrics.ADMISSION_REJECTED.inc()
+            return False
+        self.waiting[consumer] = time.monotonic()
+        metrics.WAITING_CONNECTIONS.inc()
+        self._ensure_task()
+        await consumer.send(self._queue_message(len(self.waiting)))
+        return True
+
+    async def leave(self, consumer):
+        """연결 종료: 대기 중이었으면 대기열에서 빼고, 게임 중이었으면 자리를 반납하고 다음 대기자를 들입니다."""
+        if self.waiting.pop(consumer, None) is not None:
+            metrics.WAITING_CONNECTIONS.dec()
+            self._positions_changed = True
+        if consumer not in self.admitted:
+            return
+        key = self.admitted.pop(consumer)
+        if key is not None:
+            await sync_to_async(_release_lease)(key, consumer.session_id)
+        if self.waiting:
+            await self.promote()
+
+    async def promote(self):
+        """대기열 앞에서부터 자리가 나는 만큼 게임을 시작합니다."""
+        async with self._promoting:
+            while self.waiting:
+                consumer = next(iter(self.waiting))
+                if not await self._try_acquire(consumer):
+                    # 자리가 없거나, 자리를 잡는 동안 연결이 끊겼으면 (leave()가 반납) 다음 주기에 다시 봅니다.
+                    break
+                metrics.WAITING_CONNECTIONS.dec()
+                self._positions_changed = True
+                waited = time.monotonic() - self.waiting.pop(consumer)
+                logger.debug("대기실에서 %.1f초 기다린 세션 %s의 게임을 시작합니다.", waited, consumer.session_id)
+                asyncio.ensure_future(self._start(consumer))
+
+    async def _start(self, consumer):
+        try:
+            await consumer.start_session()
+        except Exception:
+            logger.exception("대기실에서 들어온 세션 %s의 게임을 시작하지 못했습니다.", consumer.session_id)
+
+    async def _try_acquire(self, consumer) -> bool:
+        if self.max_per_worker is not None and len(self.admitted) >= self.max_per_worker:
+            return False
+        # 클러스터 자리를 조회하는 동안 다른 연결이 이 워커의 같은 자리를 보지 않도록 먼저 표시합니다.
+        self.admitted[consumer] = None
+        if self.max_sessions is None:
+            return True
+        key = await sync_to_async(_acquire_lease)(self.max_sessions, consumer.session_id, self.lease_ttl)
+        if key is None or consumer not in self.admitted:
+            self.admitted.pop(consumer, None)
+            if key is not None:
+                await sync_to_async(_release_lease)(key, consumer.session_id)
+            return False
+        self.admitted[consumer] = key
+        self._ensure_task()
+        return True
+
+    def _queue_message(self, position):
+        return json.dumps({"control": "queue", "position": position, "waiting": len(self.waiting)})
+
+    def _ensure_task(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self.run())
+
+    async def run(self):
+        # 대기자도, 연장할 자리 키도 없으면 종료하고 다음 enter에서 다시 시작합니다.
+        while self.waiting or (self.max_sessions is not None and self.admitted):
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("대기실 처리에 실패했습니다.")
+
+    async def tick(self, now=None):
+        """주기 작업: 다른 워커에서 난 자리로 대기자 들이기, 바뀐 순번 알리기, 게임 중인 자리 키 연장"""
+        now = time.monotonic() if now is None else now
+        if self.waiting:
+            await self.promote()
+        if self._positions_changed:
+            # 순번은 대기열이 바뀔 때마다가 아니라 주기마다 한 번만 알립니다. (대기자가 많아도 전송량이 일정)
+            self._positions_changed = False
+            for position, consumer in enumerate(list(self.waiting), 1):
+                await consumer.send(self._queue_message(position))
+        if self.max_sessions is not None and now - self._last_refresh >= self.lease_ttl / 3:
+            self._last_refresh = now
+            holders = {key: consumer for consumer, key in self.admitted.items() if key is not None}
+            leases = {key: consumer.session_id for key, consumer in holders.items()}
+            for key in await sync_to_async(_refresh_leases)(leases, self.lease_ttl):
+                # 넘어간 자리는 이제 다른 세션의 것이므로 leave()에서 반납하지 않습니다.
+                if self.admitted.get(holders[key]) == key:
+                    self.admitted[holders[key]] = None
+
+
+_admission = None
+
+
+def get_admission() -> AdmissionController:
+    """프로세스 전역에서 공유하는 AdmissionController"""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
+
+
+@contextmanager
+def admission_limits(**limits):
+    """이 블록 안에서만 다른 상한의 AdmissionController를 씁니다. (bench_admission, 테스트)"""
+    global _admission
+    previous, _admission = _admission, AdmissionController(**limits)
+    try:
+        yield _admission
+    finally:
+        _admission = previous
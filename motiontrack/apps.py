@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MotiontrackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'motiontrack'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (리더보드 캐시 무효화)
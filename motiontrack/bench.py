@@ -0,0 +1,264 @@
+"""
+/ws/pose_data/ 부하 생성 및 지연 측정 도구입니다. (manage.py bench_pose에서 사용)
+
+N명의 가상 플레이어가 합성 또는 녹화된 13관절 랜드마크 스트림을 지정한 fps로 전송하고,
+응답의 seq로 왕복 지연(RTT)을 계산합니다. 프로세스 내 실행 시에는 서버 단계별 시간도 함께 측정합니다.
+"""
+import asyncio
+import inspect
+import json
+import subprocess
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from channels.testing import WebsocketCommunicator
+
+from dnn.features import FEATURE_SCHEMA_VERSION, extract_features
+from .protocol import BINARY_VERSION, encode_binary_frame
+
+WS_PATH = "/ws/pose_data/"
+
+# 서 있는 자세의 13개 관절 (x, y, z) — 합성 스트림의 기준 자세
+STANDING_POSE = np.array([
+    0.50, 0.20, -0.30,
+    0.58, 0.33, -0.10, 0.42, 0.33, -0.10,
+    0.62, 0.47, -0.05, 0.38, 0.47, -0.05,
+    0.63, 0.60, -0.08, 0.37, 0.60, -0.08,
+    0.55, 0.62, 0.00, 0.45, 0.62, 0.00,
+    0.56, 0.78, 0.02, 0.44, 0.78, 0.02,
+    0.56, 0.93, 0.08, 0.44, 0.93, 0.08,
+])
+
+# 서버 단계 이름 → 측정할 Consumer 메서드
+STAGE_METHODS = {
+    "decode": "parse_frame",
+    "normalize": "normalize_frame",
+    "features": "extract_features",
+    "inference": "infer",
+    "label": "decode_label",
+    "state": "save_state",
+    "send": "send",
+}
+
+
+def synthetic_frames(count, seed=0):
+    """기준 자세에 천천히 흔들리는 움직임과 잡음을 더한 (count, 39) 랜드마크 스트림"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(count)[:, None]
+    sway = 0.02 * np.sin(2 * np.pi * t / 90 + rng.uniform(0, 2 * np.pi, 39))
+    return STANDING_POSE + sway + rng.normal(0, 0.003, (count, 39))
+
+
+def load_frames(path):
+    """녹화된 랜드마크 (.npy, (N, 39) 또는 (N, 13, 3))"""
+    return np.load(path).reshape(-1, 39)
+
+
+def percentiles(values_ms):
+    if not values_ms:
+        return {"count": 0}
+    values = np.asarray(values_ms)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def stage_timing(consumer_class, samples):
+    """consumer_class의 단계 메서드를 감싸 단계별 소요 시간(ms)을 samples[stage]에 기록합니다."""
+    missing = object()
+    originals = {}
+
+    def timed(stage, method):
+        if inspect.iscoroutinefunction(method):
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    samples[stage].append((time.perf_counter() - start) * 1000)
+        else:
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    samples[stage].append((time.perf_counter() - start) * 1000)
+        return wrapper
+
+    for stage, name in STAGE_METHODS.items():
+        samples.setdefault(stage, [])
+        originals[name] = consumer_class.__dict__.get(name, missing)
+        setattr(consumer_class, name, timed(stage, getattr(consumer_class, name)))
+    try:
+        yield samples
+    finally:
+        for name, original in originals.items():
+            if original is missing:
+                delattr(consumer_class, name)
+            else:
+                setattr(consumer_class, name, original)
+
+
+class InProcessConnection:
+    """WS/asgi.py의 ASGI 앱에 프로세스 내에서 직접 연결합니다."""
+
+    def __init__(self, application, path=WS_PATH):
+        self.communicator = WebsocketCommunicator(application, path)
+
+    async def open(self):
+        connected, _ = await self.communicator.connect(timeout=30)
+        if not connected:
+            raise ConnectionError("WebSocket 연결이 거부되었습니다.")
+
+    async def send(self, text=None, data=None):
+        await self.communicator.send_to(text_data=text, bytes_data=data)
+
+    async def recv(self):
+        message = await self.communicator.receive_output(timeout=None)
+        if message["type"] == "websocket.close":
+            raise ConnectionError("서버가 연결을 닫았습니다.")
+        return json.loads(message["text"])
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class RemoteConnection:
+    """실행 중인 daphne 서버에 연결합니다. (websockets 패키지 필요)"""
+
+    def __init__(self, url):
+        self.url = url
+        self.socket = None
+
+    async def open(self):
+        import websockets
+
+        self.socket = await websockets.connect(self.url, max_size=None)
+
+    async def send(self, text=None, data=None):
+        await self.socket.send(data if data is not None else text)
+
+    async def recv(self):
+        return json.loads(await self.socket.recv())
+
+    async def close(self):
+        await self.socket.close()
+
+
+class PlayerStats:
+    def __init__(self):
+        self.sent = 0
+        self.answered = 0
+        self.errors = 0
+        self.rtt_ms = []
+        # 대기실에서 게임 시작까지 기다린 시간 (대기하지 않았으면 None)
+        self.wait_ms = None
+
+
+async def run_player(connection, frames, fps, duration, protocol, stats, offset=0, features=None):
+    """
+    한 명의 플레이어: 서버가 허용한 max_fps를 넘지 않도록 fps로 프레임을 보내고 응답 seq로 RTT를 잽니다.
+    protocol="features"이면 미리 계산한 features(클라이언트 계산 특징)를 바이너리 프레임에 함께 보냅니다.
+    """
+    await connection.open()
+    hello = await connection.recv()
+    # 서버 대기실에 들어가면 게임 시작 메시지가 올 때까지 기다립니다. (기다리는 동안 ping에는 응답)
+    queued_at = time.perf_counter()
+    while "target" not in hello:
+        if hello.get("control") == "queue":
+            stats.wait_ms = 0.0
+        elif hello.get("control") == "ping":
+            await connection.send(text=json.dumps({"control": "pong"}))
+        hello = await connection.recv()
+    if stats.wait_ms is not None:
+        stats.wait_ms = (time.perf_counter() - queued_at) * 1000
+    max_fps = hello.get("max_fps", fps)
+    use_binary = protocol in ("binary", "features") and hello.get("binary") == BINARY_VERSION
+    use_features = protocol == "features" and use_binary and hello.get("features") == FEATURE_SCHEMA_VERSION
+    sent_at = {}
+
+    async def reader():
+        nonlocal max_fps
+        while True:
+            message = await connection.recv()
+            if message.get("control") == "rate":
+                max_fps = message["max_fps"]
+            elif "error" in message:
+                stats.errors += 1
+            elif message.get("seq") in sent_at:
+                stats.answered += 1
+                stats.rtt_ms.append((time.perf_counter() - sent_at.pop(message["seq"])) * 1000)
+
+    reader_task = asyncio.ensure_future(reader())
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        next_send = loop.time()
+        seq = 0
+        while loop.time() < deadline:
+            seq += 1
+            index = (offset + seq) % len(frames)
+            coords = frames[index]
+            sent_at[seq] = time.perf_counter()
+            if use_features:
+                await connection.send(data=encode_binary_frame(coords, seq=seq, features=features[index]))
+            elif use_binary:
+                await connection.send(data=encode_binary_frame(coords, seq=seq))
+            else:
+                await connection.send(text=json.dumps({"coords": coords.tolist(), "seq": seq}))
+            stats.sent += 1
+            next_send += 1.0 / min(fps, max_fps)
+            await asyncio.sleep(max(0.0, next_send - loop.time()))
+        # 마지막 응답을 잠시 기다립니다.
+        await asyncio.sleep(0.5)
+    finally:
+        reader_task.cancel()
+        await connection.close()
+
+
+async def run_benchmark(connect, players, fps, duration, protocol="binary", frames=None):
+    """connect(): 새 연결 객체를 만드는 함수. 결과 요약 dict를 반환합니다."""
+    if frames is None:
+        frames = synthetic_frames(max(int(fps * duration), 1))
+    features = extract_features(frames) if protocol == "features" else None
+    all_stats = [PlayerStats() for _ in range(players)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_player(connect(), frames, fps, duration, protocol, stats, offset=i * 7, features=features)
+        for i, stats in enumerate(all_stats)
+    ))
+    elapsed = time.perf_counter() - started
+
+    sent = sum(s.sent for s in all_stats)
+    answered = sum(s.answered for s in all_stats)
+    waits = [s.wait_ms for s in all_stats if s.wait_ms is not None]
+    return {
+        "commit": current_commit(),
+        "players": players,
+        "fps": fps,
+        "duration_s": duration,
+        "protocol": protocol,
+        "frames_sent": sent,
+        "frames_answered": answered,
+        "dropped_frames": sent - answered,
+        "errors": sum(s.errors for s in all_stats),
+        "throughput_fps": round(answered / elapsed, 2),
+        "latency_ms": percentiles([rtt for s in all_stats for rtt in s.rtt_ms]),
+        "queued_players": len(waits),
+        "queue_wait_ms": percentiles(waits),
+    }
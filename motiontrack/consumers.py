@@ -1,175 +1,437 @@
+import asyncio
 import json
+import re
 import time
 import random
+import uuid
+from urllib.parse import parse_qs
+
 import numpy as np
-import math
-from itertools import combinations
-from django.core.cache import cache
-from channels.generic.websocket import WebsocketConsumer
+from django.conf import settings
+from channels.generic.websocket import AsyncWebsocketConsumer, WebsocketConsumer
 
-from dnn.model_loader import model, label_encoder
+from dnn.features import (
+    FEATURE_SCHEMA_VERSION, NUM_JOINTS, as_landmark_batch, features_from_normalized, normalize_landmarks,
+)
+from dnn.model_loader import get_loaded
+from .admission import WAITING_ROOM_FULL_CLOSE_CODE, get_admission
+from .governor import FrameRateGovernor
+from .inference import INFERENCE_MODE, get_remote_scheduler, get_scheduler
+from .liveness import get_reaper
+from . import metrics
+from .metrics import timed_stage
+from .prediction_cache import PredictionCache
+from .protocol import BINARY_VERSION, parse_frame
+from .smoothing import (
+    HOLD_NONE, HOLD_RESET, HOLD_STARTED, HOLD_SUCCESS, class_map, get_smoothing_engine,
+)
+from .state import HoldState, PoseRingBuffer, get_state_store
 
 # 자세 후보 목록 (예: chair, tree, warrior, dog)
 POSES = ['chair', 'tree', 'warrior', 'dog']
-CACHE_TIMEOUT = None  # 캐시 무제한
-ALPHA = 0.5  # 지수 평활법의 smoothing factor (0과 1 사이의 값)
+# 유지 중 프레임 기록: 링 버퍼 용량(프레임 수)과 Redis 플러시 주기(초)
+POSE_BUFFER_CAPACITY = getattr(settings, "POSE_BUFFER_CAPACITY", 180)
+POSE_BUFFER_FLUSH_INTERVAL = getattr(settings, "POSE_BUFFER_FLUSH_INTERVAL", 1.0)
+# 연결 종료 후 재연결을 기다리며 상태를 남겨두는 시간(초)
+POSE_STATE_RECONNECT_TTL = getattr(settings, "POSE_STATE_RECONNECT_TTL", 60)
+SESSION_TOKEN_RE = re.compile(r"[0-9a-f]{32}")
+# True이면 연결 시 바이너리 프레임 프로토콜(protocol.py)을 클라이언트에 알립니다.
+POSE_BINARY_FRAMES = getattr(settings, "POSE_BINARY_FRAMES", True)
+# True이면 클라이언트가 계산한 63차원 특징을 받습니다. 그중 POSE_CLIENT_FEATURES_SAMPLE_RATE 비율
+# (연결의 첫 특징 프레임은 항상)을 서버 추출기 결과와 비교해 POSE_CLIENT_FEATURES_TOLERANCE를 넘으면 그 연결은 서버에서 계산
+POSE_CLIENT_FEATURES = getattr(settings, "POSE_CLIENT_FEATURES", False)
+POSE_CLIENT_FEATURES_SAMPLE_RATE = getattr(settings, "POSE_CLIENT_FEATURES_SAMPLE_RATE", 0.05)
+POSE_CLIENT_FEATURES_TOLERANCE = getattr(settings, "POSE_CLIENT_FEATURES_TOLERANCE", 1e-2)
+
+class PoseGameMixin:
+    """
+    동기/비동기 PoseConsumer가 공유하는 게임 로직입니다.
+    (특징 추출 → 평활 → 목표 자세 유지 판정)
+    평활값과 유지 타이머는 연결마다 받은 슬롯(self.slot)으로 공유 SmoothingEngine의 배열에서 계산하고,
+    self.hold는 그 결과를 저장·복구용으로 따라갑니다.
+    상태는 작은 HoldState(self.hold)와 PoseRingBuffer(self.pose_buffer)로 나누어,
+    매 프레임에는 HoldState만 상태 저장소에 쓰고 프레임 기록은 상태 전이 시 또는 일정 주기로만 플러시합니다.
+    """
+
+    def resolve_session(self):
+        """
+        재연결 시 상태를 복구하기 위한 세션 토큰을 정합니다.
+        클라이언트가 ?session=<토큰>으로 다시 접속하면 같은 키로 상태를 불러오고, 없으면 새 토큰을 발급합니다.
+        """
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        token = query.get("session", [""])[0]
+        self.session_id = token if SESSION_TOKEN_RE.fullmatch(token) else uuid.uuid4().hex
+        self.state_key = f"pose_state:{self.session_id}"
+        self.buffer_key = f"{self.state_key}:pose_buffer"
+
+    def start_game(self, hold_data=None, buffer_data=None):
+        """새 게임을 시작하거나, 저장소에서 불러온 상태가 있으면 이어서 진행합니다."""
+        self.prediction_cache = PredictionCache()
+        self.released = False
+        self.client_features_trusted = POSE_CLIENT_FEATURES
+        self.client_features_checked = False
+        self.last_buffer_flush = time.time()
+        self.governor = FrameRateGovernor()
+        if hold_data is not None:
+            self.hold = HoldState.from_dict(hold_data)
+            frames = buffer_data if buffer_data is not None else []
+            self.pose_buffer = PoseRingBuffer.from_array(frames, POSE_BUFFER_CAPACITY)
+            message = "Game resumed!"
+        else:
+            self.hold = HoldState(target_pose=random.choice(POSES))
+            self.pose_buffer = PoseRingBuffer(POSE_BUFFER_CAPACITY)
+            message = "Game started!"
+        # 평활 엔진의 슬롯 (재연결이면 유지 시작 시각을 이어받음). disconnect에서 반납합니다.
+        self.smoothing = get_smoothing_engine(len(POSES))
+        self.slot = self.smoothing.acquire(POSES.index(self.hold.target_pose), self.hold.start_time)
+        started = {
+            "target": self.hold.target_pose,
+            "message": message,
+            "session": self.session_id,
+            "max_fps": self.governor.fps
+        }
+        if POSE_BINARY_FRAMES:
+            started["binary"] = BINARY_VERSION
+        if POSE_CLIENT_FEATURES:
+            started["features"] = FEATURE_SCHEMA_VERSION
+        return started
+
+    @timed_stage("decode")
+    def parse_frame(self, text_data=None, bytes_data=None):
+        """JSON 또는 바이너리 프레임 → (coords, seq, 클라이언트 특징 또는 None)"""
+        return parse_frame(text_data, bytes_data)
+
+    @timed_stage("normalize")
+    def normalize_frame(self, coords) -> np.ndarray:
+        # 클라이언트는 13개 관절의 x, y, z 좌표 총 39개 값의 리스트를 전송해야 합니다.
+        if len(coords) != 39:
+            raise ValueError("좌표 길이가 올바르지 않습니다. 39개의 값이 필요합니다.")
+        return normalize_landmarks(as_landmark_batch(coords))
+
+    @timed_stage("features")
+    def extract_features(self, coords, normalized=None) -> np.ndarray:
+        # 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12) → 총 63차원
+        if normalized is None:
+            normalized = self.normalize_frame(coords)
+        return features_from_normalized(normalized)[0]
+
+    def prepare_frame(self, coords, client_features=None):
+        """
+        (정규화 좌표 (1, 13, 3), 63차원 특징 또는 None). 특징이 None이면 캐시 미스일 때 extract_features로 계산합니다.
+        믿을 수 있는 클라이언트 특징은 그대로 쓰고, 표본으로 고른 프레임만 서버 추출기로 다시 계산해 비교합니다.
+        """
+        if client_features is None or not self.client_features_trusted:
+            return self.normalize_frame(coords), None
+        if len(coords) != 39:
+            raise ValueError("좌표 길이가 올바르지 않습니다. 39개의 값이 필요합니다.")
+        metrics.CLIENT_FEATURE_FRAMES.inc()
+        if self.client_features_checked and random.random() >= POSE_CLIENT_FEATURES_SAMPLE_RATE:
+            return client_features[:39].reshape(1, NUM_JOINTS, 3), client_features
+
+        self.client_features_checked = True
+        normalized = self.normalize_frame(coords)
+        features = self.extract_features(coords, normalized)
+        if np.max(np.abs(features - client_features)) > POSE_CLIENT_FEATURES_TOLERANCE:
+            # 이 연결에서는 더 이상 클라이언트 특징을 쓰지 않습니다. (응답의 "features": null로 클라이언트에 알림)
+            metrics.CLIENT_FEATURE_MISMATCHES.inc()
+            self.client_features_trusted = False
+        return normalized, features
+
+    def cached_prediction(self, normalized, now):
+        """직전에 실제 추론한 프레임과 거의 같으면 그 (확률 벡터, 레이블 인코더)를, 아니면 None을 반환합니다."""
+        prediction = self.prediction_cache.lookup(normalized, now)
+        if prediction is None:
+            metrics.PREDICTION_CACHE_MISSES.inc()
+        else:
+            metrics.PREDICTION_CACHE_HITS.inc()
+        return prediction
+
+    def smooth_prediction(self, pred_probs, label_encoder=None):
+        """
+        단일 슬롯으로 엔진을 한 번 진행해 (자세 라벨, 유지 이벤트)를 반환합니다.
+        (모델 교체로 클래스 수가 바뀌면 엔진이 평활값을 새로 시작)
+        """
+        label_encoder = label_encoder or get_loaded().label_encoder
+        labels, events = self.smoothing.step([self.slot], pred_probs[None], time.time(),
+                                             class_map(label_encoder, tuple(POSES)))
+        return self.decode_label(labels[0], label_encoder), events[0]
+
+    @timed_stage("label")
+    def decode_label(self, pred_idx, label_encoder=None) -> str:
+        return (label_encoder or get_loaded().label_encoder).inverse_transform([pred_idx])[0]
+
+    def update_hold(self, pose_label, coords, event=None):
+        """
+        엔진의 유지 이벤트로 self.hold와 self.pose_buffer를 갱신하고 (클라이언트 응답, 상태 전이 여부)를 반환합니다.
+        event가 없으면 pose_label로 유지 타이머만 진행합니다. (평활 없이 라벨을 바로 판정할 때)
+        목표 자세를 HOLD_SECONDS 이상 유지하면 성공 응답과 함께 새 목표 자세가 지정됩니다.
+        성공한 유지 구간의 프레임은 다음 유지가 시작될 때까지 버퍼에 남겨 플러시됩니다.
+        """
+        if event is None:
+            pose = POSES.index(pose_label) if pose_label in POSES else -1
+            event = self.smoothing.observe([self.slot], [pose], time.time())[0]
+        hold = self.hold
+        if event == HOLD_NONE:
+            return {"pose": pose_label, "target": hold.target_pose}, False
+        if event == HOLD_RESET:
+            hold.start_time = None
+            hold.frame_count = 0
+            self.pose_buffer.clear()
+            return {"pose": pose_label, "target": hold.target_pose}, True
+
+        transitioned = event == HOLD_STARTED
+        if transitioned:
+            hold.start_time = self.smoothing.hold_start(self.slot)
+            hold.frame_count = 0
+            self.pose_buffer.clear()
+        self.pose_buffer.append(coords)
+        hold.frame_count += 1
+        if event == HOLD_SUCCESS:
+            new_target = random.choice([p for p in POSES if p != hold.target_pose])
+            self.hold = HoldState(target_pose=new_target, success_count=hold.success_count + 1)
+            self.smoothing.set_target(self.slot, POSES.index(new_target))
+            metrics.SUCCESSES.inc()
+            return {
+                "pose": pose_label,
+                "target": hold.target_pose,
+                "effect": "success",
+                "message": "5초 이상 유지되었습니다."
+            }, True
+        return {
+            "pose": pose_label,
+            "target": hold.target_pose
+        }, transitioned
+
+    def buffer_flush_due(self, transitioned) -> bool:
+        """상태 전이가 있었거나, 유지 중 POSE_BUFFER_FLUSH_INTERVAL이 지났으면 버퍼를 플러시합니다."""
+        now = time.time()
+        if transitioned or (self.hold.start_time is not None
+                            and now - self.last_buffer_flush >= POSE_BUFFER_FLUSH_INTERVAL):
+            self.last_buffer_flush = now
+            return True
+        return False
+
+    def rate_control(self, received_at):
+        """
+        프레임 처리 지연을 기록하고, 허용 fps가 바뀌었으면 클라이언트에 보낼 제어 메시지를 반환합니다.
+        클라이언트(socket.js)는 control 메시지를 받으면 전송 간격을 max_fps에 맞춥니다.
+        """
+        now = time.monotonic()
+        self.governor.record_latency(now - received_at)
+        fps = self.governor.adjust(now)
+        if fps is None:
+            return None
+        return {"control": "rate", "max_fps": fps}
+
+
+class PoseConsumer(PoseGameMixin, WebsocketConsumer):
+    send = timed_stage("send")(WebsocketConsumer.send)
 
-class PoseConsumer(WebsocketConsumer):
     def connect(self):
         self.accept()
-        # 지수 평활을 위한 smoothed_pred 변수 초기화 (없으면 첫 프레임의 값 사용)
-        self.smoothed_pred = None
-        state = {
-            "target_pose": random.choice(POSES),
-            "start_time": None,
-            "pose_buffer": []
-        }
-        cache.set(self.channel_name, state, timeout=CACHE_TIMEOUT)
-        self.send(json.dumps({
-            "target": state["target_pose"],
-            "message": "Game started!"
-        }))
+        self.resolve_session()
+        store = get_state_store()
+        message = self.start_game(store.load(self.state_key), store.load(self.buffer_key))
+        metrics.ACTIVE_CONNECTIONS.inc()
+        store.save(self.state_key, self.hold.to_dict())
+        self.send(json.dumps(message))
 
     def receive(self, text_data=None, bytes_data=None):
-        data = json.loads(text_data or "{}")
-        # 클라이언트는 13개 관절의 x, y, z 좌표 총 39개 값의 리스트를 전송해야 합니다.
-        coords = data.get("coords", [])
-        state = cache.get(self.channel_name) or {
-            "target_pose": random.choice(POSES),
-            "start_time": None,
-            "pose_buffer": []
-        }
+        received_at = time.monotonic()
+        metrics.FRAMES_RECEIVED.inc()
+        # 허용 fps보다 빨리 들어온 프레임(소켓 큐에 밀려 있던 프레임 포함)은 처리하지 않습니다.
+        if not self.governor.admit(received_at):
+            metrics.FRAMES_DROPPED.inc()
+            return
         try:
-            if len(coords) != 39:
-                raise ValueError("좌표 길이가 올바르지 않습니다. 39개의 값이 필요합니다.")
-            # (13, 3) 배열로 변환
-            landmarks = np.array(coords, dtype=float).reshape(13, 3)
-            # 학습 시와 동일한 정규화 수행 → 39차원 벡터
-            normalized = self.normalize_landmarks(landmarks)
-            # 각도 계산을 위해 (13, 3) 배열로 재구성
-            norm_landmarks = normalized.reshape(13, 3)
-            # 2D, 3D 각도 피처 계산 (각각 12개)
-            angles_2d = self.compute_joint_angles(norm_landmarks, dim="2d").tolist()
-            angles_3d = self.compute_joint_angles(norm_landmarks, dim="3d").tolist()
-            # 전체 입력 특징: 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12) → 총 63차원
-            input_features = np.concatenate([normalized, angles_2d, angles_3d]).reshape(1, -1)
-
-            # 모델 예측 (softmax 확률 벡터)
-            pred_probs = model.predict(input_features)[0]
-            # 지수 평활법 적용: 첫 프레임이면 그대로, 이후에는 이전 평활값과 혼합
-            if self.smoothed_pred is None:
-                self.smoothed_pred = pred_probs
-            else:
-                self.smoothed_pred = ALPHA * pred_probs + (1 - ALPHA) * self.smoothed_pred
-
-            pred_idx = np.argmax(self.smoothed_pred)
-            pose_label = label_encoder.inverse_transform([pred_idx])[0]
-
-            now = time.time()
-            if pose_label == state["target_pose"]:
-                if state["start_time"] is None:
-                    state["start_time"] = now
-                    state["pose_buffer"] = []
-                state["pose_buffer"].append(coords)
-                if now - state["start_time"] >= 5:
-                    new_target = random.choice([p for p in POSES if p != state["target_pose"]])
-                    response = {
-                        "pose": pose_label,
-                        "target": state["target_pose"],
-                        "effect": "success",
-                        "message": "5초 이상 유지되었습니다."
-                    }
-                    state = {
-                        "target_pose": new_target,
-                        "start_time": None,
-                        "pose_buffer": []
-                    }
-                    cache.set(self.channel_name, state, timeout=CACHE_TIMEOUT)
-                    return self.send(json.dumps(response))
-            else:
-                state = {
-                    "target_pose": state["target_pose"],
-                    "start_time": None,
-                    "pose_buffer": []
-                }
-            cache.set(self.channel_name, state, timeout=CACHE_TIMEOUT)
-            self.send(json.dumps({
-                "pose": pose_label,
-                "target": state["target_pose"]
-            }))
+            coords, seq, features = self.parse_frame(text_data, bytes_data)
+        except ValueError as e:
+            return self.send(json.dumps({"error": str(e)}))
+        if coords is None:
+            return
+        self.process_frame(coords, seq, features)
+        control = self.rate_control(received_at)
+        if control:
+            self.send(json.dumps(control))
+
+    def process_frame(self, coords, seq=None, client_features=None):
+        try:
+            normalized, input_features = self.prepare_frame(coords, client_features)
+            now = time.monotonic()
+            prediction = self.cached_prediction(normalized, now)
+            if prediction is None:
+                if input_features is None:
+                    input_features = self.extract_features(coords, normalized)
+                prediction = self.infer(input_features)
+                self.prediction_cache.store(normalized, prediction, now)
+            pred_probs, label_encoder = prediction
+            pose_label, event = self.smooth_prediction(pred_probs, label_encoder)
+            response, transitioned = self.update_hold(pose_label, coords, event)
+            if seq is not None:
+                response["seq"] = seq
+            if client_features is not None and not self.client_features_trusted:
+                response["features"] = None
+            self.save_state(transitioned)
+            self.send(json.dumps(response))
         except Exception as e:
             self.send(json.dumps({"error": str(e)}))
 
+    @timed_stage("inference")
+    def infer(self, input_features):
+        # 모델 예측 (softmax 확률 벡터, 레이블 인코더)
+        # 프레임 하나는 처음 잡은 모델로 끝까지 처리 (도중에 모델이 교체되어도 예측·라벨 버전 일치)
+        loaded = get_loaded()
+        return loaded.model.predict(input_features.reshape(1, -1))[0], loaded.label_encoder
+
+    @timed_stage("state")
+    def save_state(self, transitioned):
+        store = get_state_store()
+        store.save(self.state_key, self.hold.to_dict())
+        if self.buffer_flush_due(transitioned):
+            store.save(self.buffer_key, self.pose_buffer.to_array())
+
     def disconnect(self, close_code):
-        cache.delete(self.channel_name)
+        if not hasattr(self, "hold") or self.released:
+            return
+        self.released = True
+        metrics.ACTIVE_CONNECTIONS.dec()
+        self.smoothing.release(self.slot)
+        # 재연결에 대비해 마지막 상태를 POSE_STATE_RECONNECT_TTL 동안 남깁니다.
+        store = get_state_store()
+        store.release(self.state_key, self.hold.to_dict(), POSE_STATE_RECONNECT_TTL)
+        store.release(self.buffer_key, self.pose_buffer.to_array(), POSE_STATE_RECONNECT_TTL)
+
+
+class AsyncPoseConsumer(PoseGameMixin, AsyncWebsocketConsumer):
+    """
+    PoseConsumer의 비동기 버전입니다.
+    프레임마다 model.predict를 호출하지 않고 공유 InferenceScheduler에 맡겨,
+    모든 연결의 프레임을 하나의 배치로 묶어 추론합니다.
+    POSE_INFERENCE_MODE="remote"이면 배치를 추론 워커 프로세스 풀에 보내므로 이 프로세스는 소켓 I/O만 담당합니다.
+    추론 중에 도착한 프레임은 최신 프레임 하나로 합쳐지므로 소켓 큐에 지연이 쌓이지 않습니다.
+    열린 연결은 ConnectionReaper(liveness.py)에 등록되어, 조용하면 ping을 받고 POSE_IDLE_TIMEOUT이 지나면 닫힙니다.
+    게임은 AdmissionController(admission.py)가 자리를 줄 때 시작하며, 그 전까지는 대기실 순번만 받습니다.
+    """
 
-    def normalize_landmarks(self, landmarks: np.ndarray) -> np.ndarray:
+    send = timed_stage("send")(AsyncWebsocketConsumer.send)
+
+    async def connect(self):
+        await self.accept()
+        self.pending_frame = None
+        self.frame_task = None
+        self.left = False
+        self.resolve_session()
+        # 대기실에 있는 동안에도 ping을 주고받고, 응답이 없으면 정리합니다.
+        get_reaper().register(self)
+        if not await get_admission().enter(self):
+            await self.close(code=WAITING_ROOM_FULL_CLOSE_CODE)
+
+    async def start_session(self):
+        """자리를 받은 연결의 게임을 시작합니다. (자리가 있으면 connect에서 바로, 없으면 대기열에서 차례가 되었을 때)"""
+        store = get_state_store()
+        hold_data, buffer_data = await store.aload(self.state_key), await store.aload(self.buffer_key)
+        if self.left:
+            # 상태를 불러오는 동안 연결이 끊겼습니다. (자리는 disconnect에서 이미 반납)
+            return
+        message = self.start_game(hold_data, buffer_data)
+        metrics.ACTIVE_CONNECTIONS.inc()
+        await store.asave(self.state_key, self.hold.to_dict())
+        await self.send(json.dumps(message))
+
+    async def receive(self, text_data=None, bytes_data=None):
+        received_at = time.monotonic()
+        get_reaper().seen(self)
+        if not hasattr(self, "hold"):
+            # 대기실에 있는 동안 받은 프레임은 처리하지 않습니다.
+            return
+        metrics.FRAMES_RECEIVED.inc()
+        if not self.governor.admit(received_at):
+            metrics.FRAMES_DROPPED.inc()
+            return
+        try:
+            coords, seq, features = self.parse_frame(text_data, bytes_data)
+        except ValueError as e:
+            return await self.send(json.dumps({"error": str(e)}))
+        if coords is None:
+            return
+        # 이전 프레임을 처리하는 동안 도착한 프레임은 가장 최신 것 하나만 남기고 버립니다.
+        if self.pending_frame is not None:
+            self.governor.record_drop()
+            metrics.FRAMES_DROPPED.inc()
+        self.pending_frame = (coords, seq, features, received_at)
+        if self.frame_task is None or self.frame_task.done():
+            self.frame_task = asyncio.ensure_future(self.process_pending_frames())
+
+    async def process_pending_frames(self):
+        while self.pending_frame is not None:
+            coords, seq, features, received_at = self.pending_frame
+            self.pending_frame = None
+            await self.process_frame(coords, seq, features)
+            control = self.rate_control(received_at)
+            if control:
+                await self.send(json.dumps(control))
+
+    async def process_frame(self, coords, seq=None, client_features=None):
+        try:
+            normalized, input_features = self.prepare_frame(coords, client_features)
+            now = time.monotonic()
+            prediction = self.cached_prediction(normalized, now)
+            if prediction is None:
+                if input_features is None:
+                    input_features = self.extract_features(coords, normalized)
+                prediction = await self.infer(input_features)
+                self.prediction_cache.store(normalized, prediction, now)
+            pred_probs, label_encoder = prediction
+            pose_label, event = await self.smooth_prediction(pred_probs, label_encoder)
+            response, transitioned = self.update_hold(pose_label, coords, event)
+            if seq is not None:
+                response["seq"] = seq
+            if client_features is not None and not self.client_features_trusted:
+                response["features"] = None
+            await self.save_state(transitioned)
+            await self.send(json.dumps(response))
+        except Exception as e:
+            await self.send(json.dumps({"error": str(e)}))
+
+    async def smooth_prediction(self, pred_probs, label_encoder=None):
         """
-        13개 관절(각각 3D 좌표)을 학습 시 전처리와 동일하게 정규화합니다.
-        landmark 순서는 [0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]이며,
-        정규화는 좌표 중심(왼쪽/오른쪽 엉덩이 평균)과 torso 크기를 기준으로 진행됩니다.
+        같은 이벤트 루프 차례에 깨어난 연결들(보통 같은 추론 배치)과 함께 엔진을 한 번에 진행합니다.
+        → (자세 라벨, 유지 이벤트)
         """
-        torso_size_multiplier = 2.5
-        # 중심: 왼쪽 엉덩이(인덱스 7)와 오른쪽 엉덩이(인덱스 8)의 평균 (x, y만 사용)
-        center = (landmarks[7, :2] + landmarks[8, :2]) / 2.0
-        # 어깨: 왼쪽 어깨(인덱스 1)와 오른쪽 어깨(인덱스 2)의 평균
-        shoulders = (landmarks[1, :2] + landmarks[2, :2]) / 2.0
-        torso_size = np.linalg.norm(shoulders - center)
-        max_distance = torso_size * torso_size_multiplier
-        for lm in landmarks:
-            dist = np.linalg.norm(lm[:2] - center)
-            if dist > max_distance:
-                max_distance = dist
-        norm_landmarks = []
-        for lm in landmarks:
-            norm_x = (lm[0] - center[0]) / max_distance
-            norm_y = (lm[1] - center[1]) / max_distance
-            norm_z = lm[2] / max_distance
-            norm_landmarks.extend([norm_x, norm_y, norm_z])
-        return np.array(norm_landmarks)
-
-    def compute_joint_angles(self, landmarks: np.ndarray, dim="3d") -> np.ndarray:
+        label_encoder = label_encoder or get_loaded().label_encoder
+        label, event = await self.smoothing.astep(self.slot, pred_probs, class_map(label_encoder, tuple(POSES)))
+        return self.decode_label(label, label_encoder), event
+
+    @timed_stage("inference")
+    async def infer(self, input_features):
         """
-        연결 관계 기반으로 2D 혹은 3D 각도를 계산합니다.
-        dim="2d"인 경우 x, y 좌표만 사용하며, 그렇지 않으면 3D 좌표 전체를 사용합니다.
-        연결 관계는 학습 코드와 동일하게 아래와 같이 정의됩니다.
-          1: [0, 3, 7],
-          2: [0, 4, 8],
-          3: [1, 5],
-          4: [2, 6],
-          7: [1, 9],
-          8: [2, 10],
-          9: [7, 11],
-          10: [8, 12]
+        (확률 벡터, 레이블 인코더). "remote" 모드에서는 추론 워커 풀에 맡기고,
+        아니면 프레임이 잡은 모델로 프로세스 내 스케줄러에서 배치 추론합니다.
         """
-        connections = {
-            1: [0, 3, 7],
-            2: [0, 4, 8],
-            3: [1, 5],
-            4: [2, 6],
-            7: [1, 9],
-            8: [2, 10],
-            9: [7, 11],
-            10: [8, 12]
-        }
-        angle_list = []
-        for joint, neighbors in connections.items():
-            if dim == "2d":
-                center = landmarks[joint, :2]
-            else:
-                center = landmarks[joint]
-            for (i, j) in combinations(neighbors, 2):
-                if dim == "2d":
-                    v1 = landmarks[i, :2] - center
-                    v2 = landmarks[j, :2] - center
-                else:
-                    v1 = landmarks[i] - center
-                    v2 = landmarks[j] - center
-                norm1 = np.linalg.norm(v1) + 1e-8
-                norm2 = np.linalg.norm(v2) + 1e-8
-                v1_norm = v1 / norm1
-                v2_norm = v2 / norm2
-                cosine = np.clip(np.dot(v1_norm, v2_norm), -1, 1)
-                angle = np.arccos(cosine)
-                angle_list.append(angle)
-        return np.array(angle_list)
+        if INFERENCE_MODE == "remote":
+            return await get_remote_scheduler().predict(input_features)
+        loaded = get_loaded()
+        return await get_scheduler().predict(input_features, loaded), loaded.label_encoder
+
+    @timed_stage("state")
+    async def save_state(self, transitioned):
+        store = get_state_store()
+        await store.asave(self.state_key, self.hold.to_dict())
+        if self.buffer_flush_due(transitioned):
+            await store.asave(self.buffer_key, self.pose_buffer.to_array())
+
+    async def disconnect(self, close_code):
+        self.left = True
+        get_reaper().unregister(self)
+        await get_admission().leave(self)
+        # 유휴 연결은 reaper가 닫으면서 바로 호출하므로, 이후 서버의 disconnect에서는 아무것도 하지 않습니다.
+        if not hasattr(self, "hold") or self.released:
+            return
+        self.released = True
+        metrics.ACTIVE_CONNECTIONS.dec()
+        if self.frame_task is not None:
+            self.frame_task.cancel()
+        self.smoothing.release(self.slot)
+        store = get_state_store()
+        await store.arelease(self.state_key, self.hold.to_dict(), POSE_STATE_RECONNECT_TTL)
+        await store.arelease(self.buffer_key, self.pose_buffer.to_array(), POSE_STATE_RECONNECT_TTL)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+
+# 서버가 클라이언트에 허용하는 프레임 전송률(fps) 범위와 감속 기준
+POSE_MAX_FPS = getattr(settings, "POSE_MAX_FPS", 20)
+POSE_MIN_FPS = getattr(settings, "POSE_MIN_FPS", 5)
+POSE_LATENCY_HIGH_MS = getattr(settings, "POSE_LATENCY_HIGH_MS", 100)
+POSE_DROP_RATIO_HIGH = getattr(settings, "POSE_DROP_RATIO_HIGH", 0.25)
+
+# 허용 fps보다 이만큼 빨리 도착한 프레임까지는 받아들입니다 (네트워크 지터 여유).
+FPS_SLACK = 1.5
+# 전송률 조정 주기(초)와 감속/가속 폭
+ADJUST_WINDOW = 1.0
+SLOWDOWN_FACTOR = 0.7
+SPEEDUP_STEP = 2
+LATENCY_EMA_ALPHA = 0.2
+
+
+class FrameRateGovernor:
+    """
+    연결별 프레임 처리율을 관리합니다.
+    - admit: 허용 fps보다 너무 빨리 들어온 프레임(밀린 큐 포함)을 버립니다.
+    - record_latency / record_drop: 처리 지연과 버려진 프레임 수를 기록합니다.
+    - adjust: ADJUST_WINDOW마다 지연·드롭 비율을 보고 fps를 낮추거나 올리며, 바뀐 경우 새 fps를 반환합니다.
+    """
+
+    def __init__(self, max_fps=POSE_MAX_FPS, min_fps=POSE_MIN_FPS,
+                 latency_high_ms=POSE_LATENCY_HIGH_MS, drop_ratio_high=POSE_DROP_RATIO_HIGH):
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.latency_high = latency_high_ms / 1000.0
+        self.drop_ratio_high = drop_ratio_high
+        self.fps = max_fps
+        self.latency_ema = None
+        self.last_admitted = None
+        self.window_start = time.monotonic()
+        self.processed = 0
+        self.dropped = 0
+
+    def admit(self, now) -> bool:
+        if self.last_admitted is not None and now - self.last_admitted < 1.0 / (self.fps * FPS_SLACK):
+            self.dropped += 1
+            return False
+        self.last_admitted = now
+        return True
+
+    def record_drop(self):
+        self.dropped += 1
+
+    def record_latency(self, latency):
+        self.processed += 1
+        if self.latency_ema is None:
+            self.latency_ema = latency
+        else:
+            self.latency_ema = LATENCY_EMA_ALPHA * latency + (1 - LATENCY_EMA_ALPHA) * self.latency_ema
+
+    def adjust(self, now):
+        if now - self.window_start < ADJUST_WINDOW:
+            return None
+        total = self.processed + self.dropped
+        drop_ratio = self.dropped / total if total else 0.0
+        latency = self.latency_ema or 0.0
+        self.window_start = now
+        self.processed = 0
+        self.dropped = 0
+
+        fps = self.fps
+        if latency > self.latency_high or drop_ratio > self.drop_ratio_high:
+            fps = max(self.min_fps, int(self.fps * SLOWDOWN_FACTOR))
+        elif latency < self.latency_high / 2 and drop_ratio == 0:
+            fps = min(self.max_fps, self.fps + SPEEDUP_STEP)
+        if fps == self.fps:
+            return None
+        self.fps = fps
+        return fps
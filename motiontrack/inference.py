@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from dnn.features import FEATURE_DIM
+from dnn.model_loader import LabelClasses, get_loaded
+
+# 마이크로 배치 기본값 (settings에서 덮어쓸 수 있음)
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# "local": WebSocket 워커 프로세스 안에서 추론 / "remote": manage.py inference_worker 프로세스 풀에 위임
+INFERENCE_MODE = getattr(settings, "POSE_INFERENCE_MODE", "local")
+# 추론 워커들이 나누어 받는 channel layer 채널 이름
+INFERENCE_CHANNEL = getattr(settings, "POSE_INFERENCE_CHANNEL", "pose-inference")
+# 원격 배치 응답 대기 시간(초)과 프로세스당 동시에 보낼 수 있는 배치 수
+INFERENCE_TIMEOUT = getattr(settings, "POSE_INFERENCE_TIMEOUT", 2.0)
+INFERENCE_MAX_IN_FLIGHT = getattr(settings, "POSE_INFERENCE_MAX_IN_FLIGHT", 8)
+
+
+def model_predict(features: np.ndarray, loaded=None) -> np.ndarray:
+    """배치 단위 추론 (N, 63) → (N, 클래스 수). loaded를 주면 그 모델로, 없으면 현재 서빙 중인 모델로 추론"""
+    return (loaded or get_loaded()).model.predict(features, verbose=0)
+
+
+class InferenceScheduler:
+    """
+    여러 WebSocket 연결에서 들어온 프레임을 하나의 배치로 모아 한 번의 forward pass로 추론합니다.
+    배치는 max_batch_size개가 모이거나, 첫 프레임이 들어온 뒤 max_wait_ms가 지나면 실행됩니다.
+    추론은 전용 스레드 한 개에서 실행되므로 이벤트 루프는 그동안 다음 배치를 계속 모읍니다.
+    """
+
+    def __init__(self, predict_fn=model_predict, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pose-inference")
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def _ensure_worker(self):
+        # 이벤트 루프가 바뀌면(테스트, 워커 재시작 등) 큐와 배치 태스크를 새 루프에 다시 만듭니다.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def predict(self, features: np.ndarray, loaded=None) -> np.ndarray:
+        """
+        63차원 특징 벡터 한 개를 큐에 넣고, 배치 추론이 끝나면 해당 행의 확률 벡터를 돌려줍니다.
+        loaded(model_loader.LoadedModel)를 주면 그 모델로 추론합니다. (모델 교체 중에도 프레임이 잡은 버전 유지)
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((features, future, loaded))
+        return await future
+
+    def _predict(self, features, loaded):
+        return self.predict_fn(features) if loaded is None else self.predict_fn(features, loaded)
+
+    async def _collect(self):
+        first = await self._queue.get()
+        batch = [first]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # 이미 도착한 프레임은 기다리지 않고 바로 가져옵니다.
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # 모델 교체 직후에는 이전·새 모델을 잡은 프레임이 섞일 수 있으므로 모델별로 나누어 추론합니다.
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[2]), []).append(item)
+            for group in groups.values():
+                features = np.stack([item[0] for item in group])
+                try:
+                    probs = await self._loop.run_in_executor(self._executor, self._predict, features, group[0][2])
+                except Exception as e:
+                    for _, future, _ in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future, _), row in zip(group, probs):
+                    if not future.done():
+                        future.set_result(row)
+
+
+_scheduler = None
+
+
+def get_scheduler() -> InferenceScheduler:
+    """프로세스 전역에서 공유하는 InferenceScheduler를 반환합니다."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = InferenceScheduler(
+            max_batch_size=getattr(settings, "POSE_BATCH_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE),
+            max_wait_ms=getattr(settings, "POSE_BATCH_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS),
+        )
+    return _scheduler
+
+
+class RemoteInferenceError(Exception):
+    pass
+
+
+class RemoteInferenceScheduler(InferenceScheduler):
+    """
+    InferenceScheduler와 같은 방식으로 모은 배치를 channel layer의 INFERENCE_CHANNEL로 보내고,
+    이 프로세스 전용 응답 채널(channel_name)로 돌아온 결과를 각 프레임에 나누어 줍니다.
+    추론 워커(InferenceWorker)가 여러 프로세스에 떠 있으면 배치를 나누어 받아 병렬로 처리하므로,
+    응답을 기다리는 동안에도 최대 max_in_flight개의 배치를 더 보냅니다.
+    predict()는 (확률 벡터, 레이블 인코더) 쌍을 돌려줍니다. (WebSocket 워커는 모델을 로드하지 않음)
+    """
+
+    def __init__(self, channel_layer=None, channel=INFERENCE_CHANNEL, timeout=INFERENCE_TIMEOUT,
+                 max_in_flight=INFERENCE_MAX_IN_FLIGHT, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        super().__init__(None, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.channel_layer = channel_layer
+        self.channel = channel
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._ids = itertools.count()
+        self._label_classes = {}
+
+    async def _run(self):
+        layer = self.channel_layer or get_channel_layer()
+        reply_channel = await layer.new_channel("pose-inference-reply.")
+        replies = {}
+        reader = self._loop.create_task(self._read_replies(layer, reply_channel, replies))
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        try:
+            while True:
+                batch = await self._collect()
+                await in_flight.acquire()
+                task = self._loop.create_task(self._dispatch(layer, reply_channel, replies, batch))
+                task.add_done_callback(lambda _: in_flight.release())
+        finally:
+            reader.cancel()
+
+    async def _read_replies(self, layer, reply_channel, replies):
+        while True:
+            message = await layer.receive(reply_channel)
+            future = replies.get(message["id"])
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    async def _dispatch(self, layer, reply_channel, replies, batch):
+        batch_id = next(self._ids)
+        replies[batch_id] = reply = self._loop.create_future()
+        features = np.stack([item[0] for item in batch]).astype(np.float32)
+        try:
+            await layer.send(self.channel, {
+                "type": "inference.batch", "id": batch_id, "reply_channel": reply_channel,
+                "rows": len(batch), "features": features.tobytes(),
+            })
+            message = await asyncio.wait_for(reply, self.timeout)
+            if "error" in message:
+                raise RemoteInferenceError(message["error"])
+            probs = np.frombuffer(message["probs"], dtype=np.float32).reshape(len(batch), -1)
+            label_encoder = self._labels(message["classes"])
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = RemoteInferenceError(f"추론 워커가 {self.timeout}s 안에 응답하지 않았습니다.")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            replies.pop(batch_id, None)
+        for (_, future, _), row in zip(batch, probs):
+            if not future.done():
+                future.set_result((row, label_encoder))
+
+    def _labels(self, classes):
+        key = tuple(classes)
+        if key not in self._label_classes:
+            self._label_classes[key] = LabelClasses(classes)
+        return self._label_classes[key]
+
+
+class InferenceWorker:
+    """
+    INFERENCE_CHANNEL에서 배치를 하나씩 받아 현재 서빙 중인 모델로 추론하고 요청한 reply_channel로 응답합니다.
+    (manage.py inference_worker가 프로세스마다 하나씩 실행. 테스트에서는 InMemoryChannelLayer와 같은 루프에서 실행)
+    """
+
+    def __init__(self, channel_layer=None, channel=INFERENCE_CHANNEL):
+        self.channel_layer = channel_layer
+        self.channel = channel
+        self.batches = 0
+
+    async def run(self):
+        layer = self.channel_layer or get_channel_layer()
+        while True:
+            message = await layer.receive(self.channel)
+            await layer.send(message["reply_channel"], self.handle(message))
+            self.batches += 1
+
+    def handle(self, message):
+        try:
+            loaded = get_loaded()
+            features = np.frombuffer(message["features"], dtype=np.float32).reshape(message["rows"], FEATURE_DIM)
+            probs = np.asarray(loaded.model.predict(features, verbose=0), dtype=np.float32)
+        except Exception as e:
+            return {"type": "inference.result", "id": message["id"], "error": str(e)}
+        return {
+            "type": "inference.result", "id": message["id"], "probs": probs.tobytes(),
+            "classes": loaded.label_encoder.classes_.tolist(), "version": loaded.version,
+        }
+
+
+_remote_scheduler = None
+
+
+def get_remote_scheduler() -> RemoteInferenceScheduler:
+    """INFERENCE_MODE가 "remote"일 때 프로세스 전역에서 공유하는 RemoteInferenceScheduler를 반환합니다."""
+    global _remote_scheduler
+    if _remote_scheduler is None:
+        _remote_scheduler = RemoteInferenceScheduler(
+            max_batch_size=getattr(settings, "POSE_BATCH_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE),
+            max_wait_ms=getattr(settings, "POSE_BATCH_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS),
+        )
+    return _remote_scheduler
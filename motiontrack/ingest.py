@@ -0,0 +1,418 @@
+"""
+/submit_score/ 점수 기록을 모아서 DB에 쓰는 write-behind 수집기입니다.
+
+submit_score는 검증한 기록을 로컬 스풀 파일(JSON Lines)에 추가한 뒤 바로 응답하고,
+백그라운드 스레드가 POSE_SCORE_BATCH_SIZE개가 모이거나 POSE_SCORE_FLUSH_INTERVAL이 지나면
+한 트랜잭션에서 Session을 일괄 upsert하고 Score를 bulk_create합니다.
+
+스풀 파일은 기록이 DB에 커밋된 뒤에야 삭제되므로 프로세스가 죽어도 기록이 사라지지 않고,
+다음에 시작한 프로세스가 주인 없는 스풀 파일을 찾아 다시 씁니다.
+(커밋 직후 삭제 전에 죽으면 같은 기록이 한 번 더 들어갈 수 있습니다: at-least-once)
+일괄 저장이 실패하면 기록을 하나씩 다시 쓰고, DB가 값 때문에 거부한 기록은 스풀 디렉터리의
+dead-letter/ 파일로 옮겨 그 뒤의 기록이 막히지 않게 합니다.
+각 스풀 파일은 쓰는 프로세스가 flock으로 잠그므로 여러 워커가 같은 디렉터리를 공유해도 됩니다.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import leaderboard
+from .models import Score, Session
+
+logger = logging.getLogger(__name__)
+
+# "buffered": 스풀 + 일괄 쓰기, "sync": 요청마다 바로 DB에 쓰기
+SCORE_INGEST_MODE = getattr(settings, "POSE_SCORE_INGEST", "sync")
+SCORE_BATCH_SIZE = getattr(settings, "POSE_SCORE_BATCH_SIZE", 200)
+SCORE_FLUSH_INTERVAL = getattr(settings, "POSE_SCORE_FLUSH_INTERVAL", 0.5)
+SCORE_SPOOL_DIR = getattr(settings, "POSE_SCORE_SPOOL_DIR", os.path.join(settings.BASE_DIR, "spool", "scores"))
+SCORE_SPOOL_FSYNC = getattr(settings, "POSE_SCORE_SPOOL_FSYNC", True)
+
+# 스풀 디렉터리 안에서 저장할 수 없는 기록을 모아 두는 하위 디렉터리 (복구 대상 *.jsonl과 섞이지 않게)
+DEAD_LETTER_DIR = "dead-letter"
+# 다시 시도해도 같은 결과인 기록 자체의 오류 (DB 연결 오류 등은 다음 flush에 다시 시도)
+RECORD_ERRORS = (DataError, IntegrityError, OverflowError, ValueError, TypeError, KeyError)
+# Score.success_count(IntegerField)가 모든 DB에서 담을 수 있는 최대값
+MAX_SUCCESS_COUNT = 2 ** 31 - 1
+
+
+def write_batch(records):
+    """
+    검증된 점수 기록들을 한 트랜잭션으로 저장하고 리더보드 캐시에 반영합니다. (캐시 반영 실패는 기록하고 넘어감)
+    세션은 session_id로 한 번에 조회하고, 없는 세션만 bulk_create(ignore_conflicts)로 만듭니다.
+    """
+    if not records:
+        return []
+    with transaction.atomic():
+        session_ids = {record["session_id"] for record in records}
+        sessions = Session.objects.in_bulk(session_ids, field_name="session_id")
+        missing = {}
+        for record in records:
+            if record["session_id"] not in sessions and record["session_id"] not in missing:
+                missing[record["session_id"]] = Session(
+                    session_id=record["session_id"],
+                    start_time=parse_datetime(record["created_at"]),
+                    ip_address=record["ip_address"],
+                    user_agent=record["user_agent"],
+                )
+        if missing:
+            # 다른 워커가 같은 세션을 먼저 만들었을 수 있으므로 충돌은 무시하고 다시 조회합니다.
+            Session.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            sessions.update(Session.objects.in_bulk(missing.keys(), field_name="session_id"))
+
+        scores = [
+            Score(
+                session=sessions[record["session_id"]],
+                total_time=record["total_time"],
+                set1_time=record["set1_time"],
+                set2_time=record["set2_time"],
+                success_count=record["success_count"],
+                average_hold_time=record["average_hold_time"],
+                created_at=parse_datetime(record["created_at"]),
+            )
+            for record in records
+        ]
+        Score.objects.bulk_create(scores)
+        if any(score.pk is None for score in scores):
+            _fill_pks(scores)
+    try:
+        leaderboard.record_many(scores)
+    except Exception:
+        # 점수는 이미 커밋되었으므로 캐시 오류로 다시 저장(재시도·스풀)하지 않고, 해당 기간의 캐시만 버립니다.
+        logger.warning("리더보드 캐시에 점수 %d개를 반영하지 못해 캐시를 지웁니다.", len(scores), exc_info=True)
+        try:
+            leaderboard.invalidate_scores(scores)
+        except Exception:
+            logger.warning("리더보드 캐시를 지우지 못했습니다. (만료될 때까지 새 점수가 빠질 수 있음)", exc_info=True)
+    return scores
+
+
+def _fill_pks(scores):
+    """
+    bulk_create가 pk를 돌려주지 않는 DB(MySQL)에서 방금 넣은 점수들의 id를 같은 트랜잭션에서 다시 조회합니다.
+    (세션, 제출 시각, 기록)이 같은 행이 여러 개면 나중에 넣은 점수에 큰 id를 줍니다. pk가 없으면 리더보드 캐시를 지우게 됩니다.
+    """
+    ids = {}
+    rows = (
+        Score.objects
+        .filter(session_id__in={score.session_id for score in scores},
+                created_at__in={score.created_at for score in scores})
+        .order_by("-id")
+        .values_list("id", "session_id", "created_at", "total_time")
+    )
+    for pk, session_id, created_at, total_time in rows:
+        ids.setdefault((session_id, created_at, total_time), []).append(pk)
+    for score in reversed(scores):
+        found = ids.get((score.session_id, score.created_at, score.total_time))
+        if found:
+            score.pk = found.pop(0)
+
+
+class _SpoolSegment:
+    """flock으로 잠근 스풀 파일 하나. 안의 기록이 모두 커밋되면 remove()로 지웁니다."""
+
+    def __init__(self, path, file):
+        self.path = path
+        self.file = file
+        self.count = 0
+
+    @classmethod
+    def create(cls, directory):
+        path = os.path.join(directory, f"{uuid.uuid4().hex}.jsonl")
+        file = open(path, "a+", encoding="utf-8")
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return cls(path, file)
+
+    @classmethod
+    def adopt(cls, path):
+        """다른 프로세스가 잠그고 있지 않은 스풀 파일을 넘겨받습니다. 사용 중이면 None"""
+        try:
+            file = open(path, "a+", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return None
+        if not os.path.exists(path):
+            # 잠그는 사이에 원래 주인이 커밋하고 지운 파일
+            file.close()
+            return None
+        return cls(path, file)
+
+    def append(self, record, fsync):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        self.count += 1
+
+    def read(self):
+        self.file.seek(0)
+        records = []
+        for line in self.file:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # 쓰던 도중 죽어 잘린 마지막 줄
+                logger.warning("손상된 스풀 기록을 건너뜁니다: %s", self.path)
+        self.count = len(records)
+        return records
+
+    def remove(self):
+        os.unlink(self.path)
+        self.file.close()
+
+
+class ScoreIngestor:
+    """
+    점수 기록을 스풀에 쓰고 모아서 write_batch로 저장합니다.
+    submit은 요청 스레드에서, flush는 백그라운드 스레드(또는 종료 시 atexit)에서 호출됩니다.
+    """
+
+    def __init__(self, spool_dir, batch_size=SCORE_BATCH_SIZE, interval=SCORE_FLUSH_INTERVAL,
+                 fsync=SCORE_SPOOL_FSYNC, autostart=True):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fsync = fsync
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pending = []
+        self._sealed = []
+        os.makedirs(spool_dir, exist_ok=True)
+        self._recover()
+        self._segment = _SpoolSegment.create(spool_dir)
+
+    def _recover(self):
+        """이전 프로세스가 남긴 스풀 파일의 기록을 다음 flush에 포함시킵니다."""
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "*.jsonl"))):
+            segment = _SpoolSegment.adopt(path)
+            if segment is None:
+                continue
+            records = segment.read()
+            logger.info("스풀 파일 %s에서 점수 기록 %d개를 복구합니다.", path, len(records))
+            self._pending.extend(records)
+            self._sealed.append(segment)
+
+    def submit(self, record):
+        with self._lock:
+            self._segment.append(record, self.fsync)
+            self._pending.append(record)
+            full = len(self._pending) >= self.batch_size
+            if self.autostart and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="score-ingest-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """모인 기록을 DB에 쓰고 저장한 기록 수를 반환합니다. DB 연결 오류 등으로 쓰지 못한 기록은 다음 flush로 남습니다."""
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending = self._pending, []
+                segments, self._sealed = self._sealed, []
+                if self._segment.count:
+                    segments.append(self._segment)
+                    self._segment = _SpoolSegment.create(self.spool_dir)
+            try:
+                write_batch(records)
+                written = len(records)
+            except Exception:
+                logger.warning("점수 기록 %d개의 일괄 저장에 실패해 하나씩 다시 저장합니다.", len(records), exc_info=True)
+                written = self._write_each(records, segments)
+            for segment in segments:
+                segment.remove()
+            return written
+
+    def _write_each(self, records, segments):
+        """
+        기록을 하나씩 저장합니다. 값 때문에 거부된 기록은 dead-letter 파일로 옮기고,
+        그 밖의 오류(DB 연결 등)가 나면 남은 기록만 새 스풀 파일에 옮기고(원래 스풀 파일 segments는 삭제)
+        다음 flush로 넘긴 뒤 다시 raise합니다.
+        """
+        written = 0
+        for index, record in enumerate(records):
+            try:
+                write_batch([record])
+            except RECORD_ERRORS as e:
+                self._dead_letter(record, e)
+            except Exception:
+                remaining = records[index:]
+                segment = _SpoolSegment.create(self.spool_dir)
+                for pending in remaining:
+                    segment.append(pending, self.fsync)
+                with self._lock:
+                    self._pending[:0] = remaining
+                    self._sealed.insert(0, segment)
+                for old_segment in segments:
+                    old_segment.remove()
+                raise
+            else:
+                written += 1
+        return written
+
+    def _dead_letter(self, record, error):
+        logger.error("저장할 수 없는 점수 기록을 %s로 옮깁니다: %r", DEAD_LETTER_DIR, error)
+        directory = os.path.join(self.spool_dir, DEAD_LETTER_DIR)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "scores.jsonl"), "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(json.dumps({"record": record, "error": repr(error)}, default=str) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush_in_thread()
+
+    def _flush_in_thread(self):
+        # 요청 밖의 스레드라 Django가 끊긴 DB 연결(MySQL wait_timeout, 서버 재시작)을 정리해 주지 않으므로
+        # flush 전후에 직접 정리합니다. 그대로 두면 다시 연결하지 않아 이후 flush가 모두 실패합니다.
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("점수 기록 일괄 저장에 실패했습니다. 다음 주기에 다시 시도합니다.")
+        finally:
+            close_old_connections()
+
+
+def validate_score(data) -> dict:
+    """
+    submit_score 요청 본문의 점수 필드를 검증합니다. 잘못된 값이면 ValueError/TypeError
+    DB가 거부할 값(inf/nan, 범위를 넘는 정수)도 여기서 걸러 저장 단계까지 가지 않게 합니다.
+    """
+    def finite_float(key, value):
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"{key} must be finite")
+        return value
+
+    def optional_float(key):
+        value = data.get(key)
+        return finite_float(key, value) if value else None
+
+    try:
+        success_count = int(data.get("success_count", 0))
+    except OverflowError:
+        raise ValueError("success_count must be finite") from None
+    if not 0 <= success_count <= MAX_SUCCESS_COUNT:
+        raise ValueError("success_count out of range")
+
+    return {
+        "total_time": finite_float("score", data.get("score")),
+        "set1_time": optional_float("set1_time"),
+        "set2_time": optional_float("set2_time"),
+        "success_count": success_count,
+        "average_hold_time": optional_float("average_hold_time"),
+    }
+
+
+def _with_request_info(record, request, session_key):
+    record.update({
+        "session_id": session_key,
+        "ip_address": request.META.get('REMOTE_ADDR'),
+        "user_agent": request.META.get('HTTP_USER_AGENT', ''),
+        "created_at": timezone.now().isoformat(),
+    })
+    return record
+
+
+def build_record(request, data) -> dict:
+    """submit_score 요청 본문을 검증해 저장할 기록으로 바꿉니다. 잘못된 값이면 ValueError/TypeError"""
+    record = validate_score(data)
+    session_key = request.session.session_key
+    if not session_key:
+        request.session.create()
+        session_key = request.session.session_key
+    return _with_request_info(record, request, session_key)
+
+
+async def abuild_record(request, data) -> dict:
+    """build_record의 비동기 버전 (세션을 async 세션 API로 만듭니다)"""
+    record = validate_score(data)
+    session_key = request.session.session_key
+    if not session_key:
+        await request.session.acreate()
+        session_key = request.session.session_key
+    return _with_request_info(record, request, session_key)
+
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+
+
+def get_score_ingestor():
+    """프로세스 전역 ScoreIngestor (처음 호출할 때 남은 스풀 파일을 복구합니다)"""
+    global _ingestor
+    if _ingestor is None:
+        with _ingestor_lock:
+            if _ingestor is None:
+                _ingestor = ScoreIngestor(SCORE_SPOOL_DIR)
+                atexit.register(_ingestor.flush)
+    return _ingestor
+
+
+def ingest(record):
+    """SCORE_INGEST_MODE에 따라 기록을 바로 쓰거나 write-behind 수집기에 넘깁니다."""
+    if SCORE_INGEST_MODE == "buffered":
+        get_score_ingestor().submit(record)
+    else:
+        write_batch([record])
+
+
+async def awrite_record(record):
+    """
+    기록 하나를 async ORM으로 저장하고 리더보드 캐시에 반영합니다. (async submit_score의 "sync" 모드)
+    세션은 aget_or_create로 찾거나 만들고, 점수는 acreate로 추가합니다.
+    """
+    session, _ = await Session.objects.aget_or_create(session_id=record["session_id"], defaults={
+        "start_time": parse_datetime(record["created_at"]),
+        "ip_address": record["ip_address"],
+        "user_agent": record["user_agent"],
+    })
+    score = await Score.objects.acreate(
+        session=session,
+        total_time=record["total_time"],
+        set1_time=record["set1_time"],
+        set2_time=record["set2_time"],
+        success_count=record["success_count"],
+        average_hold_time=record["average_hold_time"],
+        created_at=parse_datetime(record["created_at"]),
+    )
+    # 리더보드 갱신은 캐시 잠금을 기다릴 수 있으므로 이벤트 루프 밖에서 합니다.
+    await sync_to_async(leaderboard.record, thread_sensitive=False)(score)
+    return score
+
+
+async def aingest(record):
+    """ingest의 비동기 버전 (async submit_score용)"""
+    if SCORE_INGEST_MODE == "buffered":
+        # 스풀 파일 쓰기(fsync)는 블로킹 I/O이므로 이벤트 루프 밖에서 합니다.
+        await sync_to_async(ingest, thread_sensitive=False)(record)
+    else:
+        await awrite_record(record)
@@ -0,0 +1,193 @@
+"""
+기간별(오늘/이번 주/전체) 상위 K개 점수를 Django 캐시(Redis)에 유지하는 리더보드입니다.
+
+캐시 키는 기간 버킷(날짜, ISO 주)을 포함하므로 날짜가 바뀌면 자동으로 새 리더보드가 시작됩니다.
+submit_score는 record()로 캐시된 목록에 새 점수를 끼워 넣기만 하므로,
+정상 상태에서 score/get_scores 페이지는 DB를 조회하지 않습니다.
+캐시가 비어 있을 때만 (total_time, created_at) 인덱스를 타는 select_related 쿼리로 다시 만듭니다.
+async 뷰는 같은 동작을 async 캐시 API와 async ORM으로 하는 aget_top을 사용합니다.
+"""
+import asyncio
+import bisect
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Score
+
+LEADERBOARD_SIZE = getattr(settings, "POSE_LEADERBOARD_SIZE", 10)
+PERIODS = ("today", "week", "all")
+DEFAULT_PERIOD = "all"
+
+# 지난 기간의 키는 더 이상 갱신되지 않으므로 기간이 끝난 뒤 만료시킵니다.
+PERIOD_TIMEOUTS = {
+    "today": 2 * 24 * 3600,
+    "week": 8 * 24 * 3600,
+    "all": None,
+}
+# 목록 갱신(읽기-수정-쓰기)을 직렬화하는 캐시 잠금
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 1.0
+
+
+def period_start(period, now=None):
+    """기간의 시작 시각 (전체 기간이면 None)"""
+    if period == "all":
+        return None
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "today":
+        return today
+    return today - timedelta(days=today.weekday())
+
+
+def cache_key(period, now=None):
+    start = period_start(period, now)
+    if start is None:
+        return "leaderboard:all"
+    return f"leaderboard:{period}:{start.date().isoformat()}"
+
+
+def score_entry(score) -> dict:
+    """Score → 캐시에 저장하는 항목 (score.html과 get_scores가 쓰는 필드만)"""
+    return {
+        "id": score.pk,
+        "total_time": score.total_time,
+        "created_at": score.created_at,
+        "session_id": score.session.session_id,
+    }
+
+
+def _sort_key(entry):
+    return entry["total_time"], entry["id"]
+
+
+@contextmanager
+def _locked(key):
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(0.01)
+    try:
+        yield True
+    finally:
+        cache.delete(lock_key)
+
+
+@asynccontextmanager
+async def _alocked(key):
+    """_locked의 비동기 버전 (기다리는 동안 이벤트 루프를 막지 않음)"""
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_WAIT
+    while not await cache.aadd(lock_key, 1, timeout=LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        await asyncio.sleep(0.01)
+    try:
+        yield True
+    finally:
+        await cache.adelete(lock_key)
+
+
+def _top_queryset(period, now=None, limit=None):
+    queryset = Score.objects.select_related("session")
+    start = period_start(period, now)
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    return queryset.order_by("total_time", "id")[:limit or LEADERBOARD_SIZE]
+
+
+def query_top(period, now=None, limit=None):
+    """DB에서 기간별 상위 점수를 조회합니다. (캐시 미스 시에만 사용)"""
+    return [score_entry(s) for s in _top_queryset(period, now, limit)]
+
+
+async def aquery_top(period, now=None, limit=None):
+    """query_top의 async ORM 버전"""
+    return [score_entry(s) async for s in _top_queryset(period, now, limit)]
+
+
+def get_top(period=DEFAULT_PERIOD, now=None):
+    """기간별 상위 LEADERBOARD_SIZE개 항목. 캐시에 없으면 DB에서 다시 만들어 저장합니다."""
+    key = cache_key(period, now)
+    entries = cache.get(key)
+    if entries is not None:
+        return entries
+    with _locked(key) as acquired:
+        entries = cache.get(key) if acquired else None
+        if entries is None:
+            entries = query_top(period, now)
+            if acquired:
+                cache.set(key, entries, timeout=PERIOD_TIMEOUTS[period])
+    return entries
+
+
+async def aget_top(period=DEFAULT_PERIOD, now=None):
+    """get_top의 비동기 버전 (async 뷰용)"""
+    key = cache_key(period, now)
+    entries = await cache.aget(key)
+    if entries is not None:
+        return entries
+    async with _alocked(key) as acquired:
+        entries = await cache.aget(key) if acquired else None
+        if entries is None:
+            entries = await aquery_top(period, now)
+            if acquired:
+                await cache.aset(key, entries, timeout=PERIOD_TIMEOUTS[period])
+    return entries
+
+
+def record(score):
+    """새 점수 하나를 캐시된 각 기간의 리더보드에 반영합니다."""
+    record_many([score])
+
+
+def record_many(scores):
+    """
+    새 점수들을 캐시된 각 기간의 리더보드에 반영합니다.
+    캐시에 없는 기간은 다음 조회 때 DB에서 만들어지므로 건너뛰고,
+    잠금을 얻지 못했거나 pk를 모르는 점수가 있으면 키를 지워 다음 조회 때 다시 만들게 합니다.
+    (MySQL bulk_create는 pk를 돌려주지 않으므로 ingest.write_batch가 다시 조회해 채웁니다.)
+    """
+    by_key = {}
+    for score in scores:
+        for period in PERIODS:
+            by_key.setdefault((period, cache_key(period, score.created_at)), []).append(score)
+    for (period, key), period_scores in by_key.items():
+        with _locked(key) as acquired:
+            if not acquired or any(score.pk is None for score in period_scores):
+                cache.delete(key)
+                continue
+            entries = cache.get(key)
+            if entries is None:
+                continue
+            entries = list(entries)
+            # 캐시가 점수 저장 후에 DB에서 다시 만들어졌으면 그 점수가 이미 들어 있습니다.
+            present = {entry["id"] for entry in entries}
+            for score in period_scores:
+                entry = score_entry(score)
+                if entry["id"] in present:
+                    continue
+                present.add(entry["id"])
+                if len(entries) >= LEADERBOARD_SIZE and _sort_key(entry) >= _sort_key(entries[-1]):
+                    continue
+                bisect.insort(entries, entry, key=_sort_key)
+                del entries[LEADERBOARD_SIZE:]
+            cache.set(key, entries, timeout=PERIOD_TIMEOUTS[period])
+
+
+def invalidate(now=None):
+    """점수가 삭제·수정되었을 때 현재 기간의 리더보드를 비웁니다."""
+    cache.delete_many([cache_key(period, now) for period in PERIODS])
+
+
+def invalidate_scores(scores):
+    """점수들이 들어가는 기간의 리더보드를 비워 다음 조회 때 DB에서 다시 만들게 합니다."""
+    cache.delete_many(list({cache_key(period, score.created_at) for score in scores for period in PERIODS}))
@@ -0,0 +1,103 @@
+"""
+연결 생존 확인(heartbeat)과 유휴 연결 정리(reaper)입니다.
+
+프로세스마다 하나의 ConnectionReaper가 열린 AsyncPoseConsumer와 각 연결의 마지막 수신 시각을 기억하고,
+POSE_HEARTBEAT_INTERVAL마다 한 번씩 모든 연결을 훑습니다.
+  - POSE_HEARTBEAT_INTERVAL 동안 아무 메시지(프레임, pong)도 없으면 {"control": "ping"}을 보내고
+  - POSE_IDLE_TIMEOUT 동안 아무 메시지도 없으면 (응답 없는 반쯤 열린 소켓 등) 연결을 닫고 연결 상태를 정리합니다.
+  - 상태 키는 프레임이 없어도 POSE_STATE_TTL의 1/3마다 만료 시간을 늘려, 살아 있는 연결의 상태가 만료되지 않게 합니다.
+"""
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+
+from . import metrics
+from .state import POSE_STATE_TTL, get_state_store
+
+logger = logging.getLogger(__name__)
+
+POSE_HEARTBEAT_INTERVAL = getattr(settings, "POSE_HEARTBEAT_INTERVAL", 15.0)
+POSE_IDLE_TIMEOUT = getattr(settings, "POSE_IDLE_TIMEOUT", 45.0)
+# 유휴 시간 초과로 서버가 닫을 때의 WebSocket close 코드 (4000번대는 애플리케이션 정의)
+IDLE_CLOSE_CODE = 4000
+
+PING_MESSAGE = '{"control": "ping"}'
+
+
+class ConnectionReaper:
+    def __init__(self, interval=POSE_HEARTBEAT_INTERVAL, idle_timeout=POSE_IDLE_TIMEOUT,
+                 refresh_interval=POSE_STATE_TTL / 3):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.refresh_interval = refresh_interval
+        # consumer → [마지막 수신, 마지막 ping, 마지막 상태 키 만료 갱신] (time.monotonic)
+        self.connections = {}
+        self._task = None
+
+    def register(self, consumer):
+        now = time.monotonic()
+        self.connections[consumer] = [now, None, now]
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self.run())
+
+    def unregister(self, consumer):
+        self.connections.pop(consumer, None)
+
+    def seen(self, consumer):
+        entry = self.connections.get(consumer)
+        if entry is not None:
+            entry[0] = time.monotonic()
+
+    async def run(self):
+        # 연결이 하나도 없으면 종료하고, 다음 register에서 다시 시작합니다.
+        while self.connections:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("유휴 연결 정리에 실패했습니다.")
+
+    async def sweep(self, now=None):
+        """모든 연결을 한 번 훑고 (ping을 보낸 수, 닫은 수)를 반환합니다."""
+        now = time.monotonic() if now is None else now
+        pinged = closed = 0
+        store = get_state_store()
+        for consumer, entry in list(self.connections.items()):
+            last_seen, last_ping, last_refresh = entry
+            idle = now - last_seen
+            try:
+                if idle >= self.idle_timeout:
+                    self.unregister(consumer)
+                    metrics.IDLE_CLOSED.inc()
+                    closed += 1
+                    try:
+                        await consumer.close(code=IDLE_CLOSE_CODE)
+                    finally:
+                        # 반쯤 열린 소켓은 서버의 disconnect가 늦거나 오지 않을 수 있으므로 상태를 바로 정리합니다.
+                        await consumer.disconnect(IDLE_CLOSE_CODE)
+                    continue
+                if idle >= self.interval and (last_ping is None or last_ping < last_seen):
+                    entry[1] = now
+                    pinged += 1
+                    await consumer.send(PING_MESSAGE)
+                if now - last_refresh >= self.refresh_interval:
+                    entry[2] = now
+                    await store.atouch(consumer.state_key)
+                    await store.atouch(consumer.buffer_key)
+            except Exception:
+                logger.exception("연결 %s의 생존 확인에 실패했습니다.", getattr(consumer, "session_id", "?"))
+        return pinged, closed
+
+
+_reaper = None
+
+
+def get_reaper() -> ConnectionReaper:
+    """프로세스 전역에서 공유하는 ConnectionReaper"""
+    global _reaper
+    if _reaper is None:
+        _reaper = ConnectionReaper()
+    return _reaper
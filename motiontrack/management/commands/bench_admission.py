@@ -0,0 +1,88 @@
+import asyncio
+import json
+import math
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from motiontrack.admission import admission_limits
+from motiontrack.bench import InProcessConnection, current_commit, run_benchmark
+from motiontrack.management.commands.bench_pose import IN_PROCESS_SETTINGS
+
+
+class Command(BaseCommand):
+    help = ("동시 플레이어 수를 늘려 가며 p95 지연이 --target-p95(ms) 이하로 유지되는 최대 게임 수를 찾고, "
+            "그 수를 워커당 상한(POSE_MAX_SESSIONS_PER_WORKER)으로 두었을 때 --surge배의 플레이어가 몰리면 "
+            "게임 중인 플레이어의 지연과 대기실 대기 시간이 어떻게 되는지 상한 없이 모두 받을 때와 비교해 JSON으로 출력합니다. "
+            "WS/asgi.py 앱을 프로세스 내에서 실행하므로 결과는 워커 하나 기준입니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", default="5,10,20,40,80", help="늘려 갈 동시 플레이어 수 (쉼표로 구분)")
+        parser.add_argument("--target-p95", type=float, default=100.0, help="지켜야 할 p95 왕복 지연(ms)")
+        parser.add_argument("--surge", type=float, default=2.0, help="상한 대비 몰려드는 플레이어 배수")
+        parser.add_argument("--fps", type=float, default=20, help="플레이어당 전송 fps")
+        parser.add_argument("--duration", type=float, default=5, help="플레이어 한 명이 게임하는 시간(초)")
+        parser.add_argument("--protocol", choices=["binary", "json", "features"], default="binary")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        with override_settings(**IN_PROCESS_SETTINGS):
+            result = self.measure(options)
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def run(self, players, options, **limits):
+        from WS.asgi import application
+
+        with admission_limits(**limits):
+            return asyncio.run(run_benchmark(
+                lambda: InProcessConnection(application), players, options["fps"], options["duration"],
+                options["protocol"],
+            ))
+
+    def summary(self, run):
+        return {
+            "players": run["players"],
+            "p95_ms": run["latency_ms"].get("p95"),
+            "p99_ms": run["latency_ms"].get("p99"),
+            "dropped_frames": run["dropped_frames"],
+            "queued_players": run["queued_players"],
+            "queue_wait_ms": run["queue_wait_ms"],
+        }
+
+    def measure(self, options):
+        target = options["target_p95"]
+        ramp = []
+        sustainable = 0
+        for players in [int(n) for n in options["players"].split(",")]:
+            run = self.summary(self.run(players, options))
+            run["within_target"] = run["p95_ms"] is not None and run["p95_ms"] <= target
+            ramp.append(run)
+            self.stderr.write(f"players={players}: p95={run['p95_ms']}ms")
+            if not run["within_target"]:
+                break
+            sustainable = players
+
+        result = {
+            "commit": current_commit(),
+            "fps": options["fps"],
+            "duration_s": options["duration"],
+            "protocol": options["protocol"],
+            "target_p95_ms": target,
+            "ramp": ramp,
+            "sustainable_sessions": sustainable,
+        }
+        if not sustainable:
+            return result
+
+        # 상한을 넘겨 몰려드는 부하: 상한(+대기실) 적용 vs 모두 받아들임
+        surge = math.ceil(sustainable * options["surge"])
+        admitted = self.summary(self.run(surge, options, max_per_worker=sustainable, max_sessions=sustainable))
+        unlimited = self.summary(self.run(surge, options))
+        for run in (admitted, unlimited):
+            run["within_target"] = run["p95_ms"] is not None and run["p95_ms"] <= target
+        result["surge"] = {"players": surge, "admission_control": admitted, "unlimited": unlimited}
+        return result
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+
+from motiontrack.bench import InProcessConnection, current_commit, percentiles, run_benchmark
+from motiontrack.management.commands.bench_pose import IN_PROCESS_SETTINGS
+
+
+async def http_load(clients, duration, submit_ratio):
+    """
+    clients개의 HTTP 클라이언트가 duration 동안 쉬지 않고 /get_scores/를 요청하고,
+    그중 submit_ratio 비율은 /submit_score/로 점수를 제출합니다. → {경로: 지연(ms) 목록}, 오류 수
+    """
+    latencies = {"get_scores": [], "submit_score": []}
+    errors = 0
+
+    async def client_loop(seed):
+        nonlocal errors
+        client = AsyncClient()
+        rng = random.Random(seed)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        while loop.time() < deadline:
+            submit = rng.random() < submit_ratio
+            started = time.perf_counter()
+            if submit:
+                response = await client.post("/submit_score/", {"score": rng.uniform(10, 60)},
+                                             content_type="application/json")
+            else:
+                response = await client.get("/get_scores/", {"period": rng.choice(["today", "week", "all"])})
+            latencies["submit_score" if submit else "get_scores"].append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = ("/get_scores/·/submit_score/ HTTP 지연을 WebSocket 부하 없이 한 번, --players명의 WebSocket 부하와 "
+            "동시에 한 번 재서 JSON으로 출력합니다. (WS/asgi.py 앱을 프로세스 내에서 실행, DB는 migrate된 DATABASES 사용)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=40, help="동시 WebSocket 플레이어 수")
+        parser.add_argument("--fps", type=float, default=20, help="플레이어당 전송 fps")
+        parser.add_argument("--http-clients", type=int, default=4, help="동시 HTTP 클라이언트 수")
+        parser.add_argument("--submit-ratio", type=float, default=0.1, help="HTTP 요청 중 점수 제출 비율")
+        parser.add_argument("--duration", type=float, default=5, help="측정 시간(초)")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        # AsyncClient의 요청은 Host가 "testserver"입니다.
+        with override_settings(**IN_PROCESS_SETTINGS, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            idle = asyncio.run(self.measure(options, players=0))
+            loaded = asyncio.run(self.measure(options, players=options["players"]))
+        result = {
+            "commit": current_commit(),
+            "http_clients": options["http_clients"],
+            "submit_ratio": options["submit_ratio"],
+            "duration_s": options["duration"],
+            "idle": idle,
+            "websocket_load": loaded,
+        }
+        idle_p95 = idle["get_scores_ms"].get("p95")
+        loaded_p95 = loaded["get_scores_ms"].get("p95")
+        result["get_scores_p95_ratio"] = round(loaded_p95 / idle_p95, 2) if idle_p95 and loaded_p95 else None
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    async def measure(self, options, players):
+        from WS.asgi import application
+
+        http = http_load(options["http_clients"], options["duration"], options["submit_ratio"])
+        if players:
+            websocket = run_benchmark(lambda: InProcessConnection(application), players, options["fps"],
+                                      options["duration"])
+            (latencies, errors), ws_result = await asyncio.gather(http, websocket)
+        else:
+            latencies, errors = await http
+            ws_result = None
+        self.stderr.write(f"players={players}: get_scores p95={percentiles(latencies['get_scores']).get('p95')}ms")
+        return {
+            "players": players,
+            "get_scores_ms": percentiles(latencies["get_scores"]),
+            "submit_score_ms": percentiles(latencies["submit_score"]),
+            "http_errors": errors,
+            "websocket_latency_ms": ws_result["latency_ms"] if ws_result else None,
+        }
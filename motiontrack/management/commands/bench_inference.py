@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dnn.features import extract_features
+from motiontrack.bench import current_commit, percentiles, synthetic_frames
+from motiontrack.inference import InferenceWorker, RemoteInferenceScheduler
+
+
+class Command(BaseCommand):
+    help = ("추론 워커 프로세스 수를 바꿔 가며 channel layer를 거친 원격 배치 추론의 처리량과 지연을 JSON으로 출력합니다. "
+            "Redis channel layer이면 manage.py inference_worker를 띄워 측정하고, "
+            "InMemoryChannelLayer이면 워커를 같은 프로세스에서 실행합니다. (경로 확인용, 확장성 측정 불가)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", default="1,2,4", help="측정할 추론 워커 프로세스 수 (쉼표로 구분)")
+        parser.add_argument("--frames", type=int, default=20000, help="워커 수별로 추론할 프레임 수")
+        parser.add_argument("--concurrency", type=int, default=256, help="동시에 추론을 기다리는 프레임 수 (접속 수)")
+        parser.add_argument("--batch-size", type=int, default=getattr(settings, "POSE_BATCH_MAX_SIZE", 64))
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        layer = get_channel_layer()
+        if layer is None:
+            raise CommandError("CHANNEL_LAYERS가 설정되어 있지 않습니다.")
+        in_process = isinstance(layer, InMemoryChannelLayer)
+        features = extract_features(synthetic_frames(1024))
+        runs = []
+        for workers in [int(n) for n in options["workers"].split(",")]:
+            channel = f"pose-inference-bench-{uuid.uuid4().hex[:8]}"
+            process = None if in_process else subprocess.Popen(
+                [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), "inference_worker",
+                 "--processes", str(workers), "--channel", channel],
+                stdout=subprocess.DEVNULL,
+            )
+            try:
+                run = asyncio.run(self.measure(layer, channel, workers, in_process, features, options))
+            finally:
+                if process is not None:
+                    process.send_signal(signal.SIGTERM)
+                    process.wait(30)
+            runs.append(run)
+            self.stderr.write(f"workers={workers}: {run['frames_per_s']} frames/s")
+
+        base = runs[0]["frames_per_s"]
+        for run in runs:
+            run["speedup"] = round(run["frames_per_s"] / base, 2) if base else None
+        result = {
+            "commit": current_commit(),
+            "channel_layer": type(layer).__name__,
+            "in_process": in_process,
+            "cpu_count": os.cpu_count(),
+            "frames": options["frames"],
+            "concurrency": options["concurrency"],
+            "batch_size": options["batch_size"],
+            "runs": runs,
+        }
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    async def measure(self, layer, channel, workers, in_process, features, options):
+        worker_tasks = [asyncio.ensure_future(InferenceWorker(layer, channel).run())
+                        for _ in range(workers if in_process else 0)]
+        scheduler = RemoteInferenceScheduler(layer, channel=channel, timeout=60,
+                                             max_batch_size=options["batch_size"])
+        try:
+            # 워커 프로세스의 모델 로드·워밍업이 끝날 때까지 기다립니다.
+            await scheduler.predict(features[0])
+            scheduler.timeout = 10
+            remaining = options["frames"]
+            latencies = []
+
+            async def player(offset):
+                nonlocal remaining
+                i = offset
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    await scheduler.predict(features[i % len(features)])
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    i += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(player(i) for i in range(options["concurrency"])))
+            elapsed = time.perf_counter() - started
+        finally:
+            if scheduler._task is not None:
+                scheduler._task.cancel()
+            for task in worker_tasks:
+                task.cancel()
+        return {
+            "workers": workers,
+            "frames_per_s": round(len(latencies) / elapsed, 1),
+            "latency_ms": percentiles(latencies),
+        }
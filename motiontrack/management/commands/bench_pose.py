@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from motiontrack.bench import InProcessConnection, RemoteConnection, load_frames, percentiles, run_benchmark, stage_timing
+
+# 프로세스 내 실행 시 Redis 없이 동작하도록 바꾸는 설정
+IN_PROCESS_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "CHANNEL_LAYERS": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+}
+
+
+class Command(BaseCommand):
+    help = "/ws/pose_data/에 가상 플레이어 부하를 걸고 지연·처리량을 JSON으로 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=10, help="동시 접속 플레이어 수")
+        parser.add_argument("--fps", type=float, default=20, help="플레이어당 전송 fps")
+        parser.add_argument("--duration", type=float, default=10, help="측정 시간(초)")
+        parser.add_argument("--protocol", choices=["binary", "json", "features"], default="binary",
+                            help="features: 클라이언트가 계산한 63차원 특징을 바이너리 프레임에 함께 전송")
+        parser.add_argument("--frames", help="녹화된 랜드마크 .npy 파일 (없으면 합성 스트림)")
+        parser.add_argument("--url", help="실행 중인 daphne 주소 (예: ws://127.0.0.1:8000/ws/pose_data/). "
+                                          "없으면 WS/asgi.py 앱을 프로세스 내에서 실행")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        frames = load_frames(options["frames"]) if options["frames"] else None
+        params = (options["players"], options["fps"], options["duration"], options["protocol"], frames)
+
+        if options["url"]:
+            result = asyncio.run(run_benchmark(lambda: RemoteConnection(options["url"]), *params))
+            result["mode"] = "remote"
+        else:
+            with override_settings(**IN_PROCESS_SETTINGS):
+                result = self.run_in_process(params)
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def run_in_process(self, params):
+        from WS.asgi import application
+        from motiontrack import routing
+
+        samples = {}
+        with stage_timing(routing.consumer, samples):
+            result = asyncio.run(run_benchmark(lambda: InProcessConnection(application), *params))
+        result["mode"] = "inprocess"
+        result["consumer"] = routing.consumer.__name__
+        result["stages_ms"] = {stage: percentiles(values) for stage, values in samples.items()}
+        return result
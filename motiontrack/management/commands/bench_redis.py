@@ -0,0 +1,139 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import time
+
+from channels_redis.core import RedisChannelLayer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_redis.cache import RedisCache
+
+from motiontrack.bench import current_commit
+from motiontrack.state import POSE_STATE_TTL, HoldState
+
+POOL_SIZE = getattr(settings, "REDIS_POOL_SIZE", 32)
+
+
+def make_cache(hosts):
+    """settings.CACHES와 같은 방식(노드가 여러 개면 PipelinedShardClient)으로 hosts에 연결한 캐시"""
+    client = "motiontrack.redis_shards.PipelinedShardClient" if len(hosts) > 1 else "django_redis.client.DefaultClient"
+    return RedisCache(hosts if len(hosts) > 1 else hosts[0], {
+        "OPTIONS": {"CLIENT_CLASS": client, "CONNECTION_POOL_KWARGS": {"max_connections": POOL_SIZE}},
+    })
+
+
+def _state_client(hosts, duration, batch, client_id):
+    """write-behind 플러시처럼 batch개 세션 상태를 set_many로 쓰고 get_many로 읽기를 반복 → 처리한 키 수"""
+    cache = make_cache(hosts)
+    state = HoldState(target_pose="tree", start_time=time.time(), frame_count=30).to_dict()
+    keys = [f"pose_state:bench{client_id:03d}{i:025d}" for i in range(batch)]
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        cache.set_many(dict.fromkeys(keys, state), timeout=POSE_STATE_TTL)
+        cache.get_many(keys)
+        done += 2 * batch
+    cache.delete_many(keys)
+    return done
+
+
+def _channel_client(hosts, duration, batch, client_id):
+    """프로세스 안의 batch개 연결이 각자의 채널로 메시지를 보내고 받기를 반복 → 주고받은 메시지 수"""
+    async def run():
+        layer = RedisChannelLayer(hosts=[{"address": url, "max_connections": POOL_SIZE} for url in hosts])
+        channels = [await layer.new_channel() for _ in range(batch)]
+        done = 0
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await asyncio.gather(*(layer.send(channel, {"type": "pose.frame", "seq": done}) for channel in channels))
+            await asyncio.gather(*(layer.receive(channel) for channel in channels))
+            done += 2 * batch
+        await layer.flush()
+        return done
+
+    return asyncio.run(run())
+
+
+WORKLOADS = {"state": _state_client, "channel": _channel_client}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = ("Redis 노드 수를 바꿔 가며 세션 상태 읽기/쓰기(consistent hashing + 노드별 pipeline)와 "
+            "channel layer 메시지 처리량을 측정해 JSON으로 출력합니다. "
+            "--spawn이면 로컬 redis-server를 노드 수만큼 띄워 측정하고, 아니면 REDIS_HOSTS의 앞쪽 노드를 사용합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shards", default="1,2,4", help="측정할 노드 수 (쉼표로 구분)")
+        parser.add_argument("--spawn", action="store_true", help="로컬 redis-server 프로세스를 띄워 측정")
+        parser.add_argument("--workload", choices=list(WORKLOADS), action="append",
+                            help="측정할 부하 (기본: 전부)")
+        parser.add_argument("--clients", type=int, default=os.cpu_count() or 1, help="부하를 거는 프로세스 수")
+        parser.add_argument("--batch", type=int, default=64, help="요청 한 번에 다루는 키/채널 수")
+        parser.add_argument("--duration", type=float, default=5.0, help="노드 수·부하별 측정 시간(초)")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        shard_counts = [int(n) for n in options["shards"].split(",")]
+        servers = []
+        if options["spawn"]:
+            if shutil.which("redis-server") is None:
+                raise CommandError("redis-server를 찾을 수 없습니다. (--spawn 없이 REDIS_HOSTS로 노드를 지정)")
+            for _ in range(max(shard_counts)):
+                port = _free_port()
+                servers.append((port, subprocess.Popen(
+                    ["redis-server", "--port", str(port), "--save", "", "--appendonly", "no"],
+                    stdout=subprocess.DEVNULL,
+                )))
+            hosts = [f"redis://127.0.0.1:{port}/0" for port, _ in servers]
+            time.sleep(0.5)
+        else:
+            hosts = settings.REDIS_HOSTS
+            if len(hosts) < max(shard_counts):
+                raise CommandError(f"REDIS_HOSTS에 노드가 {len(hosts)}개뿐입니다. (필요: {max(shard_counts)})")
+
+        try:
+            result = self.measure(hosts, shard_counts, options)
+        finally:
+            for _, process in servers:
+                process.terminate()
+                process.wait(10)
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def measure(self, hosts, shard_counts, options):
+        workloads = options["workload"] or list(WORKLOADS)
+        runs = {name: [] for name in workloads}
+        for name in workloads:
+            for shards in shard_counts:
+                args = [(hosts[:shards], options["duration"], options["batch"], i) for i in range(options["clients"])]
+                with multiprocessing.Pool(options["clients"]) as pool:
+                    done = sum(pool.starmap(WORKLOADS[name], args))
+                ops = done / options["duration"]
+                runs[name].append({"shards": shards, "ops_per_s": round(ops, 1)})
+                self.stderr.write(f"{name} shards={shards}: {ops:.0f} ops/s")
+            base = runs[name][0]["ops_per_s"]
+            for run in runs[name]:
+                run["speedup"] = round(run["ops_per_s"] / base, 2) if base else None
+        return {
+            "commit": current_commit(),
+            "cpu_count": os.cpu_count(),
+            "clients": options["clients"],
+            "batch": options["batch"],
+            "duration_s": options["duration"],
+            "pool_size": POOL_SIZE,
+            "runs": runs,
+        }
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from motiontrack import ingest
+from motiontrack.bench import current_commit, percentiles
+from motiontrack.models import Score
+
+# 리더보드 캐시는 Redis 없이 프로세스 메모리에 둡니다.
+BENCH_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+}
+
+
+class Command(BaseCommand):
+    help = ("/submit_score/에 동시 점수 제출 부하를 걸고 초당 제출 수를 JSON으로 출력합니다. "
+            "설정된 DB 백엔드(MySQL, SQLite)로 임시 테스트 DB를 만들어 측정한 뒤 지웁니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=2000, help="총 제출 수 (제출마다 새 플레이어 세션)")
+        parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 스레드 수")
+        parser.add_argument("--mode", choices=["buffered", "sync"], default=ingest.SCORE_INGEST_MODE)
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(**BENCH_SETTINGS):
+            if connection.vendor == "sqlite":
+                # 스레드끼리 공유할 수 있도록 메모리 DB 대신 임시 파일을 씁니다.
+                connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(tmp, "bench.sqlite3")
+                # 동시 쓰기 시 잠금 승격 실패(database is locked) 대신 기다리도록 합니다.
+                connection.settings_dict.setdefault("OPTIONS", {}).update(transaction_mode="IMMEDIATE", timeout=30)
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                result = self.run(options, tmp)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def run(self, options, spool_dir):
+        submissions, concurrency, mode = options["submissions"], options["concurrency"], options["mode"]
+        ingestor = ingest.ScoreIngestor(os.path.join(spool_dir, "spool"))
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def submit(i):
+            nonlocal errors
+            # 라운드가 끝난 여러 플레이어가 한 번씩 제출하는 상황: 요청마다 새 클라이언트(세션)
+            client = Client(SERVER_NAME="localhost")
+            body = json.dumps({"score": 20 + (i % 500) / 10, "success_count": 2, "set1_time": 10.0})
+            start = time.perf_counter()
+            response = client.post("/submit_score/", body, content_type="application/json")
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors += 1
+
+        def worker(indices):
+            try:
+                for i in indices:
+                    submit(i)
+            finally:
+                connection.close()
+
+        with mock.patch.object(ingest, "SCORE_INGEST_MODE", mode), mock.patch.object(ingest, "_ingestor", ingestor):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                list(pool.map(worker, [range(k, submissions, concurrency) for k in range(concurrency)]))
+            accepted = time.perf_counter() - started
+            ingestor.flush()
+            persisted = time.perf_counter() - started
+
+        return {
+            "commit": current_commit(),
+            "database": connection.vendor,
+            "mode": mode,
+            "submissions": submissions,
+            "concurrency": concurrency,
+            "errors": errors,
+            "stored_scores": Score.objects.count(),
+            "accepted_per_s": round(submissions / accepted, 1),
+            "persisted_per_s": round(submissions / persisted, 1),
+            "latency_ms": percentiles(latencies),
+        }
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from motiontrack.bench import current_commit, percentiles
+
+# 새 파이썬 프로세스에서 WS/asgi.py를 import하고 워밍업 완료까지의 시간을 잽니다.
+PROBE = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+import WS.asgi
+imported = time.perf_counter()
+from dnn import model_loader
+model_loader.wait_ready(120)
+ready = time.perf_counter()
+import numpy as np
+from dnn.features import FEATURE_DIM
+t = time.perf_counter()
+model_loader.get_model().predict(np.zeros((1, FEATURE_DIM), dtype=np.float32), verbose=0)
+first = time.perf_counter() - t
+print(json.dumps({
+    "import_s": imported - started,
+    "ready_s": ready - started,
+    "first_predict_ms": first * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tensorflow_imported": "tensorflow" in sys.modules,
+    "ready": model_loader.is_ready(),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = ("새 워커 프로세스의 콜드 스타트(ASGI 앱 import, 모델 워밍업 완료, 첫 추론, 최대 RSS)를 "
+            "여러 번 측정해 JSON으로 출력합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="측정할 프로세스 수")
+        parser.add_argument("--backend", choices=["numpy", "keras"], help="POSE_INFERENCE_BACKEND (기본: 설정값)")
+        parser.add_argument("--max-ready-seconds", type=float,
+                            help="ready_s의 p95가 이 값을 넘으면 실패 (CI에서 콜드 스타트 상한 확인용)")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        if options["backend"]:
+            env["POSE_INFERENCE_BACKEND"] = options["backend"]
+        runs = []
+        for _ in range(options["runs"]):
+            completed = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise CommandError(f"측정 프로세스가 실패했습니다:\n{completed.stderr}")
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        result = {
+            "commit": current_commit(),
+            "backend": options["backend"] or env.get("POSE_INFERENCE_BACKEND", "settings"),
+            "runs": len(runs),
+            "all_ready": all(run["ready"] for run in runs),
+            "tensorflow_imported": any(run["tensorflow_imported"] for run in runs),
+            "import_ms": percentiles([run["import_s"] * 1000 for run in runs]),
+            "ready_ms": percentiles([run["ready_s"] * 1000 for run in runs]),
+            "first_predict_ms": percentiles([run["first_predict_ms"] for run in runs]),
+            "max_rss_mb": round(max(run["max_rss_mb"] for run in runs), 1),
+        }
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
+
+        limit = options["max_ready_seconds"]
+        if limit is not None and result["ready_ms"]["p95"] > limit * 1000:
+            raise CommandError(f"콜드 스타트 p95 {result['ready_ms']['p95']:.0f}ms가 상한 {limit}s를 넘었습니다.")
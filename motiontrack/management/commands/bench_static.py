@@ -0,0 +1,124 @@
+import json
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from motiontrack.bench import current_commit
+from motiontrack.static_assets import module_imports
+
+_MODULE_SCRIPT = re.compile(r'<script type="module" src="([^"]+)"')
+# 처음 방문한 브라우저가 보내는 Accept-Encoding
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+
+def _fetch(client, url, accept_encoding):
+    started = time.perf_counter()
+    response = client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding) if accept_encoding else client.get(url)
+    body = b"".join(response.streaming_content) if response.streaming else response.content
+    server_ms = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        raise CommandError(f"{url}: HTTP {response.status_code}")
+    return body, {
+        "url": url,
+        "bytes": len(body),
+        "encoding": response.get("Content-Encoding", "identity"),
+        "cache_control": response.get("Cache-Control"),
+        "server_ms": round(server_ms, 2),
+    }
+
+
+def critical_path(client, entry_url, accept_encoding):
+    """
+    pose 페이지 HTML → 진입 모듈 → 그 모듈이 import하는 모듈 … 을 브라우저처럼 단계별로 받습니다.
+    같은 단계의 파일은 한 번의 왕복에 함께 받고, 다음 단계는 앞 단계의 응답을 파싱해야 알 수 있습니다. → 단계 목록
+    """
+    html, html_info = _fetch(client, "/pose/", None)
+    if entry_url is None:
+        entry_url = _MODULE_SCRIPT.search(html.decode("utf-8"))[1]
+    levels = [[html_info]]
+    seen = {entry_url}
+    pending = [entry_url]
+    while pending:
+        level, found = [], []
+        for url in pending:
+            body, info = _fetch(client, url, accept_encoding)
+            level.append(info)
+            if info["encoding"] == "identity":
+                name = url[len(settings.STATIC_URL):]
+                found += [settings.STATIC_URL + dep for dep in module_imports(name, body.decode("utf-8"))]
+        levels.append(level)
+        pending = [url for url in dict.fromkeys(found) if url not in seen]
+        seen.update(pending)
+    return levels
+
+
+def summarize(levels, rtt_ms, bandwidth_mbps):
+    """단계마다 왕복 1번 + 가장 느린 서버 응답 + 그 단계 바이트의 전송 시간을 더한 첫 프레임 전까지의 예상 시간"""
+    files = [info for level in levels for info in level]
+    modeled = sum(
+        rtt_ms + max(info["server_ms"] for info in level)
+        + sum(info["bytes"] for info in level) * 8 / (bandwidth_mbps * 1000)
+        for level in levels
+    )
+    return {
+        "requests": len(files),
+        "round_trips": len(levels),
+        "bytes": sum(info["bytes"] for info in files),
+        # 재방문 시 다시 확인해야 하는 요청 수 (immutable이 아닌 정적 파일)
+        "revalidations_on_repeat_visit": sum(
+            1 for info in files[1:] if "immutable" not in (info["cache_control"] or "")
+        ),
+        "modeled_ms": round(modeled, 1),
+        "files": files,
+    }
+
+
+class Command(BaseCommand):
+    help = ("임시 STATIC_ROOT에 collectstatic(번들·최소화·해시·gzip/brotli)을 실행한 뒤, pose 페이지가 카메라 루프를 "
+            "시작하기 전에 받아야 하는 자체 정적 파일(HTML → posemodule)을 원본 ES 모듈(압축 없음)과 해시 번들(br/gzip)로 "
+            "각각 받아 요청 수·왕복 수·바이트와 --rtt·--bandwidth 기준 예상 시간을 JSON으로 출력합니다. "
+            "(MediaPipe·A-Frame 등 CDN 스크립트는 두 경우가 같으므로 제외, 실제 브라우저 값은 "
+            "/metrics/의 pose_client_time_to_first_frame_seconds)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rtt", type=float, default=100.0, help="클라이언트-서버 왕복 지연(ms)")
+        parser.add_argument("--bandwidth", type=float, default=5.0, help="클라이언트 대역폭(Mbps)")
+        parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as static_root:
+            # 테스트 클라이언트의 요청은 Host가 "testserver"입니다.
+            with override_settings(STATIC_ROOT=static_root, DEBUG=False,
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                started = time.perf_counter()
+                call_command("collectstatic", interactive=False, verbosity=0)
+                build_s = time.perf_counter() - started
+                # 미들웨어(whitenoise)가 새 STATIC_ROOT의 파일 목록을 읽은 뒤(첫 요청) 측정합니다.
+                client = Client()
+                client.get("/pose/")
+                modules = critical_path(client, settings.STATIC_URL + "js/posemodule/main.js", None)
+                bundle = critical_path(client, None, ACCEPT_ENCODING)
+
+        result = {
+            "commit": current_commit(),
+            "rtt_ms": options["rtt"],
+            "bandwidth_mbps": options["bandwidth"],
+            "collectstatic_s": round(build_s, 2),
+            "modules": summarize(modules, options["rtt"], options["bandwidth"]),
+            "bundle": summarize(bundle, options["rtt"], options["bandwidth"]),
+        }
+        before, after = result["modules"]["modeled_ms"], result["bundle"]["modeled_ms"]
+        result["modeled_speedup"] = round(before / after, 2) if after else None
+        self.stderr.write(f"modules: {before}ms, bundle: {after}ms")
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+        self.stdout.write(output)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from dnn import model_loader
+from motiontrack.inference import INFERENCE_CHANNEL, InferenceWorker
+
+logger = logging.getLogger(__name__)
+
+
+def serve(channel):
+    """모델을 로드·워밍업한 뒤 channel에서 배치를 받아 추론합니다. (프로세스 하나)"""
+    model_loader.warm_up()
+    if model_loader.REGISTRY_DIR and model_loader.RELOAD_INTERVAL > 0:
+        model_loader.start_reload_watcher()
+    asyncio.run(InferenceWorker(channel=channel).run())
+
+
+def _serve_child(channel):
+    # 부모가 SIGTERM을 전달하면 바로 종료 (처리 중인 배치는 프런트엔드에서 시간 초과로 처리)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    serve(channel)
+
+
+class Command(BaseCommand):
+    help = ("추론 워커 프로세스 풀을 실행합니다. 각 프로세스는 channel layer의 추론 채널에서 특징 배치를 받아 "
+            "추론하고 보낸 쪽의 응답 채널로 결과를 돌려줍니다. (POSE_INFERENCE_MODE=\"remote\"와 함께 사용, "
+            "프로세스 간에 공유되는 channel layer(Redis)가 필요)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="추론 프로세스 수")
+        parser.add_argument("--channel", default=INFERENCE_CHANNEL, help="배치를 받을 채널 이름")
+
+    def handle(self, *args, **options):
+        channel, processes = options["channel"], options["processes"]
+        if processes <= 1:
+            self.stdout.write(f"추론 워커 시작 (pid {os.getpid()}, channel={channel})")
+            return serve(channel)
+
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def start():
+            process = multiprocessing.Process(target=_serve_child, args=(channel,), daemon=True)
+            process.start()
+            return process
+
+        workers = [start() for _ in range(processes)]
+        self.stdout.write(f"추론 워커 {processes}개 시작 (channel={channel})")
+        # 죽은 워커는 다시 띄우고, 종료 신호를 받으면 모든 워커를 정리합니다.
+        while not stopping:
+            time.sleep(0.5)
+            for i, process in enumerate(workers):
+                if not process.is_alive() and not stopping:
+                    logger.warning("추론 워커 pid %s가 종료되어(exit %s) 다시 시작합니다.", process.pid, process.exitcode)
+                    workers[i] = start()
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
@@ -0,0 +1,56 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dnn import model_loader
+from dnn.registry import ARTIFACT_FILES, RegistryError
+
+
+class Command(BaseCommand):
+    help = ("버전별 자세 모델 저장소(POSE_MODEL_REGISTRY_DIR)를 관리합니다. "
+            "promote/rollback으로 활성 버전을 바꾸면 실행 중인 워커가 재시작 없이 새 모델로 교체합니다.")
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest="action", required=True)
+        actions.add_parser("list", help="등록된 버전과 활성 버전을 출력")
+        register = actions.add_parser("register", help="모델 파일 디렉터리를 새 버전으로 등록")
+        register.add_argument("version")
+        register.add_argument("--from-dir", default=model_loader.MODEL_DIR,
+                              help=f"{', '.join(ARTIFACT_FILES)}가 있는 디렉터리 (기본: dnn/model)")
+        register.add_argument("--promote", action="store_true", help="등록 후 바로 활성 버전으로 지정")
+        promote = actions.add_parser("promote", help="체크섬·특징 스키마를 확인하고 활성 버전으로 지정")
+        promote.add_argument("version")
+        actions.add_parser("rollback", help="직전 활성 버전으로 되돌림")
+
+    def handle(self, *args, **options):
+        registry = model_loader.get_registry()
+        if registry is None:
+            raise CommandError("POSE_MODEL_REGISTRY_DIR이 설정되어 있지 않습니다.")
+        try:
+            getattr(self, options["action"])(registry, options)
+        except RegistryError as e:
+            raise CommandError(str(e)) from None
+
+    def list(self, registry, options):
+        active = registry.active_version()
+        for version in registry.versions():
+            manifest = registry.manifest(version)
+            marker = "*" if version == active else " "
+            self.stdout.write(f"{marker} {version}  {manifest['created_at']}  {', '.join(sorted(manifest['files']))}")
+        if active is None:
+            self.stdout.write("활성 버전 없음 (dnn/model의 파일 사용)")
+
+    def register(self, registry, options):
+        files = {name: os.path.join(options["from_dir"], name) for name in ARTIFACT_FILES
+                 if os.path.exists(os.path.join(options["from_dir"], name))}
+        manifest = registry.register(options["version"], files)
+        self.stdout.write(f"{manifest['version']} 등록 완료: {', '.join(sorted(manifest['files']))}")
+        if options["promote"]:
+            self.promote(registry, options)
+
+    def promote(self, registry, options):
+        registry.activate(options["version"])
+        self.stdout.write(f"활성 버전: {options['version']}")
+
+    def rollback(self, registry, options):
+        self.stdout.write(f"활성 버전: {registry.rollback()}")
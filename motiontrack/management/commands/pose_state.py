@@ -0,0 +1,54 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+# 이전 버전이 channel_name을 키로 만료 없이 저장하던 상태 (예: "specific.ab12!cd34")
+LEGACY_PATTERN = "specific.*"
+STATE_PATTERN = "pose_state:*"
+BUFFER_SUFFIX = ":pose_buffer"
+
+
+def find_orphans(keys, ttls):
+    """
+    {이유: [키, ...]}. 연결 중인 상태 키는 항상 만료 시간이 있으므로(POSE_STATE_TTL)
+    만료 시간이 없는 상태 키, 상태 키 없이 남은 프레임 버퍼, 이전 형식의 키를 고아 상태로 봅니다.
+    """
+    states = {key for key in keys if not key.endswith(BUFFER_SUFFIX)}
+    orphans = {"no_ttl": [], "buffer_without_state": [], "legacy": []}
+    for key in keys:
+        if key.startswith(LEGACY_PATTERN[:-1]):
+            orphans["legacy"].append(key)
+        elif ttls[key] is None:
+            orphans["no_ttl"].append(key)
+        elif key.endswith(BUFFER_SUFFIX) and key[:-len(BUFFER_SUFFIX)] not in states:
+            orphans["buffer_without_state"].append(key)
+    return orphans
+
+
+class Command(BaseCommand):
+    help = ("캐시(Redis)에 남은 세션 상태 키를 세고, 만료 시간이 없거나 짝이 없는 고아 상태를 보고합니다. "
+            "--purge를 주면 고아 상태를 삭제합니다. (django-redis 캐시 필요)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--purge", action="store_true", help="고아 상태 키를 삭제")
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, "iter_keys"):
+            raise CommandError("키 목록 조회는 django-redis 캐시(CACHES)에서만 지원합니다.")
+        keys = list(cache.iter_keys(STATE_PATTERN)) + list(cache.iter_keys(LEGACY_PATTERN))
+        ttls = {key: cache.ttl(key) for key in keys}
+        orphans = find_orphans(keys, ttls)
+        purged = [key for group in orphans.values() for key in group]
+        if options["purge"] and purged:
+            cache.delete_many(purged)
+
+        buffers = sum(key.endswith(BUFFER_SUFFIX) for key in keys)
+        report = {
+            "keys": len(keys),
+            "states": len(keys) - buffers - len(orphans["legacy"]),
+            "buffers": buffers,
+            "orphans": {reason: len(group) for reason, group in orphans.items()},
+            "purged": len(purged) if options["purge"] else 0,
+        }
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,193 @@
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dnn import model_loader
+from motiontrack.inference import INFERENCE_MODE
+
+logger = logging.getLogger(__name__)
+
+# 워커 종료(drain) 시 열린 WebSocket에 보내는 close 코드. socket.js는 이 코드를 받으면 바로 재연결합니다.
+# (표준의 1012 "Service Restart"는 autobahn이 서버에서 보내는 것을 허용하지 않아 4000번대 코드를 사용)
+DRAIN_CLOSE_CODE = 4001
+
+
+def preload():
+    """
+    워커를 fork하기 전에 부모에서 한 번만: 앱 모듈 import, 모델 로드·워밍업.
+    NumPy 백엔드의 가중치는 읽기 전용으로 표시해 워커들이 같은 물리 페이지를 copy-on-write로 공유하게 합니다.
+    (TensorFlow는 fork 후 안전하지 않으므로 keras 백엔드에서는 워커가 각자 로드)
+    """
+    import channels.routing  # noqa: F401
+    import motiontrack.routing  # noqa: F401
+    from django.core.asgi import get_asgi_application  # noqa: F401
+
+    if INFERENCE_MODE == "local" and model_loader.INFERENCE_BACKEND == "numpy":
+        model_loader.warm_up()
+        model = model_loader.get_model()
+        for array in model.kernels + model.biases:
+            array.setflags(write=False)
+    # 이후 워커의 GC가 부모에서 만든 객체를 건드려 공유 페이지를 복사하지 않도록 현재 객체를 GC 대상에서 뺍니다.
+    gc.freeze()
+
+
+def flush_write_behind():
+    """
+    write-behind로 대기 중인 세션 상태(hybrid 저장소)와 점수 기록(buffered 수집기)을 바로 저장합니다.
+    fork한 워커는 os._exit로 끝나 atexit에 등록한 flush가 실행되지 않으므로 종료 전에 직접 호출합니다.
+    """
+    from motiontrack import ingest, state
+
+    store = state._state_store
+    if isinstance(store, state.HybridStateStore):
+        try:
+            store.writer.flush()
+        except Exception:
+            logger.exception("워커 종료 전 세션 상태를 저장하지 못했습니다.")
+    if ingest._ingestor is not None:
+        try:
+            ingest._ingestor.flush()
+        except Exception:
+            logger.exception("워커 종료 전 점수 기록을 저장하지 못했습니다. (스풀 파일은 다음 프로세스가 복구)")
+
+
+def _serve_child(fd, family, drain_timeout, verbosity):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 부모에서 (daphne 앱 import로) 설치된 reactor는 epoll을 워커끼리 공유하게 되므로 버리고, 워커마다 새로 만듭니다.
+    for name in ("twisted.internet.reactor", "daphne.server"):
+        sys.modules.pop(name, None)
+    from daphne.server import Server
+    from twisted.internet import reactor
+
+    from WS.asgi import application
+
+    class DrainingServer(Server):
+        def listen_success(self, port):
+            self.ports = getattr(self, "ports", []) + [port]
+            super().listen_success(port)
+
+        def running_applications(self):
+            return sum(1 for details in self.connections.values()
+                       if details.get("application_instance") is not None
+                       and not details["application_instance"].done())
+
+        def drain(self):
+            """
+            새 연결은 받지 않고, 열린 WebSocket은 재연결하도록 닫은 뒤 consumer의 disconnect 처리가 모두 끝나면
+            (또는 drain_timeout 후) write-behind 대기분을 저장하고 종료합니다.
+            """
+            logger.info("워커 pid %s: 연결 %d개 정리 후 종료합니다.", os.getpid(), len(self.connections))
+            for port in getattr(self, "ports", []):
+                port.stopListening()
+            for protocol in list(self.connections):
+                if hasattr(protocol, "serverClose"):
+                    try:
+                        protocol.serverClose(code=DRAIN_CLOSE_CODE)
+                    except Exception:
+                        logger.exception("WebSocket 연결을 닫지 못했습니다.")
+            deadline = time.monotonic() + drain_timeout
+
+            def check():
+                # 연결이 닫혀도 consumer의 disconnect(상태 arelease)가 끝나기 전에 멈추면 그 상태가 취소됩니다.
+                if not self.running_applications() or time.monotonic() >= deadline:
+                    self.stop()
+                else:
+                    reactor.callLater(0.1, check)
+
+            check()
+
+    # daphne는 endpoint 문자열만 받고, fd endpoint는 주소 체계를 잘못 넘기므로 소켓은 아래 listen()에서 직접 등록합니다.
+    server = DrainingServer(application, endpoints=[f"fd:fileno={fd}"], signal_handlers=False, verbosity=verbosity)
+    server.endpoints = []
+
+    def listen():
+        # 부모가 연 리스닝 소켓을 이 워커의 reactor에 등록합니다. (모든 워커가 같은 소켓에서 accept)
+        server.listen_success(reactor.adoptStreamPort(fd, family, server.http_factory))
+        os.close(fd)
+
+    reactor.callWhenRunning(listen)
+    signal.signal(signal.SIGTERM, lambda signum, frame: reactor.callFromThread(server.drain))
+    server.run()
+    # 이벤트 루프가 멈춘 뒤에 저장합니다. (루프 안에서는 동기 ORM 호출이 막힘)
+    flush_write_behind()
+
+
+class Command(BaseCommand):
+    help = ("ASGI 워커 여러 개를 한 번에 실행합니다. 부모 프로세스가 Django 앱과 모델을 한 번 로드한 뒤 워커를 fork하므로 "
+            "워커들은 모델 메모리를 copy-on-write로 공유하고, 부모가 연 리스닝 소켓을 함께 사용합니다. "
+            "죽은 워커는 다시 띄우고, SIGTERM을 받으면 새 연결을 멈추고 열린 연결을 정리(drain)한 뒤 종료합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="ASGI 워커 프로세스 수")
+        parser.add_argument("--bind", default="0.0.0.0", help="리스닝 주소")
+        parser.add_argument("--port", type=int, default=8000)
+        parser.add_argument("--backlog", type=int, default=2048)
+        parser.add_argument("--drain-timeout", type=float, default=30.0,
+                            help="SIGTERM 후 열린 연결이 끝나기를 기다리는 최대 시간(초)")
+
+    def handle(self, *args, **options):
+        if multiprocessing.get_start_method(allow_none=True) not in (None, "fork"):
+            raise CommandError("fork start method가 필요합니다. (Linux/macOS)")
+        listener = socket.create_server((options["bind"], options["port"]), backlog=options["backlog"])
+        listener.set_inheritable(True)
+        # 워커의 reactor는 더 받을 연결이 없을 때까지 accept를 반복하므로 논블로킹이어야 합니다.
+        listener.setblocking(False)
+
+        started = time.perf_counter()
+        preload()
+        self.stdout.write(f"앱·모델 사전 로드 완료 ({time.perf_counter() - started:.2f}s)")
+
+        context = multiprocessing.get_context("fork")
+        drain_timeout = options["drain_timeout"]
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def start():
+            process = context.Process(target=_serve_child,
+                                      args=(listener.fileno(), listener.family, drain_timeout, options["verbosity"]))
+            process.start()
+            process.started_at = time.monotonic()
+            return process
+
+        workers = [start() for _ in range(options["workers"])]
+        self.stdout.write(f"ASGI 워커 {len(workers)}개 시작 (http://{options['bind']}:{options['port']}, "
+                          f"pid {', '.join(str(p.pid) for p in workers)})")
+        # 죽은 워커는 부모의 사전 로드 상태에서 다시 fork합니다.
+        while not stopping:
+            time.sleep(0.5)
+            for i, process in enumerate(workers):
+                if process.is_alive() or stopping:
+                    continue
+                if time.monotonic() - process.started_at < 1.0:
+                    # 시작하자마자 죽는 워커는 다시 띄워도 같으므로 (설정 오류 등) 전체를 멈춥니다.
+                    logger.error("ASGI 워커 pid %s가 시작 직후 종료되어(exit %s) 중단합니다.", process.pid, process.exitcode)
+                    stopping = True
+                    break
+                logger.warning("ASGI 워커 pid %s가 종료되어(exit %s) 다시 시작합니다.", process.pid, process.exitcode)
+                workers[i] = start()
+
+        # 모든 워커에 drain을 요청하고, drain_timeout 안에 끝나지 않은 워커는 강제 종료합니다.
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + drain_timeout + 5
+        for process in workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        listener.close()
+        self.stdout.write("모든 ASGI 워커가 종료되었습니다.")
@@ -0,0 +1,232 @@
+"""
+PoseConsumer 처리 단계별 시간 히스토그램과 연결/프레임 카운터입니다.
+/metrics/ 경로에서 Prometheus 텍스트 형식으로 노출되며, 값은 프로세스(daphne 워커)별로 집계됩니다.
+
+POSE_METRICS_ENABLED가 False이면 카운터는 아무 일도 하지 않는 객체가 되고,
+timed_stage는 원래 함수를 그대로 돌려주므로 프레임 처리 경로에 추가 비용이 없습니다.
+"""
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+from django.conf import settings
+
+ENABLED = getattr(settings, "POSE_METRICS_ENABLED", False)
+
+# 단계별 소요 시간 버킷 (초): 50µs ~ 1s
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# 페이지 로드부터 첫 카메라 프레임까지(초)
+FIRST_FRAME_BUCKETS = (0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0, 30.0)
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, "", self.value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class HitRatio:
+    """두 카운터로 계산하는 적중률 게이지: hits / (hits + misses) (조회가 없으면 0)"""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, hits, misses):
+        self.name = name
+        self.help_text = help_text
+        self.hits = hits
+        self.misses = misses
+
+    def samples(self):
+        total = self.hits.value + self.misses.value
+        yield self.name, "", self.hits.value / total if total else 0.0
+
+
+class Histogram:
+    """Prometheus 방식 히스토그램. buckets는 상한값 목록이며 +Inf 버킷이 자동으로 추가됩니다."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield ("+Inf" if bound == float("inf") else repr(bound)), total
+
+
+class LabeledHistogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label, buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self.children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value) -> Histogram:
+        child = self.children.get(value)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(value, Histogram(self.buckets))
+        return child
+
+    def samples(self):
+        for value, child in sorted(self.children.items()):
+            label = f'{self.label}="{value}"'
+            for bound, total in child.cumulative():
+                yield f"{self.name}_bucket", f'{{{label},le="{bound}"}}', total
+            yield f"{self.name}_sum", f"{{{label}}}", child.sum
+            yield f"{self.name}_count", f"{{{label}}}", child.count
+
+
+class _NullMetric:
+    """비활성화 시 사용하는 아무 일도 하지 않는 메트릭"""
+    kind = None
+    value = 0
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def labels(self, value):
+        return self
+
+    def samples(self):
+        return iter(())
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.metrics = []
+
+    def _register(self, metric):
+        if not self.enabled:
+            return _NullMetric()
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self._register(Gauge(name, help_text))
+
+    def hit_ratio(self, name, help_text, hits, misses):
+        return self._register(HitRatio(name, help_text, hits, misses))
+
+    def histogram(self, name, help_text, label, buckets=STAGE_BUCKETS):
+        return self._register(LabeledHistogram(name, help_text, label, buckets))
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry(enabled=ENABLED)
+
+ACTIVE_CONNECTIONS = REGISTRY.gauge("pose_active_connections", "현재 열려 있는 /ws/pose_data/ 연결 수")
+FRAMES_RECEIVED = REGISTRY.counter("pose_frames_received_total", "수신한 랜드마크 프레임 수")
+FRAMES_DROPPED = REGISTRY.counter("pose_frames_dropped_total", "전송률 제한이나 최신 프레임 병합으로 버린 프레임 수")
+SUCCESSES = REGISTRY.counter("pose_successes_total", "목표 자세 유지 성공 횟수")
+PREDICTION_CACHE_HITS = REGISTRY.counter("pose_prediction_cache_hits_total",
+                                         "움직임이 작아 직전 예측을 재사용한 프레임 수")
+PREDICTION_CACHE_MISSES = REGISTRY.counter("pose_prediction_cache_misses_total", "실제로 추론한 프레임 수")
+PREDICTION_CACHE_HIT_RATIO = REGISTRY.hit_ratio("pose_prediction_cache_hit_ratio", "예측 캐시 적중률",
+                                                PREDICTION_CACHE_HITS, PREDICTION_CACHE_MISSES)
+CLIENT_FEATURE_FRAMES = REGISTRY.counter("pose_client_feature_frames_total",
+                                         "클라이언트가 계산한 특징을 받은 프레임 수")
+CLIENT_FEATURE_MISMATCHES = REGISTRY.counter("pose_client_feature_mismatches_total",
+                                             "표본 검사에서 서버 추출기와 달라 클라이언트 특징을 끈 연결 수")
+IDLE_CLOSED = REGISTRY.counter("pose_idle_connections_closed_total",
+                               "POSE_IDLE_TIMEOUT 동안 메시지가 없어 서버가 닫은 연결 수")
+WAITING_CONNECTIONS = REGISTRY.gauge("pose_waiting_connections",
+                                     "게임 자리를 기다리며 대기실에 있는 연결 수 (admission.py)")
+ADMISSION_REJECTED = REGISTRY.counter("pose_admission_rejected_total",
+                                      "대기실까지 꽉 차 있어 서버가 닫은 연결 수")
+STAGE_SECONDS = REGISTRY.histogram("pose_stage_seconds", "프레임 처리 단계별 소요 시간(초)", label="stage")
+TIME_TO_FIRST_FRAME = REGISTRY.histogram(
+    "pose_client_time_to_first_frame_seconds",
+    "pose 페이지 로드 시작부터 첫 카메라 프레임의 포즈 결과까지 걸린 시간(초, 브라우저 측정). assets: bundle | modules",
+    label="assets", buckets=FIRST_FRAME_BUCKETS,
+)
+
+
+def timed_stage(stage, histogram=None):
+    """
+    메서드의 실행 시간을 STAGE_SECONDS{stage=...}에 기록하는 데코레이터입니다. (동기/비동기 모두 지원)
+    메트릭이 비활성화되어 있으면 원래 함수를 그대로 반환합니다.
+    """
+    histogram = histogram or STAGE_SECONDS
+
+    def decorator(fn):
+        if isinstance(histogram, _NullMetric):
+            return fn
+        child = histogram.labels(stage)
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorator
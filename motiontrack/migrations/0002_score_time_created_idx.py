@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motiontrack', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['total_time', 'created_at'], name='score_time_created_idx'),
+        ),
+    ]
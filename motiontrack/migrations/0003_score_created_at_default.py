@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motiontrack', '0002_score_time_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='score',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
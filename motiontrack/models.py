@@ -1,5 +1,6 @@
 # models.py
 from django.db import models
+from django.utils import timezone
 
 
 class Session(models.Model):
@@ -20,7 +21,14 @@ class Score(models.Model):
     set2_time = models.FloatField(null=True, blank=True)  # 두 번째 세트 시간
     success_count = models.IntegerField(default=0)
     average_hold_time = models.FloatField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # 제출 시각 (일괄 저장 시 DB에 쓰인 시각이 아니라 요청을 받은 시각을 기록)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # 리더보드 캐시 미스 시 order_by('total_time') + 기간(created_at) 필터 쿼리용
+            models.Index(fields=["total_time", "created_at"], name="score_time_created_idx"),
+        ]
 
     def __str__(self):
         return f"Session {self.session.session_id} - Score: {self.total_time}"
@@ -0,0 +1,38 @@
+import numpy as np
+from django.conf import settings
+
+# 정규화 좌표의 최대 변화량(관절 하나의 x, y, z 중 가장 큰 차이)이 이 값보다 작으면 직전 예측을 재사용 (0이면 사용 안 함)
+POSE_PREDICTION_CACHE_TOLERANCE = getattr(settings, "POSE_PREDICTION_CACHE_TOLERANCE", 0.02)
+# 마지막 실제 추론 후 이 시간(초)이 지나면 움직임이 없어도 다시 추론
+POSE_PREDICTION_CACHE_MAX_AGE = getattr(settings, "POSE_PREDICTION_CACHE_MAX_AGE", 0.5)
+
+
+class PredictionCache:
+    """
+    연결별로 마지막으로 실제 추론한 프레임의 정규화 좌표와 그 예측을 기억합니다.
+    자세 유지 중처럼 거의 움직이지 않는 프레임은 각도 계산과 모델 추론 없이 같은 예측을 돌려줍니다.
+    변화량은 항상 마지막으로 실제 추론한 프레임과 비교하므로 조금씩 움직여 누적된 변화도 놓치지 않습니다.
+    """
+
+    def __init__(self, tolerance=POSE_PREDICTION_CACHE_TOLERANCE, max_age=POSE_PREDICTION_CACHE_MAX_AGE):
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.clear()
+
+    def clear(self):
+        self.normalized = None
+        self.prediction = None
+        self.inferred_at = None
+
+    def lookup(self, normalized, now):
+        """재사용할 수 있으면 저장된 예측, 아니면 None"""
+        if self.tolerance <= 0 or self.normalized is None or now - self.inferred_at >= self.max_age:
+            return None
+        if np.max(np.abs(normalized - self.normalized)) >= self.tolerance:
+            return None
+        return self.prediction
+
+    def store(self, normalized, prediction, now):
+        self.normalized = normalized
+        self.prediction = prediction
+        self.inferred_at = now
@@ -0,0 +1,116 @@
+"""
+WebSocket 랜드마크 프레임 프로토콜입니다.
+
+JSON (기본): {"coords": [39개 float], "seq": 선택}
+    클라이언트 특징 모드: {"coords": [...], "features": [63개 float], "schema": FEATURE_SCHEMA_VERSION, "seq": 선택}
+바이너리 (bytes_data, 리틀 엔디언):
+    offset 0  u8   version (BINARY_VERSION)
+    offset 1  u8   encoding (ENCODING_FLOAT32 | ENCODING_INT16 | ENCODING_FLOAT32_FEATURES)
+    offset 2  u16  reserved (0), ENCODING_FLOAT32_FEATURES이면 특징 스키마 버전
+    offset 4  u32  seq (프레임 순번)
+    offset 8  f64  client timestamp (ms)
+    offset 16      payload: float32 × 39 또는 int16 × 39 (값 = int16 / INT16_SCALE)
+                   ENCODING_FLOAT32_FEATURES: float32 × 39 좌표 + float32 × 63 특징
+헤더가 16바이트라 float32 payload가 정렬되어 있으므로 np.frombuffer로 복사 없이 읽습니다.
+클라이언트 특징은 여기서 모양·유한값·스키마 버전만 확인하며, 서버 추출기와의 비교는 consumer가 표본으로 합니다.
+"""
+import json
+import struct
+
+import numpy as np
+
+from dnn.features import FEATURE_DIM, FEATURE_SCHEMA_VERSION
+
+BINARY_VERSION = 1
+ENCODING_FLOAT32 = 0
+ENCODING_INT16 = 1
+ENCODING_FLOAT32_FEATURES = 2
+# int16 양자화 배율: ±4 범위를 약 1.2e-4 해상도로 표현 (MediaPipe 정규화/월드 좌표 모두 포함)
+INT16_SCALE = 8192.0
+
+HEADER = struct.Struct("<BBHId")
+COORDS_PER_FRAME = 39
+
+_PAYLOAD_DTYPES = {
+    ENCODING_FLOAT32: np.dtype("<f4"),
+    ENCODING_INT16: np.dtype("<i2"),
+}
+
+
+def check_client_features(features, schema):
+    """클라이언트가 보낸 특징 → (63,) float32 배열. 스키마 버전·길이·유한값이 맞지 않으면 ValueError"""
+    if schema != FEATURE_SCHEMA_VERSION:
+        raise ValueError(f"지원하지 않는 특징 스키마 버전입니다: {schema}")
+    try:
+        features = np.asarray(features, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError("특징 값이 올바르지 않습니다.") from None
+    if features.shape != (FEATURE_DIM,):
+        raise ValueError(f"특징 길이가 올바르지 않습니다. {FEATURE_DIM}개의 값이 필요합니다.")
+    if not np.isfinite(features).all():
+        raise ValueError("특징에 유한하지 않은 값이 있습니다.")
+    return features
+
+
+def decode_feature_frame(data: bytes):
+    """ENCODING_FLOAT32_FEATURES 바이너리 프레임 → (coords (39,), features (63,), seq, client timestamp)"""
+    if len(data) != HEADER.size + (COORDS_PER_FRAME + FEATURE_DIM) * 4:
+        raise ValueError("특징 프레임 길이가 올바르지 않습니다.")
+    version, _, schema, seq, timestamp = HEADER.unpack_from(data)
+    if version != BINARY_VERSION:
+        raise ValueError(f"지원하지 않는 프레임 버전입니다: {version}")
+    payload = np.frombuffer(data, dtype="<f4", offset=HEADER.size)
+    return payload[:COORDS_PER_FRAME], check_client_features(payload[COORDS_PER_FRAME:], schema), seq, timestamp
+
+
+def decode_binary_frame(data: bytes):
+    """바이너리 프레임 → (coords (39,), seq, client timestamp)"""
+    if len(data) < HEADER.size:
+        raise ValueError("바이너리 프레임 헤더가 올바르지 않습니다.")
+    version, encoding, _, seq, timestamp = HEADER.unpack_from(data)
+    if version != BINARY_VERSION:
+        raise ValueError(f"지원하지 않는 프레임 버전입니다: {version}")
+    dtype = _PAYLOAD_DTYPES.get(encoding)
+    if dtype is None:
+        raise ValueError(f"지원하지 않는 좌표 인코딩입니다: {encoding}")
+    if len(data) != HEADER.size + COORDS_PER_FRAME * dtype.itemsize:
+        raise ValueError("좌표 길이가 올바르지 않습니다. 39개의 값이 필요합니다.")
+    coords = np.frombuffer(data, dtype=dtype, count=COORDS_PER_FRAME, offset=HEADER.size)
+    if encoding == ENCODING_INT16:
+        coords = coords / INT16_SCALE
+    return coords, seq, timestamp
+
+
+def encode_binary_frame(coords, seq=0, timestamp=0.0, encoding=ENCODING_FLOAT32, features=None) -> bytes:
+    """decode_binary_frame / decode_feature_frame의 역변환 (테스트와 벤치마크 클라이언트용)"""
+    values = np.asarray(coords, dtype=np.float64)
+    if features is not None:
+        payload = np.concatenate([values, np.asarray(features, dtype=np.float64)]).astype("<f4")
+        return (HEADER.pack(BINARY_VERSION, ENCODING_FLOAT32_FEATURES, FEATURE_SCHEMA_VERSION, seq, timestamp)
+                + payload.tobytes())
+    if encoding == ENCODING_INT16:
+        payload = np.clip(np.round(values * INT16_SCALE), -32768, 32767).astype("<i2")
+    else:
+        payload = values.astype("<f4")
+    return HEADER.pack(BINARY_VERSION, encoding, 0, seq, timestamp) + payload.tobytes()
+
+
+def parse_frame(text_data=None, bytes_data=None):
+    """
+    수신 메시지 → (coords, seq, features). JSON 프레임에 seq가 없으면 None이며,
+    features는 클라이언트 특징 모드 프레임일 때만 (63,) float32 배열이고 아니면 None입니다.
+    heartbeat 응답({"control": "pong"})이면 coords가 None입니다.
+    """
+    if bytes_data is not None:
+        if len(bytes_data) > 1 and bytes_data[1] == ENCODING_FLOAT32_FEATURES:
+            coords, features, seq, _ = decode_feature_frame(bytes_data)
+            return coords, seq, features
+        coords, seq, _ = decode_binary_frame(bytes_data)
+        return coords, seq, None
+    data = json.loads(text_data or "{}")
+    if data.get("control") == "pong":
+        return None, None, None
+    features = data.get("features")
+    if features is not None:
+        features = check_client_features(features, data.get("schema"))
+    return data.get("coords", []), data.get("seq"), features
@@ -0,0 +1,108 @@
+"""
+여러 Redis 노드에 캐시(세션 상태) 키를 나눠 저장하는 django-redis 클라이언트입니다.
+
+CACHES의 LOCATION에 여러 노드를 주고 OPTIONS의 CLIENT_CLASS를 "motiontrack.redis_shards.PipelinedShardClient"로
+지정하면, 키마다 consistent hashing으로 노드를 정하고 여러 키를 다루는 명령(get_many, set_many, delete_many)은
+노드별로 묶어 노드마다 한 번의 왕복(mget, pipeline)으로 처리합니다. (django-redis의 ShardClient는 키마다 왕복)
+노드를 추가·제거해도 다른 노드로 옮겨지는 키는 약 1/N입니다.
+"""
+import bisect
+import hashlib
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.client.default import DefaultClient
+from django_redis.client.sharded import ShardClient
+
+# 노드 하나가 링 위에 차지하는 가상 노드 수 (많을수록 키 분포가 고름)
+DEFAULT_REPLICAS = 160
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """노드 이름의 consistent hashing 링. get_node(key)는 링에서 key의 해시 다음에 오는 가상 노드의 노드입니다."""
+
+    def __init__(self, nodes=(), replicas=DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self.nodes = []
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node):
+        self.nodes.append(node)
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node):
+        self.nodes.remove(node)
+        keep = [i for i, owner in enumerate(self._owners) if owner != node]
+        self._points = [self._points[i] for i in keep]
+        self._owners = [self._owners[i] for i in keep]
+
+    def get_node(self, key):
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class PipelinedShardClient(ShardClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # django-redis의 HashRing은 노드 목록을 클래스 속성으로 공유하므로 인스턴스별 링으로 바꿉니다.
+        self._ring = HashRing(self._server)
+
+    def _group_by_server(self, keys, version=None):
+        """{노드 이름: [(원래 키, 노드 키), ...]}"""
+        groups = {}
+        for key in keys:
+            nkey = self.make_key(key, version=version)
+            groups.setdefault(self.get_server_name(nkey), []).append((key, nkey))
+        return groups
+
+    def get(self, key, default=None, version=None, client=None):
+        # django-redis의 RedisCache.get은 항상 client=None을 넘기는데, ShardClient.get은 이를 "client 지정"으로 보고
+        # 경고(앞으로 오류)를 내므로 None은 지정하지 않은 것으로 보고 키의 노드로 보냅니다.
+        if client is None:
+            key = self.make_key(key, version=version)
+            client = self.get_server(key)
+        return DefaultClient.get(self, key, default=default, version=version, client=client)
+
+    def get_many(self, keys, version=None, client=None):
+        if client is not None:
+            raise NotImplementedError("get_many on sharded client may not specify client")
+        recovered = {}
+        for name, items in self._group_by_server(keys, version).items():
+            values = self._serverdict[name].mget([nkey for _, nkey in items])
+            for (key, _), value in zip(items, values):
+                if value is not None:
+                    recovered[key] = self.decode(value)
+        return recovered
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        if client is not None:
+            raise NotImplementedError("set_many on sharded client may not specify client")
+        for name, items in self._group_by_server(data, version).items():
+            pipeline = self._serverdict[name].pipeline(transaction=False)
+            for key, nkey in items:
+                DefaultClient.set(self, nkey, data[key], timeout, version=version, client=pipeline)
+            pipeline.execute()
+
+    def delete_many(self, keys, version=None, client=None):
+        if client is not None:
+            raise NotImplementedError("delete_many on sharded client may not specify client")
+        return sum(self._serverdict[name].delete(*[nkey for _, nkey in items])
+                   for name, items in self._group_by_server(keys, version).items())
+
+    def iter_keys(self, search, itersize=None, client=None, version=None):
+        pattern = self.make_pattern(search, version=version)
+        for server in self._serverdict.values():
+            for item in server.scan_iter(match=pattern, count=itersize):
+                yield self.reverse_key(item.decode() if isinstance(item, bytes) else item)
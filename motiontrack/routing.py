@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import re_path
-from .consumers import PoseConsumer
+from .consumers import AsyncPoseConsumer, PoseConsumer
+
+# POSE_ASYNC_CONSUMER가 True이면 연결 간 마이크로 배치 추론을 사용하는 비동기 Consumer를 사용
+consumer = AsyncPoseConsumer if getattr(settings, "POSE_ASYNC_CONSUMER", True) else PoseConsumer
 
 websocket_urlpatterns = [
-    re_path(r'^ws/pose_data/$', PoseConsumer.as_asgi()),
+    re_path(r'^ws/pose_data/$', consumer.as_asgi()),
 ]
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import leaderboard
+from .models import Score
+
+
+@receiver(post_save, sender=Score)
+def score_saved(sender, instance, created, **kwargs):
+    # 새 점수는 submit_score에서 leaderboard.record로 반영하고, 수정된 점수만 캐시를 비웁니다.
+    if not created:
+        leaderboard.invalidate()
+
+
+@receiver(post_delete, sender=Score)
+def score_deleted(sender, instance, **kwargs):
+    leaderboard.invalidate()
@@ -0,0 +1,301 @@
+"""
+모든 연결의 예측 평활과 목표 자세 유지 타이머를 한 곳에서 처리하는 struct-of-arrays 엔진입니다.
+
+연결마다 슬롯 번호를 하나 받고(acquire), 평활된 확률·목표 자세·유지 시작 시각은 슬롯을 인덱스로 하는
+미리 할당한 NumPy 배열에 저장합니다. step()은 여러 슬롯의 확률 벡터를 한 번의 벡터 연산으로
+평활 → 라벨 결정 → 유지 타이머 갱신까지 처리하고, 연결이 끊기면 슬롯을 반납(release)해 재사용합니다.
+비동기 consumer는 astep()을 쓰며, 같은 배치 추론 결과를 받은 연결들은 이벤트 루프 한 바퀴 안에서 모여 함께 처리됩니다.
+
+평활 방식은 필터 클래스로 바꿀 수 있습니다: EMAFilter(기본), OneEuroFilter, HysteresisFilter(최소 유지 시간)
+"""
+import asyncio
+import functools
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+ALPHA = 0.5  # 지수 평활법의 smoothing factor (0과 1 사이의 값)
+HOLD_SECONDS = 5  # 목표 자세 유지 성공 기준 (초)
+
+# 평활 필터 이름과 옵션 (예: "one_euro", {"min_cutoff": 1.0, "beta": 0.5}), 처음 할당할 슬롯 수
+POSE_SMOOTHING_FILTER = getattr(settings, "POSE_SMOOTHING_FILTER", "ema")
+POSE_SMOOTHING_OPTIONS = getattr(settings, "POSE_SMOOTHING_OPTIONS", {})
+POSE_SMOOTHING_CAPACITY = getattr(settings, "POSE_SMOOTHING_CAPACITY", 256)
+
+# step()이 슬롯마다 돌려주는 유지 이벤트
+HOLD_NONE = 0      # 목표 자세가 아니고 유지 중도 아님
+HOLD_STARTED = 1   # 목표 자세 유지 시작
+HOLD_HELD = 2      # 유지 중
+HOLD_RESET = 3     # 유지 중에 다른 자세로 바뀜
+HOLD_SUCCESS = 4   # HOLD_SECONDS 이상 유지 (유지 타이머는 초기화되며, 새 목표는 set_target으로 지정)
+
+
+class Filter:
+    """
+    평활 필터의 기본 클래스입니다. arrays에 필터 전용 슬롯 배열을 {이름: (dtype, 초기값, 클래스별 여부)}로 선언하면
+    엔진이 할당·초기화·확장을 맡습니다. update와 labels는 slots 행 전체를 한 번에 처리해야 합니다.
+    """
+    arrays = {}
+
+    def update(self, state, slots, probs, now):
+        """(len(slots), C) 확률 → 평활된 확률. state["smoothed"], ["primed"], ["updated_at"]는 엔진이 갱신합니다."""
+        raise NotImplementedError
+
+    def labels(self, state, slots, smoothed, now):
+        return np.argmax(smoothed, axis=1)
+
+
+class EMAFilter(Filter):
+    """지수 평활: 첫 프레임은 그대로, 이후에는 alpha × 새 값 + (1 - alpha) × 이전 평활값"""
+
+    def __init__(self, alpha=ALPHA):
+        self.alpha = alpha
+
+    def update(self, state, slots, probs, now):
+        primed = state["primed"][slots, None]
+        blended = self.alpha * probs + (1 - self.alpha) * state["smoothed"][slots]
+        return np.where(primed, blended, probs)
+
+
+class OneEuroFilter(Filter):
+    """
+    One Euro 필터: 변화가 느릴 때는 강하게(min_cutoff), 빠를 때는 약하게(beta × 변화 속도) 평활해
+    정지 자세의 떨림과 자세 전환 시의 지연을 함께 줄입니다.
+    """
+    arrays = {"derivative": (np.float32, 0.0, True)}
+
+    def __init__(self, min_cutoff=1.0, beta=0.5, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        return 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+
+    def update(self, state, slots, probs, now):
+        primed = state["primed"][slots, None]
+        previous = state["smoothed"][slots]
+        dt = np.maximum(now - state["updated_at"][slots], 1e-3)[:, None]
+        a_d = self._alpha(self.d_cutoff, dt)
+        derivative = np.where(primed, a_d * (probs - previous) / dt + (1 - a_d) * state["derivative"][slots], 0.0)
+        a = self._alpha(self.min_cutoff + self.beta * np.abs(derivative), dt)
+        state["derivative"][slots] = derivative
+        return np.where(primed, a * probs + (1 - a) * previous, probs)
+
+
+class HysteresisFilter(Filter):
+    """
+    라벨 히스테리시스: 평활(inner, 기본 EMA) 결과의 최댓값 클래스가 바뀌어도
+    새 클래스가 min_dwell초 이상 계속 최댓값이어야 라벨을 바꿉니다. (경계에서 라벨이 깜빡이는 것 방지)
+    """
+
+    def __init__(self, min_dwell=0.3, inner=None):
+        self.min_dwell = min_dwell
+        self.inner = inner or EMAFilter()
+        self.arrays = {
+            **self.inner.arrays,
+            "current": (np.int16, -1, False),
+            "candidate": (np.int16, -1, False),
+            "candidate_since": (np.float64, np.nan, False),
+        }
+
+    def update(self, state, slots, probs, now):
+        return self.inner.update(state, slots, probs, now)
+
+    def labels(self, state, slots, smoothed, now):
+        top = self.inner.labels(state, slots, smoothed, now)
+        current = state["current"][slots]
+        candidate = state["candidate"][slots]
+        since = state["candidate_since"][slots]
+
+        current = np.where(current < 0, top, current)
+        new_candidate = (top != current) & (top != candidate)
+        candidate = np.where(top == current, -1, np.where(new_candidate, top, candidate))
+        since = np.where(candidate < 0, np.nan, np.where(new_candidate, now, since))
+        switch = (candidate >= 0) & (now - since >= self.min_dwell)
+        current = np.where(switch, candidate, current)
+        candidate[switch] = -1
+        since[switch] = np.nan
+
+        state["current"][slots] = current
+        state["candidate"][slots] = candidate
+        state["candidate_since"][slots] = since
+        return current
+
+
+FILTERS = {"ema": EMAFilter, "one_euro": OneEuroFilter, "hysteresis": HysteresisFilter}
+
+
+def make_filter(name=POSE_SMOOTHING_FILTER, options=None) -> Filter:
+    if name not in FILTERS:
+        raise ValueError(f"알 수 없는 평활 필터입니다: {name} (가능: {', '.join(FILTERS)})")
+    return FILTERS[name](**(POSE_SMOOTHING_OPTIONS if options is None else options))
+
+
+class SmoothingEngine:
+    # 엔진 공통 슬롯 배열: {이름: (dtype, 초기값, 클래스별 여부)}
+    ARRAYS = {
+        "smoothed": (np.float32, 0.0, True),
+        "primed": (np.bool_, False, False),
+        "updated_at": (np.float64, 0.0, False),
+        "target": (np.int16, -1, False),
+        "hold_start": (np.float64, np.nan, False),
+    }
+
+    def __init__(self, num_classes, capacity=POSE_SMOOTHING_CAPACITY, filter=None, hold_seconds=HOLD_SECONDS):
+        self.filter = filter or make_filter()
+        self.hold_seconds = hold_seconds
+        self.num_classes = num_classes
+        self.capacity = 0
+        self.state = {}
+        self.free = []
+        self._lock = threading.Lock()
+        self._pending = []
+        self._grow(capacity)
+
+    @property
+    def _specs(self):
+        return {**self.ARRAYS, **self.filter.arrays}
+
+    def _allocate(self, spec, capacity):
+        dtype, fill, per_class = spec
+        return np.full((capacity, self.num_classes) if per_class else (capacity,), fill, dtype=dtype)
+
+    def _grow(self, capacity):
+        for name, spec in self._specs.items():
+            array = self._allocate(spec, capacity)
+            if name in self.state:
+                array[:self.capacity] = self.state[name]
+            self.state[name] = array
+        # 낮은 번호부터 쓰도록 역순으로 쌓습니다.
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def _reset(self, slots):
+        for name, (_, fill, _) in self._specs.items():
+            self.state[name][slots] = fill
+
+    def _set_num_classes(self, num_classes):
+        # 모델 교체로 클래스 수가 바뀌면 클래스별 배열을 새로 만들고 모든 슬롯의 평활을 다시 시작합니다.
+        self.num_classes = num_classes
+        for name, spec in self._specs.items():
+            if spec[2]:
+                self.state[name] = self._allocate(spec, self.capacity)
+        self.state["primed"][:] = False
+
+    def acquire(self, target, hold_start=None) -> int:
+        """새 연결의 슬롯 번호. target은 자세 인덱스, hold_start는 재연결 시 이어갈 유지 시작 시각"""
+        with self._lock:
+            if not self.free:
+                self._grow(self.capacity * 2)
+            slot = self.free.pop()
+            self._reset(slot)
+            self.state["target"][slot] = target
+            self.state["hold_start"][slot] = np.nan if hold_start is None else hold_start
+            return slot
+
+    def release(self, slot):
+        with self._lock:
+            self._reset(slot)
+            self.free.append(slot)
+
+    def set_target(self, slot, target, hold_start=None):
+        with self._lock:
+            self.state["target"][slot] = target
+            self.state["hold_start"][slot] = np.nan if hold_start is None else hold_start
+
+    def hold_start(self, slot):
+        value = self.state["hold_start"][slot]
+        return None if np.isnan(value) else float(value)
+
+    def step(self, slots, probs, now, class_map=None):
+        """
+        slots의 확률 벡터 (N, C)를 한 번에 평활하고 (클래스 인덱스 (N,), 유지 이벤트 (N,))를 반환합니다.
+        class_map은 모델 클래스 인덱스 → 자세 인덱스 배열입니다. (없으면 같은 인덱스로 간주)
+        """
+        slots = np.asarray(slots, dtype=np.intp)
+        probs = np.asarray(probs, dtype=np.float32)
+        with self._lock:
+            if probs.shape[1] != self.num_classes:
+                self._set_num_classes(probs.shape[1])
+            smoothed = self.filter.update(self.state, slots, probs, now)
+            self.state["smoothed"][slots] = smoothed
+            self.state["primed"][slots] = True
+            self.state["updated_at"][slots] = now
+            labels = self.filter.labels(self.state, slots, smoothed, now)
+            poses = labels if class_map is None else class_map[labels]
+            return labels, self._observe(slots, poses, now)
+
+    def observe(self, slots, poses, now):
+        """평활 없이 이미 정한 자세 인덱스로 유지 타이머만 갱신하고 유지 이벤트를 반환합니다."""
+        with self._lock:
+            return self._observe(np.asarray(slots, dtype=np.intp), np.asarray(poses), now)
+
+    def _observe(self, slots, poses, now):
+        start = self.state["hold_start"][slots]
+        match = poses == self.state["target"][slots]
+        holding = ~np.isnan(start)
+        events = np.full(len(slots), HOLD_NONE, dtype=np.int8)
+        events[match & holding] = HOLD_HELD
+        events[match & ~holding] = HOLD_STARTED
+        events[~match & holding] = HOLD_RESET
+        start = np.where(match, np.where(holding, start, now), np.nan)
+        success = match & (now - start >= self.hold_seconds)
+        events[success] = HOLD_SUCCESS
+        start[success] = np.nan
+        self.state["hold_start"][slots] = start
+        return events
+
+    async def astep(self, slot, probs, class_map=None):
+        """
+        step의 비동기 단일 슬롯 버전입니다. 현재 이벤트 루프 차례에 들어온 요청을 모아 step 한 번으로 처리하므로
+        한 배치 추론의 결과를 받아 깨어난 연결들은 하나의 벡터 연산으로 평활됩니다. → (클래스 인덱스, 유지 이벤트)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush_pending)
+        self._pending.append((slot, probs, class_map, future))
+        return await future
+
+    def _flush_pending(self):
+        pending, self._pending = self._pending, []
+        groups = {}
+        for item in pending:
+            groups.setdefault((id(item[2]), len(item[1])), []).append(item)
+        now = time.time()
+        for group in groups.values():
+            try:
+                labels, events = self.step([item[0] for item in group], np.stack([item[1] for item in group]),
+                                           now, group[0][2])
+            except Exception as e:
+                for *_, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (*_, future), label, event in zip(group, labels, events):
+                if not future.done():
+                    future.set_result((int(label), int(event)))
+
+
+@functools.lru_cache(maxsize=8)
+def class_map(label_encoder, poses):
+    """모델 클래스 인덱스 → poses 인덱스 (poses에 없는 클래스는 -1)"""
+    return np.array([poses.index(c) if c in poses else -1 for c in label_encoder.classes_.tolist()])
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_smoothing_engine(num_classes) -> SmoothingEngine:
+    """프로세스 전역에서 공유하는 SmoothingEngine (처음 호출 시 설정의 필터로 만듭니다)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SmoothingEngine(num_classes)
+    return _engine
@@ -0,0 +1,256 @@
+import atexit
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+# 프레임 한 개의 좌표 수 (13개 관절 × x, y, z)
+COORDS_PER_FRAME = 39
+# 연결 중인 세션 상태 키의 만료 시간(초). 쓸 때마다(그리고 ConnectionReaper가 주기적으로) 다시 늘어나므로
+# 워커가 죽어 disconnect가 호출되지 않아도 마지막 갱신 후 이 시간이 지나면 캐시(Redis)에서 사라집니다.
+POSE_STATE_TTL = getattr(settings, "POSE_STATE_TTL", 300)
+
+_DEFAULT = object()
+
+
+@dataclass
+class HoldState:
+    """
+    연결별 게임 상태 중 매 프레임 갱신되는 필드만 담은 고정 크기 레코드입니다.
+    프레임 기록(pose_buffer)은 PoseRingBuffer에 따로 보관합니다.
+    """
+    target_pose: str
+    start_time: Optional[float] = None
+    frame_count: int = 0
+    success_count: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HoldState":
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+
+class PoseRingBuffer:
+    """
+    목표 자세 유지 중의 프레임 좌표를 저장하는 고정 크기 float32 링 버퍼입니다.
+    용량을 넘으면 가장 오래된 프레임부터 덮어쓰므로 메모리와 직렬화 크기가 유지 시간과 무관하게 일정합니다.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._frames = np.zeros((capacity, COORDS_PER_FRAME), dtype=np.float32)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, coords):
+        self._frames[self._next] = coords
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+    def to_array(self) -> np.ndarray:
+        """저장된 프레임을 오래된 순서로 (len, 39) 배열로 반환합니다."""
+        if self._size < self.capacity:
+            return self._frames[:self._size].copy()
+        return np.roll(self._frames, -self._next, axis=0)
+
+    @classmethod
+    def from_array(cls, frames: np.ndarray, capacity: int) -> "PoseRingBuffer":
+        buffer = cls(capacity)
+        for frame in np.asarray(frames, dtype=np.float32)[-capacity:]:
+            buffer.append(frame)
+        return buffer
+
+
+class CacheStateStore:
+    """
+    모든 쓰기를 즉시 Django 캐시(Redis)에 반영하는 저장소입니다.
+    load는 연결(재연결) 시에만 호출되고, save는 호출마다 캐시 왕복이 한 번 발생합니다.
+    """
+
+    def __init__(self, timeout=POSE_STATE_TTL):
+        self.timeout = timeout
+
+    def load(self, key):
+        return cache.get(key)
+
+    def save(self, key, value):
+        cache.set(key, value, timeout=self.timeout)
+
+    def release(self, key, value, ttl):
+        """연결 종료 시 마지막 상태를 재연결 대기 시간(ttl) 동안만 남깁니다."""
+        cache.set(key, value, timeout=ttl)
+
+    def touch(self, key):
+        """값은 그대로 두고 만료 시간만 다시 timeout으로 늘립니다. (자주 쓰지 않는 키용)"""
+        cache.touch(key, self.timeout)
+
+    async def aload(self, key):
+        return await cache.aget(key)
+
+    async def asave(self, key, value):
+        await cache.aset(key, value, timeout=self.timeout)
+
+    async def arelease(self, key, value, ttl):
+        await cache.aset(key, value, timeout=ttl)
+
+    async def atouch(self, key):
+        await cache.atouch(key, self.timeout)
+
+
+class MemoryStateStore:
+    """
+    프로세스 메모리에만 상태를 두는 저장소입니다. (Redis 없이 실행할 때)
+    가장 빠르지만 워커가 재시작되면 상태가 사라지고, 연결이 끊기면 바로 삭제됩니다.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    def load(self, key):
+        return self._data.get(key)
+
+    def save(self, key, value):
+        self._data[key] = value
+
+    def release(self, key, value, ttl):
+        self._data.pop(key, None)
+
+    def touch(self, key):
+        pass
+
+    # 메모리 접근은 블로킹이 없으므로 비동기 버전도 그대로 호출합니다.
+    async def aload(self, key):
+        return self.load(key)
+
+    async def asave(self, key, value):
+        self.save(key, value)
+
+    async def arelease(self, key, value, ttl):
+        self.release(key, value, ttl)
+
+    async def atouch(self, key):
+        self.touch(key)
+
+
+class WriteBehindWriter:
+    """
+    캐시 쓰기를 모아 백그라운드 스레드에서 주기적으로 set_many로 반영합니다.
+    같은 키에 대한 여러 번의 쓰기는 마지막 값 하나로 합쳐집니다.
+    """
+
+    def __init__(self, interval, timeout=None):
+        self.interval = interval
+        self.timeout = timeout
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, key, value, timeout=_DEFAULT):
+        with self._lock:
+            self._pending[key] = (value, self.timeout if timeout is _DEFAULT else timeout)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pose-state-writer", daemon=True)
+                self._thread.start()
+
+    def pending(self, key):
+        with self._lock:
+            return self._pending.get(key, (None, None))[0]
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        by_timeout = {}
+        for key, (value, timeout) in pending.items():
+            by_timeout.setdefault(timeout, {})[key] = value
+        for timeout, values in by_timeout.items():
+            cache.set_many(values, timeout=timeout)
+        return len(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("상태 write-behind 플러시에 실패했습니다.")
+
+
+class HybridStateStore(MemoryStateStore):
+    """
+    프로세스 메모리를 기준 상태로 쓰고, Redis에는 WriteBehindWriter로 비동기 반영하는 저장소입니다.
+    프레임 처리 중에는 네트워크 왕복이 없고, 연결(재연결) 시 메모리에 없으면 캐시에서 복구합니다.
+    """
+
+    def __init__(self, flush_interval, timeout=POSE_STATE_TTL):
+        super().__init__()
+        self.writer = WriteBehindWriter(flush_interval, timeout)
+        atexit.register(self.writer.flush)
+
+    def load(self, key):
+        value = super().load(key)
+        if value is None:
+            value = self.writer.pending(key)
+        if value is None:
+            value = cache.get(key)
+        return value
+
+    def save(self, key, value):
+        super().save(key, value)
+        self.writer.put(key, value)
+
+    def release(self, key, value, ttl):
+        super().release(key, value, ttl)
+        self.writer.put(key, value, timeout=ttl)
+
+    def touch(self, key):
+        # 메모리 값을 다시 쓰기 대기열에 올려 다음 플러시에서 만료 시간이 늘어나게 합니다.
+        value = super().load(key)
+        if value is not None:
+            self.writer.put(key, value)
+
+    async def aload(self, key):
+        value = super().load(key)
+        if value is None:
+            value = self.writer.pending(key)
+        if value is None:
+            value = await cache.aget(key)
+        return value
+
+
+STATE_BACKENDS = ("cache", "memory", "hybrid")
+_state_store = None
+
+
+def get_state_store():
+    """settings.POSE_STATE_BACKEND에 따라 프로세스 전역 상태 저장소를 반환합니다."""
+    global _state_store
+    if _state_store is None:
+        backend = getattr(settings, "POSE_STATE_BACKEND", "hybrid")
+        if backend == "cache":
+            _state_store = CacheStateStore()
+        elif backend == "memory":
+            _state_store = MemoryStateStore()
+        elif backend == "hybrid":
+            _state_store = HybridStateStore(getattr(settings, "POSE_STATE_FLUSH_INTERVAL", 0.2))
+        else:
+            raise ImproperlyConfigured(
+                f"POSE_STATE_BACKEND는 {STATE_BACKENDS} 중 하나여야 합니다: {backend!r}"
+            )
+    return _state_store
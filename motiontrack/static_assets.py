@@ -0,0 +1,305 @@
+"""
+정적 파일 빌드: collectstatic이 posemodule ES 모듈을 번들 하나로 합쳐 최소화하고, 내용 해시 이름과 gzip·brotli 사본을 만듭니다.
+
+원본 ES 모듈을 그대로 쓰면 브라우저는 main.js → socket.js·posehandler.js → kalmanfilter.js … 처럼 import를 한 단계씩
+발견하며 요청하므로 카메라 루프가 시작되기 전까지 왕복이 여러 번 필요합니다. PoseStaticFilesStorage는
+POSE_STATIC_BUNDLES의 진입 모듈마다 상대 경로 import 그래프를 모듈 하나로 합친 뒤, whitenoise의
+CompressedManifestStaticFilesStorage처럼 모든 파일을 "이름.<해시>.확장자"로 저장하고 압축 사본을 만듭니다.
+해시 이름의 파일은 whitenoise가 Cache-Control: immutable(max-age 10년)로, 클라이언트가 지원하면 .br/.gz로 보냅니다.
+
+번들러는 이 저장소의 모듈이 쓰는 형태만 지원합니다:
+  - 상대 경로 import: import { a, b as c } from "./x.js";
+  - 절대 URL import(CDN 등)는 번들 맨 위로 그대로 올림
+  - export function/class/const/let/var 선언 (export default, export { … }는 ValueError)
+모듈마다 함수 스코프로 감싸 최상위 이름이 섞이지 않고, 가져온 이름은 모듈 평가 시점의 값입니다.
+(export let을 다시 대입하는 live binding은 지원하지 않음. 객체 속성 변경은 그대로 공유)
+"""
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# {번들 이름: 진입 ES 모듈} (정적 파일 이름 기준)
+POSE_STATIC_BUNDLES = getattr(settings, "POSE_STATIC_BUNDLES", {
+    "js/pose.bundle.js": "js/posemodule/main.js",
+    "js/pose3d.bundle.js": "js/posemodule/main3d.js",
+})
+# False이면 번들을 최소화하지 않습니다. (번들 결과를 읽어 볼 때)
+POSE_STATIC_MINIFY = getattr(settings, "POSE_STATIC_MINIFY", True)
+
+_IMPORT = re.compile(
+    r"^import\s+(?:(?P<names>\{[^}]*\})|(?P<other>[^\"';]+?))\s+from\s+(?P<quote>[\"'])(?P<spec>[^\"']+)(?P=quote)[ \t]*;?",
+    re.M,
+)
+_BARE_IMPORT = re.compile(r"^import\s*[\"']", re.M)
+_EXPORT_DECLARATION = re.compile(r"^export\s+(?=(?:async\s+)?function\b|class\b|const\b|let\b|var\b)", re.M)
+_EXPORT_NAME = re.compile(r"^export\s+(?:async\s+)?(?:function\s*\*?|class|const|let|var)\s+([\w$]+)", re.M)
+_OTHER_EXPORT = re.compile(r"^export\s+(?!(?:async\s+)?function\b|class\b|const\b|let\b|var\b)", re.M)
+
+
+def _is_relative(spec):
+    return spec.startswith(("./", "../"))
+
+
+def module_imports(name, source):
+    """ES 모듈 소스의 상대 경로 import를 정적 파일 이름으로 바꿔 반환합니다."""
+    base = posixpath.dirname(name)
+    return [posixpath.normpath(posixpath.join(base, m["spec"])) for m in _IMPORT.finditer(source)
+            if _is_relative(m["spec"])]
+
+
+def _module_var(name):
+    return "__pm_" + re.sub(r"[^\w$]", "_", name)
+
+
+def _wrap_module(name, source, hoisted):
+    """모듈 하나를 함수 스코프로 감싸 export한 이름을 담은 객체를 돌려주는 선언으로 바꿉니다."""
+    if _BARE_IMPORT.search(source):
+        raise ValueError(f"{name}: 부수 효과 import(import \"…\")는 번들에서 지원하지 않습니다.")
+    if _OTHER_EXPORT.search(source):
+        raise ValueError(f"{name}: export default / export {{ … }}는 번들에서 지원하지 않습니다.")
+    base = posixpath.dirname(name)
+
+    def replace_import(match):
+        if not _is_relative(match["spec"]):
+            hoisted.setdefault(match.group(0).rstrip(";").strip() + ";", None)
+            return ""
+        if match["names"] is None:
+            raise ValueError(f"{name}: 상대 경로 모듈은 이름 import({{ … }})만 지원합니다: {match.group(0)}")
+        dependency = posixpath.normpath(posixpath.join(base, match["spec"]))
+        names = re.sub(r"\s+as\s+", ": ", match["names"])
+        return f"const {names} = {_module_var(dependency)};"
+
+    exports = _EXPORT_NAME.findall(source)
+    body = _EXPORT_DECLARATION.sub("", _IMPORT.sub(replace_import, source))
+    returned = f"return {{ {', '.join(exports)} }};\n" if exports else ""
+    return f"const {_module_var(name)} = (() => {{\n{body.rstrip()}\n{returned}}})();\n"
+
+
+def bundle_modules(entry, read):
+    """
+    entry에서 시작하는 상대 경로 import 그래프를 ES 모듈 하나로 합칩니다.
+    read(name)는 정적 파일 이름의 소스를 돌려줘야 하며, 의존 모듈이 먼저 평가되도록 위상 정렬합니다.
+    """
+    order, sources, visiting = [], {}, set()
+
+    def visit(name):
+        if name in sources:
+            return
+        if name in visiting:
+            raise ValueError(f"순환 import는 번들에서 지원하지 않습니다: {name}")
+        visiting.add(name)
+        source = read(name)
+        for dependency in module_imports(name, source):
+            visit(dependency)
+        visiting.discard(name)
+        sources[name] = source
+        order.append(name)
+
+    visit(entry)
+    hoisted = {}
+    modules = [_wrap_module(name, sources[name], hoisted) for name in order]
+    return "".join(line + "\n" for line in hoisted) + "".join(modules)
+
+
+# ── 최소화 ──────────────────────────────────────────────────────────────
+# 주석과 들여쓰기·연속 공백만 지우고 이름은 바꾸지 않는 보수적인 최소화입니다.
+# 줄바꿈은 자동 세미콜론 삽입(ASI)에 영향이 없는 자리에서만 지웁니다.
+
+_WHITESPACE = " \t\r\n\f\v\ufeff\xa0"
+# 이 문자 뒤의 "/"는 나눗셈이 아니라 정규식 리터럴의 시작
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_AFTER_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case",
+                         "do", "else", "yield", "await"}
+# 앞 토큰이 이 문자로 끝나거나 다음 토큰이 이 문자로 시작하면 사이의 줄바꿈을 지워도 ASI가 바뀌지 않음
+_JOIN_AFTER = set("{[(,;=:")
+_JOIN_BEFORE = set(")]},;:.?")
+
+
+def _is_word(char):
+    return char.isalnum() or char in "_$\\" or ord(char) > 127
+
+
+def _skip_string(source, i):
+    quote = source[i]
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        if char == "\n":
+            break
+        i += 1
+    raise ValueError(f"닫히지 않은 문자열 리터럴 (위치 {i})")
+
+
+def _skip_template(source, i):
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "`":
+            return i + 1
+        if source.startswith("${", i):
+            i = _skip_expression(source, i + 2)
+            continue
+        i += 1
+    raise ValueError(f"닫히지 않은 템플릿 리터럴 (위치 {i})")
+
+
+def _skip_expression(source, i):
+    """템플릿 리터럴의 ${ … } 안을 짝이 맞는 "}" 다음 위치까지 건너뜁니다. (안쪽은 그대로 둠)"""
+    depth = 0
+    while i < len(source):
+        char = source[i]
+        if char in "'\"":
+            i = _skip_string(source, i)
+            continue
+        if char == "`":
+            i = _skip_template(source, i)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    raise ValueError(f"닫히지 않은 템플릿 표현식 (위치 {i})")
+
+
+def _skip_regex(source, i):
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            break
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "/":
+            i += 1
+            while i < len(source) and _is_word(source[i]):
+                i += 1
+            return i
+        i += 1
+    raise ValueError(f"닫히지 않은 정규식 리터럴 (위치 {i})")
+
+
+def _regex_allowed(previous):
+    return not previous or previous[-1] in _REGEX_AFTER or previous in _REGEX_AFTER_KEYWORDS
+
+
+def _separator(previous, token, newline):
+    if newline and previous[-1] not in _JOIN_AFTER and token[0] not in _JOIN_BEFORE:
+        return "\n"
+    if _is_word(previous[-1]) and _is_word(token[0]):
+        return " "
+    # a + +b, a - -b, 1 .toString(), a / /re/ 처럼 붙이면 뜻이 바뀌는 경우
+    if (previous[-1] in "+-/" and token[0] == previous[-1]) or (previous[-1] == "/" and token[0] == "*"):
+        return " "
+    if previous[-1].isdigit() and token[0] == ".":
+        return " "
+    return ""
+
+
+def minify_js(source):
+    """자바스크립트 소스에서 주석과 불필요한 공백·줄바꿈을 지웁니다. (문자열·템플릿·정규식 리터럴은 그대로)"""
+    out = []
+    previous = ""
+    # 마지막 토큰 뒤에 공백(" ")이나 줄바꿈("\n")이 있었는지
+    gap = ""
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char in _WHITESPACE:
+            start = i
+            while i < length and source[i] in _WHITESPACE:
+                i += 1
+            gap = "\n" if gap == "\n" or "\n" in source[start:i] else " "
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end < 0 else end
+            gap = gap or " "
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            if end < 0:
+                raise ValueError(f"닫히지 않은 주석 (위치 {i})")
+            gap = "\n" if gap == "\n" or "\n" in source[i:end] else " "
+            i = end + 2
+            continue
+
+        start = i
+        if char in "'\"":
+            i = _skip_string(source, i)
+        elif char == "`":
+            i = _skip_template(source, i)
+        elif char == "/" and _regex_allowed(previous):
+            i = _skip_regex(source, i)
+        elif _is_word(char):
+            while i < length and _is_word(source[i]):
+                i += 1
+        else:
+            i += 1
+        token = source[start:i]
+        if previous and gap:
+            out.append(_separator(previous, token, gap == "\n"))
+        out.append(token)
+        previous, gap = token, ""
+    return "".join(out) + "\n"
+
+
+class PoseStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage에 POSE_STATIC_BUNDLES 번들 빌드를 더한 저장소입니다.
+    collectstatic이 원본 파일을 STATIC_ROOT로 모은 뒤 번들을 만들고, 번들까지 해시 이름·압축 사본으로 처리합니다.
+    manifest가 없으면(collectstatic 전: 개발 서버·테스트) 해시 없는 원래 이름의 URL을 씁니다.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for bundle, entry in POSE_STATIC_BUNDLES.items():
+                source = bundle_modules(entry, self._read_source)
+                if POSE_STATIC_MINIFY:
+                    source = minify_js(source)
+                if self.exists(bundle):
+                    self.delete(bundle)
+                self._save(bundle, ContentFile(source.encode("utf-8")))
+                paths[bundle] = (self, bundle)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _read_source(self, name):
+        with self.open(name) as f:
+            return f.read().decode("utf-8")
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+
+def entry_script(name):
+    """
+    템플릿이 불러올 진입 모듈: collectstatic으로 name의 번들을 만들었으면 번들, 아니면 원본 ES 모듈 이름.
+    ({% static %}이 manifest의 해시 이름으로 바꿈)
+    """
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    for bundle, entry in POSE_STATIC_BUNDLES.items():
+        if entry == name and bundle in getattr(staticfiles_storage, "hashed_files", {}):
+            return bundle
+    return name
@@ -1,3 +1,1475 @@
-from django.test import TestCase
+import asyncio
+import fnmatch
+import glob
+import importlib.util
+import io
+import json
+import os
+import pickle
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from itertools import combinations
+import tempfile
+from datetime import timedelta
+import unittest
+import warnings
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django_redis.cache import RedisCache
+
+from dnn import model_loader
+from dnn.dataset import MANIFEST_FILE, build_dataset, load_training_data
+from dnn.features import CONNECTIONS, FEATURE_DIM, FEATURE_NAMES, extract_features
+from dnn.numpy_model import NumpyPoseModel
+from dnn.registry import LABEL_CLASSES_FILE, WEIGHTS_FILE, ModelRegistry, RegistryError
+from .admission import SLOT_KEY, AdmissionController, admission_limits
+from .bench import InProcessConnection, run_benchmark, stage_timing
+from .consumers import POSES, AsyncPoseConsumer, PoseGameMixin
+from . import ingest, leaderboard, metrics, state
+from .governor import FrameRateGovernor
+from .inference import InferenceScheduler, InferenceWorker, RemoteInferenceError, RemoteInferenceScheduler
+from .ingest import ScoreIngestor, write_batch
+from .liveness import IDLE_CLOSE_CODE, ConnectionReaper
+from .metrics import Histogram, MetricsRegistry, timed_stage
+from .prediction_cache import PredictionCache
+from .redis_shards import HashRing
+from .smoothing import (
+    ALPHA, HOLD_HELD, HOLD_NONE, HOLD_RESET, HOLD_STARTED, HOLD_SUCCESS, HysteresisFilter, OneEuroFilter,
+    SmoothingEngine,
+)
+from .models import Score, Session
+from .protocol import ENCODING_INT16, decode_binary_frame, encode_binary_frame, parse_frame
+from .management.commands.pose_state import find_orphans
+from .management.commands.serve_asgi import flush_write_behind
+from .state import HoldState, HybridStateStore, MemoryStateStore, PoseRingBuffer
+from .static_assets import bundle_modules, minify_js
+
+# 서 있는 자세의 13개 관절 (x, y, z) 예시 프레임
+SAMPLE_COORDS = [
+    0.50, 0.20, -0.30,
+    0.58, 0.33, -0.10, 0.42, 0.33, -0.10,
+    0.62, 0.47, -0.05, 0.38, 0.47, -0.05,
+    0.63, 0.60, -0.08, 0.37, 0.60, -0.08,
+    0.55, 0.62, 0.00, 0.45, 0.62, 0.00,
+    0.56, 0.78, 0.02, 0.44, 0.78, 0.02,
+    0.56, 0.93, 0.08, 0.44, 0.93, 0.08,
+]
+
+
+def sample_frames(count=64, noise=0.03, seed=0):
+    """SAMPLE_COORDS에 잡음을 더한 랜드마크 프레임들의 (count, 63) 특징 배열"""
+    rng = np.random.default_rng(seed)
+    base = np.array(SAMPLE_COORDS)
+    extractor = PoseGameMixin()
+    return np.stack([
+        extractor.extract_features((base + rng.normal(0, noise, base.shape)).tolist())
+        for _ in range(count)
+    ])
+
+
+def reference_features(coords):
+    """기존 관절별 루프 구현 (벡터화 구현 검증용)"""
+    landmarks = np.array(coords, dtype=float).reshape(13, 3)
+    center = (landmarks[7, :2] + landmarks[8, :2]) / 2.0
+    shoulders = (landmarks[1, :2] + landmarks[2, :2]) / 2.0
+    max_distance = np.linalg.norm(shoulders - center) * 2.5
+    for lm in landmarks:
+        max_distance = max(max_distance, np.linalg.norm(lm[:2] - center))
+    norm = np.array([[(lm[0] - center[0]) / max_distance, (lm[1] - center[1]) / max_distance,
+                      lm[2] / max_distance] for lm in landmarks])
+    angles = []
+    for dim in ("2d", "3d"):
+        points = norm[:, :2] if dim == "2d" else norm
+        for joint, neighbors in CONNECTIONS.items():
+            for i, j in combinations(neighbors, 2):
+                v1 = points[i] - points[joint]
+                v2 = points[j] - points[joint]
+                v1 = v1 / (np.linalg.norm(v1) + 1e-8)
+                v2 = v2 / (np.linalg.norm(v2) + 1e-8)
+                angles.append(np.arccos(np.clip(np.dot(v1, v2), -1, 1)))
+    return np.concatenate([norm.ravel(), angles])
+
+
+class FeatureExtractionTests(SimpleTestCase):
+    def test_matches_per_joint_reference(self):
+        rng = np.random.default_rng(0)
+        batch = np.array(SAMPLE_COORDS) + rng.normal(0, 0.05, (32, 39))
+        features = extract_features(batch.reshape(32, 13, 3))
+
+        self.assertEqual(features.shape, (32, FEATURE_DIM))
+        self.assertEqual(len(FEATURE_NAMES), FEATURE_DIM)
+        for row, coords in zip(features, batch):
+            np.testing.assert_allclose(row, reference_features(coords), atol=1e-12)
+
+    def test_single_frame_accepts_flat_coords(self):
+        features = extract_features(SAMPLE_COORDS)
+        self.assertEqual(features.shape, (1, 63))
+
+    def test_rejects_wrong_length(self):
+        with self.assertRaises(ValueError):
+            extract_features([0.0] * 10)
+
+
+class PoseRingBufferTests(SimpleTestCase):
+    def test_keeps_latest_frames_in_order(self):
+        buffer = PoseRingBuffer(capacity=4)
+        for i in range(6):
+            buffer.append(np.full(39, i))
+
+        frames = buffer.to_array()
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(frames.dtype, np.float32)
+        np.testing.assert_array_equal(frames[:, 0], [2, 3, 4, 5])
+
+    def test_round_trip_and_clear(self):
+        buffer = PoseRingBuffer.from_array(np.arange(3 * 39).reshape(3, 39), capacity=8)
+        np.testing.assert_array_equal(buffer.to_array()[:, 0], [0, 39, 78])
+        buffer.clear()
+        self.assertEqual(buffer.to_array().shape, (0, 39))
+
+
+class HoldTransitionTests(SimpleTestCase):
+    def setUp(self):
+        self.game = PoseGameMixin()
+        self.game.scope = {}
+        self.game.resolve_session()
+        self.game.start_game({"target_pose": "tree"})
+
+    def tearDown(self):
+        self.game.smoothing.release(self.game.slot)
+
+    def test_hold_history_stays_bounded(self):
+        self.game.pose_buffer = PoseRingBuffer(capacity=10)
+        for _ in range(50):
+            self.game.update_hold("tree", SAMPLE_COORDS)
+        self.assertEqual(len(self.game.pose_buffer), 10)
+        self.assertEqual(self.game.hold.frame_count, 50)
+
+    def test_transitions_and_success(self):
+        with mock.patch("motiontrack.consumers.time.time", return_value=100.0):
+            _, transitioned = self.game.update_hold("tree", SAMPLE_COORDS)
+            self.assertTrue(transitioned)
+            _, transitioned = self.game.update_hold("tree", SAMPLE_COORDS)
+            self.assertFalse(transitioned)
+        with mock.patch("motiontrack.consumers.time.time", return_value=105.0):
+            response, transitioned = self.game.update_hold("tree", SAMPLE_COORDS)
+
+        self.assertTrue(transitioned)
+        self.assertEqual(response["effect"], "success")
+        self.assertEqual(response["target"], "tree")
+        self.assertNotEqual(self.game.hold.target_pose, "tree")
+        self.assertEqual(self.game.hold.success_count, 1)
+        self.assertEqual(len(self.game.pose_buffer), 3)
+
+    def test_mismatch_resets_hold(self):
+        self.game.update_hold("tree", SAMPLE_COORDS)
+        _, transitioned = self.game.update_hold("dog", SAMPLE_COORDS)
+        self.assertTrue(transitioned)
+        self.assertIsNone(self.game.hold.start_time)
+        self.assertEqual(len(self.game.pose_buffer), 0)
+        self.assertEqual(HoldState.from_dict(self.game.hold.to_dict()), self.game.hold)
+
+
+class SmoothingEngineTests(SimpleTestCase):
+    def test_batched_ema_matches_per_connection_smoothing(self):
+        engine = SmoothingEngine(num_classes=4, capacity=2)
+        slots = [engine.acquire(target=0) for _ in range(5)]  # 용량을 넘으면 배열을 늘림
+        self.assertEqual(sorted(slots), [0, 1, 2, 3, 4])
+        rng = np.random.default_rng(0)
+        expected = [None] * len(slots)
+        for step in range(4):
+            probs = rng.dirichlet(np.ones(4), size=len(slots)).astype(np.float32)
+            labels, _ = engine.step(slots, probs, now=float(step))
+            for i, p in enumerate(probs):
+                expected[i] = p if expected[i] is None else ALPHA * p + (1 - ALPHA) * expected[i]
+            np.testing.assert_allclose(engine.state["smoothed"][slots], expected, rtol=1e-6)
+            np.testing.assert_array_equal(labels, np.argmax(expected, axis=1))
+
+        # 반납한 슬롯은 초기화된 뒤 재사용됩니다.
+        engine.release(slots[2])
+        self.assertEqual(engine.acquire(target=1), slots[2])
+        self.assertFalse(engine.state["primed"][slots[2]])
+
+    def test_hold_events_follow_target_through_class_map(self):
+        engine = SmoothingEngine(num_classes=2, capacity=4, hold_seconds=5)
+        slot = engine.acquire(target=3)
+        class_map = np.array([3, 0])  # 모델 클래스 0 → 자세 3
+        target, other = np.array([[0.9, 0.1]]), np.array([[0.0, 1.0]])
+
+        events = [engine.step([slot], target, now)[1][0] for now in (100.0, 101.0)]
+        self.assertEqual(events, [HOLD_NONE, HOLD_NONE])  # class_map 없이는 자세 0
+        events = [engine.step([slot], probs, now, class_map)[1][0]
+                  for probs, now in ((target, 102.0), (target, 103.0), (other, 104.0), (other, 104.5))]
+        self.assertEqual(events[:2], [HOLD_STARTED, HOLD_HELD])
+        self.assertEqual(events[2:], [HOLD_RESET, HOLD_NONE])
+
+        self.assertEqual(engine.observe([slot], [3], 110.0)[0], HOLD_STARTED)
+        self.assertEqual(engine.hold_start(slot), 110.0)
+        self.assertEqual(engine.observe([slot], [3], 115.0)[0], HOLD_SUCCESS)
+        self.assertIsNone(engine.hold_start(slot))
+
+    def test_class_count_change_restarts_smoothing(self):
+        engine = SmoothingEngine(num_classes=4, capacity=2)
+        slot = engine.acquire(target=0)
+        engine.step([slot], np.full((1, 4), 0.25), now=0.0)
+        labels, _ = engine.step([slot], np.array([[0.1, 0.2, 0.7]]), now=1.0)
+        self.assertEqual(labels[0], 2)
+        np.testing.assert_allclose(engine.state["smoothed"][slot], [0.1, 0.2, 0.7], rtol=1e-6)
+
+    def test_hysteresis_waits_min_dwell_before_switching(self):
+        engine = SmoothingEngine(num_classes=2, capacity=2, filter=HysteresisFilter(min_dwell=0.5))
+        slot = engine.acquire(target=0)
+        a, b = np.array([[1.0, 0.0]]), np.array([[0.0, 1.0]])
+        labels = [int(engine.step([slot], probs, now)[0][0])
+                  for probs, now in ((a, 0.0), (b, 0.1), (b, 0.2), (a, 0.3), (b, 0.4), (b, 0.7), (b, 0.95))]
+        # 0.1에 처음 역전되지만 0.3에 되돌아가 후보가 취소되고, 0.4부터 0.5초 뒤(0.95)에 전환
+        self.assertEqual(labels, [0, 0, 0, 0, 0, 0, 1])
+
+    def test_one_euro_is_smoother_when_still(self):
+        engine = SmoothingEngine(num_classes=2, capacity=2, filter=OneEuroFilter(min_cutoff=1.0, beta=0.0))
+        slot = engine.acquire(target=0)
+        engine.step([slot], np.array([[1.0, 0.0]]), now=0.0)
+        engine.step([slot], np.array([[0.0, 1.0]]), now=1 / 30)
+        # 30fps에서 차단 주파수 1Hz → 새 값의 반영 비율은 약 0.17
+        self.assertAlmostEqual(float(engine.state["smoothed"][slot, 1]), 0.173, places=2)
+
+    def test_astep_smooths_concurrent_connections_in_one_step(self):
+        engine = SmoothingEngine(num_classes=4, capacity=8)
+        slots = [engine.acquire(target=0) for _ in range(6)]
+        probs = np.eye(4, dtype=np.float32)[[0, 1, 2, 3, 0, 1]]
+
+        async def run():
+            return await asyncio.gather(*(engine.astep(slot, p) for slot, p in zip(slots, probs)))
+
+        with mock.patch.object(engine, "step", wraps=engine.step) as step:
+            results = asyncio.run(run())
+        self.assertEqual(step.call_count, 1)
+        self.assertEqual([label for label, _ in results], [0, 1, 2, 3, 0, 1])
+        self.assertEqual([event for _, event in results], [HOLD_STARTED, 0, 0, 0, HOLD_STARTED, 0])
+
+
+class StateStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_hybrid_coalesces_writes_until_flush(self):
+        store = HybridStateStore(flush_interval=60)
+        for frame_count in range(5):
+            store.save("pose_state:a", {"frame_count": frame_count})
+
+        self.assertEqual(store.load("pose_state:a"), {"frame_count": 4})
+        self.assertIsNone(cache.get("pose_state:a"))
+        self.assertEqual(store.writer.flush(), 1)
+        self.assertEqual(cache.get("pose_state:a"), {"frame_count": 4})
+
+    def test_hybrid_restores_from_cache_in_new_process(self):
+        store = HybridStateStore(flush_interval=60)
+        store.save("pose_state:b", {"target_pose": "dog"})
+        store.release("pose_state:b", {"target_pose": "tree"}, ttl=30)
+        store.writer.flush()
+
+        restarted = HybridStateStore(flush_interval=60)
+        self.assertEqual(restarted.load("pose_state:b"), {"target_pose": "tree"})
+
+    def test_memory_store_drops_state_on_release(self):
+        store = MemoryStateStore()
+        store.save("pose_state:c", {"target_pose": "dog"})
+        store.release("pose_state:c", {"target_pose": "dog"}, ttl=30)
+        self.assertIsNone(store.load("pose_state:c"))
+        self.assertIsNone(cache.get("pose_state:c"))
+
+
+class FrameRateGovernorTests(SimpleTestCase):
+    def test_drops_frames_faster_than_allowed_rate(self):
+        governor = FrameRateGovernor(max_fps=10)
+        self.assertTrue(governor.admit(0.0))
+        self.assertFalse(governor.admit(0.01))
+        self.assertTrue(governor.admit(0.1))
+        self.assertEqual(governor.dropped, 1)
+
+    def test_slows_down_on_high_latency_and_recovers(self):
+        governor = FrameRateGovernor(max_fps=20, min_fps=5, latency_high_ms=100)
+        governor.window_start = 0.0
+        for _ in range(10):
+            governor.record_latency(0.3)
+        self.assertEqual(governor.adjust(1.0), 14)
+        self.assertIsNone(governor.adjust(1.5))
+
+        governor.latency_ema = None
+        for _ in range(10):
+            governor.record_latency(0.01)
+        self.assertEqual(governor.adjust(2.0), 16)
+
+    def test_never_goes_below_min_fps(self):
+        governor = FrameRateGovernor(max_fps=6, min_fps=5)
+        governor.window_start = 0.0
+        governor.dropped = 10
+        self.assertEqual(governor.adjust(1.0), 5)
+        governor.dropped = 10
+        self.assertIsNone(governor.adjust(2.0))
+
+
+class BinaryFrameTests(SimpleTestCase):
+    def test_float32_round_trip_is_zero_copy(self):
+        data = encode_binary_frame(SAMPLE_COORDS, seq=7, timestamp=1234.5)
+        self.assertEqual(len(data), 16 + 39 * 4)
+
+        coords, seq, timestamp = decode_binary_frame(data)
+        self.assertEqual((seq, timestamp), (7, 1234.5))
+        self.assertFalse(coords.flags.owndata)
+        np.testing.assert_allclose(coords, SAMPLE_COORDS, atol=1e-7)
+
+    def test_int16_round_trip(self):
+        data = encode_binary_frame(SAMPLE_COORDS, encoding=ENCODING_INT16)
+        self.assertEqual(len(data), 16 + 39 * 2)
+        coords, _, _ = decode_binary_frame(data)
+        np.testing.assert_allclose(coords, SAMPLE_COORDS, atol=1e-4)
+
+    def test_rejects_malformed_frames(self):
+        data = encode_binary_frame(SAMPLE_COORDS)
+        for bad in (data[:10], data[:-4], b"\x02" + data[1:]):
+            with self.assertRaises(ValueError):
+                decode_binary_frame(bad)
+
+
+class ClientFeatureTests(SimpleTestCase):
+    def setUp(self):
+        self.features = extract_features(SAMPLE_COORDS)[0]
+
+    def test_binary_and_json_feature_frames(self):
+        coords, seq, features = parse_frame(bytes_data=encode_binary_frame(SAMPLE_COORDS, seq=3,
+                                                                           features=self.features))
+        self.assertEqual(seq, 3)
+        np.testing.assert_allclose(coords, SAMPLE_COORDS, atol=1e-7)
+        np.testing.assert_allclose(features, self.features, atol=1e-6)
+
+        text = json.dumps({"coords": SAMPLE_COORDS, "features": self.features.tolist(), "schema": 1})
+        np.testing.assert_allclose(parse_frame(text)[2], self.features, atol=1e-6)
+        self.assertIsNone(parse_frame(json.dumps({"coords": SAMPLE_COORDS}))[2])
+
+    def test_rejects_invalid_features(self):
+        bad_frames = [
+            {"features": self.features.tolist(), "schema": 99},
+            {"features": self.features[:10].tolist(), "schema": 1},
+            {"features": [float("nan")] * FEATURE_DIM, "schema": 1},
+        ]
+        for frame in bad_frames:
+            with self.assertRaises(ValueError):
+                parse_frame(json.dumps({"coords": SAMPLE_COORDS, **frame}))
+
+    def test_spot_check_disables_mismatching_client(self):
+        game = PoseGameMixin()
+        game.scope = {}
+        game.resolve_session()
+        with mock.patch("motiontrack.consumers.POSE_CLIENT_FEATURES", True):
+            game.start_game()
+        coords = np.array(SAMPLE_COORDS)
+
+        # 첫 특징 프레임은 항상 검사하고, 이후에는 표본 비율로만 검사합니다.
+        with mock.patch.object(PoseGameMixin, "extract_features", wraps=game.extract_features) as extract:
+            with mock.patch("motiontrack.consumers.random.random", return_value=0.5):
+                for _ in range(3):
+                    normalized, features = game.prepare_frame(coords, self.features.astype(np.float32))
+            self.assertEqual(extract.call_count, 1)
+        np.testing.assert_allclose(normalized.ravel(), self.features[:39], atol=1e-6)
+
+        mismatches = metrics.CLIENT_FEATURE_MISMATCHES.value
+        with mock.patch("motiontrack.consumers.random.random", return_value=0.0):
+            _, features = game.prepare_frame(coords, self.features + 0.1)
+        np.testing.assert_allclose(features, self.features)
+        self.assertFalse(game.client_features_trusted)
+        self.assertEqual(metrics.CLIENT_FEATURE_MISMATCHES.value - mismatches, 1)
+        self.assertIsNone(game.prepare_frame(coords, self.features)[1])
+
+
+class InferenceSchedulerTests(SimpleTestCase):
+    async def test_concurrent_frames_share_one_forward_pass(self):
+        calls = []
+
+        def predict_fn(features):
+            calls.append(features.shape)
+            return features[:, :4] * 2
+
+        scheduler = InferenceScheduler(predict_fn, max_batch_size=8, max_wait_ms=50)
+        frames = [np.full(63, i, dtype=float) for i in range(5)]
+        results = await asyncio.gather(*(scheduler.predict(f) for f in frames))
+
+        self.assertEqual(calls, [(5, 63)])
+        for i, row in enumerate(results):
+            np.testing.assert_array_equal(row, np.full(4, i * 2.0))
+
+    async def test_batch_is_split_at_max_batch_size(self):
+        sizes = []
+
+        def predict_fn(features):
+            sizes.append(len(features))
+            return features
+
+        scheduler = InferenceScheduler(predict_fn, max_batch_size=3, max_wait_ms=50)
+        await asyncio.gather(*(scheduler.predict(np.zeros(63)) for _ in range(7)))
+
+        self.assertEqual(sum(sizes), 7)
+        self.assertTrue(all(size <= 3 for size in sizes))
+
+    async def test_predict_error_is_raised_to_every_caller(self):
+        def predict_fn(features):
+            raise RuntimeError("boom")
+
+        scheduler = InferenceScheduler(predict_fn, max_batch_size=4, max_wait_ms=10)
+        results = await asyncio.gather(
+            scheduler.predict(np.zeros(63)), scheduler.predict(np.zeros(63)),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    async def test_frames_pinned_to_different_models_are_not_mixed(self):
+        calls = []
+
+        def predict_fn(features, loaded=None):
+            calls.append((loaded, len(features)))
+            return features
+
+        scheduler = InferenceScheduler(predict_fn, max_batch_size=8, max_wait_ms=50)
+        await asyncio.gather(*(scheduler.predict(np.zeros(63), loaded) for loaded in ("old", "new", "old")))
+        self.assertEqual(sorted(calls), [("new", 1), ("old", 2)])
+
+
+class RemoteInferenceTests(SimpleTestCase):
+    def setUp(self):
+        self.layer = InMemoryChannelLayer()
+
+    async def test_batches_round_trip_through_worker_pool(self):
+        workers = [InferenceWorker(self.layer) for _ in range(2)]
+        tasks = [asyncio.ensure_future(worker.run()) for worker in workers]
+        scheduler = RemoteInferenceScheduler(self.layer, max_batch_size=4, max_wait_ms=20)
+        features = extract_features(np.tile(SAMPLE_COORDS, (6, 1)).astype(float))
+        try:
+            results = await asyncio.gather(*(scheduler.predict(f) for f in features))
+        finally:
+            scheduler._task.cancel()
+            for task in tasks:
+                task.cancel()
+
+        expected = model_loader.get_model().predict(features, verbose=0)
+        for (row, label_encoder), want in zip(results, expected):
+            np.testing.assert_allclose(row, want, rtol=1e-5)
+            self.assertIn(label_encoder.inverse_transform([np.argmax(row)])[0], POSES)
+        self.assertGreaterEqual(sum(worker.batches for worker in workers), 2)
+
+    async def test_missing_worker_times_out(self):
+        scheduler = RemoteInferenceScheduler(self.layer, timeout=0.05, max_wait_ms=1)
+        try:
+            with self.assertRaises(RemoteInferenceError):
+                await scheduler.predict(np.zeros(FEATURE_DIM))
+        finally:
+            scheduler._task.cancel()
+
+    async def test_consumer_in_remote_mode(self):
+        worker = asyncio.ensure_future(InferenceWorker(self.layer).run())
+        scheduler = RemoteInferenceScheduler(self.layer, max_wait_ms=1)
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        with mock.patch("motiontrack.consumers.INFERENCE_MODE", "remote"), \
+                mock.patch("motiontrack.consumers.get_remote_scheduler", return_value=scheduler), \
+                mock.patch("motiontrack.consumers.get_loaded", side_effect=AssertionError("모델 로드 금지")):
+            await communicator.connect()
+            await communicator.receive_json_from()
+            await communicator.send_to(text_data=json.dumps({"coords": SAMPLE_COORDS}))
+            response = await communicator.receive_json_from(timeout=5)
+            await communicator.disconnect()
+        scheduler._task.cancel()
+        worker.cancel()
+        self.assertIn(response["pose"], POSES)
+
+
+class AsyncPoseConsumerTests(SimpleTestCase):
+    async def test_frame_round_trip(self):
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        hello = await communicator.receive_json_from()
+        self.assertIn(hello["target"], POSES)
+        self.assertEqual(hello["max_fps"], 20)
+
+        await communicator.send_to(text_data=json.dumps({"coords": SAMPLE_COORDS}))
+        response = await communicator.receive_json_from(timeout=30)
+        self.assertIn(response["pose"], POSES)
+        self.assertEqual(response["target"], hello["target"])
+        await communicator.disconnect()
+
+    async def test_binary_frame_round_trip(self):
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        await communicator.connect()
+        hello = await communicator.receive_json_from()
+        self.assertEqual(hello["binary"], 1)
+
+        await communicator.send_to(bytes_data=encode_binary_frame(SAMPLE_COORDS, seq=42))
+        response = await communicator.receive_json_from(timeout=30)
+        self.assertIn(response["pose"], POSES)
+        self.assertEqual(response["seq"], 42)
+        await communicator.disconnect()
+
+    async def test_reconnect_resumes_state(self):
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        await communicator.connect()
+        hello = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        communicator = WebsocketCommunicator(
+            AsyncPoseConsumer.as_asgi(), f"/ws/pose_data/?session={hello['session']}"
+        )
+        await communicator.connect()
+        resumed = await communicator.receive_json_from()
+        self.assertEqual(resumed["message"], "Game resumed!")
+        self.assertEqual(resumed["target"], hello["target"])
+        self.assertEqual(resumed["session"], hello["session"])
+        await communicator.disconnect()
+
+    async def test_frames_arriving_during_inference_are_coalesced(self):
+        class SlowScheduler:
+            async def predict(self, features, loaded=None):
+                await asyncio.sleep(0.05)
+                return np.array([0.1, 0.2, 0.6, 0.1])
+
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        with mock.patch("motiontrack.consumers.get_scheduler", return_value=SlowScheduler()), \
+                mock.patch.object(FrameRateGovernor, "admit", return_value=True):
+            await communicator.connect()
+            await communicator.receive_json_from()
+            for _ in range(5):
+                await communicator.send_to(text_data=json.dumps({"coords": SAMPLE_COORDS}))
+
+            responses = [await communicator.receive_json_from(timeout=1)]
+            while not await communicator.receive_nothing(timeout=0.2):
+                responses.append(await communicator.receive_json_from())
+        await communicator.disconnect()
+
+        poses = [r for r in responses if "pose" in r]
+        self.assertEqual(len(poses), 2)
+        self.assertEqual(poses[-1]["pose"], "tree")
+
+    async def test_invalid_frame_returns_error(self):
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_to(text_data=json.dumps({"coords": [0.0] * 10}))
+        response = await communicator.receive_json_from()
+        self.assertIn("error", response)
+        await communicator.disconnect()
+
+
+class FakeRedis:
+    """redis.Redis 대신 쓰는 프로세스 내 가짜 노드 (PipelinedShardClient가 쓰는 명령만, 왕복 수를 셈)"""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def set(self, key, value, nx=False, px=None, xx=False):
+        self.data[str(key)] = value
+        return True
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.data.get(str(key))
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(str(key)) for key in keys]
+
+    def delete(self, *keys):
+        self.round_trips += 1
+        return sum(self.data.pop(str(key), None) is not None for key in keys)
+
+    def scan_iter(self, match=None, count=None):
+        self.round_trips += 1
+        return [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self, transaction=True):
+        node = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            def set(self, *args, **kwargs):
+                self.commands.append((args, kwargs))
+
+            def execute(self):
+                node.round_trips += 1
+                return [node.set(*args, **kwargs) for args, kwargs in self.commands]
+
+        return Pipeline()
+
+
+class RedisShardTests(SimpleTestCase):
+    HOSTS = [f"redis://127.0.0.1:{7001 + i}/0" for i in range(3)]
+
+    def make_cache(self):
+        cache = RedisCache(self.HOSTS, {"OPTIONS": {"CLIENT_CLASS": "motiontrack.redis_shards.PipelinedShardClient"}})
+        cache.client._serverdict = {name: FakeRedis() for name in self.HOSTS}
+        return cache, cache.client._serverdict
+
+    def test_many_key_commands_take_one_round_trip_per_node(self):
+        cache, nodes = self.make_cache()
+        states = {f"pose_state:{i:032x}": {"target_pose": POSES[i % 4], "frame_count": i} for i in range(300)}
+        cache.set_many(states, timeout=300)
+
+        self.assertEqual([node.round_trips for node in nodes.values()], [1, 1, 1])
+        self.assertTrue(all(70 <= len(node.data) <= 130 for node in nodes.values()))
+        self.assertEqual(cache.get_many(list(states) + ["pose_state:missing"]), states)
+        self.assertEqual(sorted(cache.iter_keys("pose_state:*")), sorted(states))
+        self.assertEqual(cache.delete_many(list(states)[:10]), 10)
+        self.assertEqual([node.round_trips for node in nodes.values()], [4, 4, 4])
+        key = list(states)[42]
+        self.assertEqual(cache.get(key), states[key])
+
+    def test_get_routes_by_key_without_deprecation_warning(self):
+        cache, nodes = self.make_cache()
+        cache.set("pose_state:abc", {"frame_count": 3}, timeout=300)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertEqual(cache.get("pose_state:abc"), {"frame_count": 3})
+            self.assertIsNone(cache.get("pose_state:missing"))
+        self.assertEqual(sum(node.round_trips for node in nodes.values()), 2)
+
+    def test_adding_a_node_moves_only_its_share_of_keys(self):
+        keys = [f"pose_state:{i:032x}" for i in range(3000)]
+        ring = HashRing(self.HOSTS)
+        before = {key: ring.get_node(key) for key in keys}
+        ring.add_node("redis://127.0.0.1:7004/0")
+        moved = [key for key in keys if ring.get_node(key) != before[key]]
+        self.assertTrue(all(ring.get_node(key) == "redis://127.0.0.1:7004/0" for key in moved))
+        self.assertAlmostEqual(len(moved) / len(keys), 1 / 4, delta=0.05)
+
+        ring.remove_node("redis://127.0.0.1:7004/0")
+        self.assertEqual({key: ring.get_node(key) for key in keys}, before)
+
+
+class LivenessTests(SimpleTestCase):
+    async def test_reaper_pings_quiet_connections_then_closes_idle_ones(self):
+        reaper = ConnectionReaper(interval=10, idle_timeout=30, refresh_interval=15)
+        consumer = mock.AsyncMock(state_key="pose_state:a", buffer_key="pose_state:a:pose_buffer")
+        store = mock.AsyncMock()
+        reaper.register(consumer)
+        start = reaper.connections[consumer][0]
+
+        with mock.patch("motiontrack.liveness.get_state_store", return_value=store):
+            self.assertEqual(await reaper.sweep(start + 5), (0, 0))
+            self.assertEqual(await reaper.sweep(start + 10), (1, 0))
+            self.assertEqual(await reaper.sweep(start + 20), (0, 0))  # 응답이 없어도 ping은 한 번만
+            self.assertEqual(store.atouch.await_args_list, [mock.call("pose_state:a"),
+                                                            mock.call("pose_state:a:pose_buffer")])
+            self.assertEqual(await reaper.sweep(start + 30), (0, 1))
+        consumer.send.assert_awaited_once_with('{"control": "ping"}')
+        consumer.close.assert_awaited_once_with(code=IDLE_CLOSE_CODE)
+        consumer.disconnect.assert_awaited_once_with(IDLE_CLOSE_CODE)
+        self.assertEqual(reaper.connections, {})
+        reaper._task.cancel()
+
+    async def test_idle_socket_is_closed_but_pong_keeps_it_open(self):
+        reaper = ConnectionReaper(interval=0.05, idle_timeout=0.3)
+        with mock.patch("motiontrack.consumers.get_reaper", return_value=reaper):
+            communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+            await communicator.connect()
+            await communicator.receive_json_from()
+            for _ in range(3):
+                self.assertEqual(await communicator.receive_json_from(timeout=1), {"control": "ping"})
+                await communicator.send_json_to({"control": "pong"})
+            self.assertEqual(len(reaper.connections), 1)
+
+            # 더 이상 응답하지 않는 클라이언트 (반쯤 열린 소켓)
+            while (message := await communicator.receive_output(timeout=1))["type"] == "websocket.send":
+                pass
+            self.assertEqual(message, {"type": "websocket.close", "code": IDLE_CLOSE_CODE})
+            await communicator.disconnect()
+        self.assertEqual(reaper.connections, {})
+
+    def test_orphaned_state_keys(self):
+        live = "pose_state:" + "a" * 32
+        keys = [live, live + ":pose_buffer", "pose_state:" + "b" * 32, "pose_state:" + "c" * 32 + ":pose_buffer",
+                "specific.1a2b!3c4d"]
+        ttls = {keys[0]: 120, keys[1]: 300, keys[2]: None, keys[3]: 60, keys[4]: None}
+        self.assertEqual(find_orphans(keys, ttls), {
+            "no_ttl": [keys[2]], "buffer_without_state": [keys[3]], "legacy": [keys[4]],
+        })
+
+
+class AdmissionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_over_cap_waits_in_queue_until_a_player_leaves(self):
+        with admission_limits(max_per_worker=1, poll_interval=0.05):
+            first = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+            await first.connect()
+            self.assertIn("target", await first.receive_json_from())
+
+            second = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+            await second.connect()
+            self.assertEqual(await second.receive_json_from(), {"control": "queue", "position": 1, "waiting": 1})
+            # 대기 중에 보낸 프레임은 처리하지 않습니다.
+            await second.send_to(text_data=json.dumps({"coords": SAMPLE_COORDS}))
+            self.assertTrue(await second.receive_nothing(timeout=0.2))
+
+            await first.disconnect()
+            hello = await second.receive_json_from(timeout=1)
+            self.assertEqual(hello["message"], "Game started!")
+            await second.disconnect()
+
+    async def test_cluster_slots_are_shared_between_workers(self):
+        worker_a = AdmissionController(max_sessions=1, poll_interval=0.05)
+        worker_b = AdmissionController(max_sessions=1, poll_interval=0.05, max_waiting=1)
+        players = [mock.AsyncMock(session_id=f"s{i}") for i in range(3)]
+
+        self.assertTrue(await worker_a.enter(players[0]))
+        self.assertTrue(await worker_b.enter(players[1]))
+        self.assertFalse(await worker_b.enter(players[2]))  # 대기실도 꽉 참
+        players[0].start_session.assert_awaited_once()
+        self.assertEqual(list(worker_b.waiting), [players[1]])
+        self.assertEqual(cache.get(SLOT_KEY.format(0)), "s0")
+
+        # 다른 워커에서 난 자리는 주기 작업에서 확인합니다.
+        await worker_a.leave(players[0])
+        await worker_b.tick()
+        await asyncio.sleep(0)
+        players[1].start_session.assert_awaited_once()
+        self.assertEqual(cache.get(SLOT_KEY.format(0)), "s1")
+        await worker_b.leave(players[1])
+        self.assertIsNone(cache.get(SLOT_KEY.format(0)))
+
+    async def test_lost_lease_is_not_released_by_its_old_owner(self):
+        worker_a = AdmissionController(max_sessions=1, lease_ttl=30)
+        worker_b = AdmissionController(max_sessions=1, lease_ttl=30)
+        old, new = mock.AsyncMock(session_id="s0"), mock.AsyncMock(session_id="s1")
+        self.assertTrue(await worker_a.enter(old))
+
+        # s0의 자리 키가 만료된 사이 다른 워커의 s1이 차지했습니다.
+        await cache.adelete(SLOT_KEY.format(0))
+        self.assertTrue(await worker_b.enter(new))
+        await worker_a.tick(now=time.monotonic() + 30)
+        self.assertIsNone(worker_a.admitted[old])
+        self.assertEqual(cache.get(SLOT_KEY.format(0)), "s1")
+
+        await worker_a.leave(old)
+        self.assertEqual(cache.get(SLOT_KEY.format(0)), "s1")
+        await worker_b.leave(new)
+        self.assertIsNone(cache.get(SLOT_KEY.format(0)))
+
+
+@unittest.skipUnless(importlib.util.find_spec("tensorflow"), "tensorflow가 설치되어 있지 않습니다.")
+class PredictionCacheTests(SimpleTestCase):
+    def test_reuses_prediction_only_for_small_recent_changes(self):
+        cache_ = PredictionCache(tolerance=0.02, max_age=0.5)
+        base = np.zeros((1, 13, 3))
+        self.assertIsNone(cache_.lookup(base, 0.0))
+        cache_.store(base, "prediction", 0.0)
+
+        self.assertEqual(cache_.lookup(base + 0.01, 0.1), "prediction")
+        self.assertIsNone(cache_.lookup(base + 0.05, 0.1))
+        self.assertIsNone(cache_.lookup(base, 0.5))
+        self.assertIsNone(PredictionCache(tolerance=0).lookup(base, 0.0))
+
+    async def test_static_frames_skip_inference(self):
+        calls = []
+
+        class CountingScheduler:
+            async def predict(self, features, loaded=None):
+                calls.append(features)
+                return np.array([0.1, 0.2, 0.6, 0.1])
+
+        hits = metrics.PREDICTION_CACHE_HITS.value
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        with mock.patch("motiontrack.consumers.get_scheduler", return_value=CountingScheduler()), \
+                mock.patch.object(FrameRateGovernor, "admit", return_value=True):
+            await communicator.connect()
+            await communicator.receive_json_from()
+            coords = np.array(SAMPLE_COORDS)
+            for delta in (0.0, 0.001, -0.001, 0.2):
+                await communicator.send_to(text_data=json.dumps({"coords": (coords + delta * (coords > 0.6)).tolist()}))
+                response = await communicator.receive_json_from(timeout=1)
+                self.assertEqual(response["pose"], "tree")
+        await communicator.disconnect()
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(metrics.PREDICTION_CACHE_HITS.value - hits, 2)
+        self.assertIn("pose_prediction_cache_hit_ratio", metrics.REGISTRY.render())
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram(buckets=(0.001, 0.01))
+        for value in (0.0005, 0.002, 0.003, 5.0):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [("0.001", 1), ("0.01", 3), ("+Inf", 4)])
+        self.assertEqual(histogram.count, 4)
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        frames = registry.counter("frames_total", "frames")
+        stages = registry.histogram("stage_seconds", "stage time", label="stage", buckets=(0.1,))
+        frames.inc(3)
+        stages.labels("decode").observe(0.05)
+
+        text = registry.render()
+        self.assertIn("# TYPE frames_total counter\nframes_total 3\n", text)
+        self.assertIn('stage_seconds_bucket{stage="decode",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="decode",le="+Inf"} 1', text)
+        self.assertIn('stage_seconds_count{stage="decode"} 1', text)
+
+    async def test_timed_stage_records_sync_and_async(self):
+        registry = MetricsRegistry()
+        stages = registry.histogram("stage_seconds", "stage time", label="stage")
+
+        def parse():
+            return 1
+
+        async def infer():
+            return 2
+
+        self.assertEqual(timed_stage("decode", stages)(parse)(), 1)
+        self.assertEqual(await timed_stage("inference", stages)(infer)(), 2)
+        self.assertEqual(stages.labels("decode").count, 1)
+        self.assertEqual(stages.labels("inference").count, 1)
+
+    def test_disabled_registry_leaves_functions_untouched(self):
+        registry = MetricsRegistry(enabled=False)
+        stages = registry.histogram("stage_seconds", "stage time", label="stage")
+        counter = registry.counter("frames_total", "frames")
+
+        def parse():
+            return 1
+
+        counter.inc()
+        self.assertIs(timed_stage("decode", stages)(parse), parse)
+        self.assertEqual(registry.render(), "\n")
+
+    async def test_consumer_updates_counters_and_stages(self):
+        received = metrics.FRAMES_RECEIVED.value
+        features = metrics.STAGE_SECONDS.labels("features").count
+
+        communicator = WebsocketCommunicator(AsyncPoseConsumer.as_asgi(), "/ws/pose_data/")
+        await communicator.connect()
+        await communicator.receive_json_from()
+        self.assertGreaterEqual(metrics.ACTIVE_CONNECTIONS.value, 1)
+        await communicator.send_to(text_data=json.dumps({"coords": SAMPLE_COORDS}))
+        await communicator.receive_json_from(timeout=30)
+        await communicator.disconnect()
+
+        self.assertEqual(metrics.FRAMES_RECEIVED.value, received + 1)
+        self.assertEqual(metrics.STAGE_SECONDS.labels("features").count, features + 1)
+
+    def test_metrics_endpoint(self):
+        response = self.client.get("/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"# TYPE pose_stage_seconds histogram", response.content)
+        self.assertIn(b"pose_active_connections", response.content)
+
+
+class StaticAssetsTests(SimpleTestCase):
+    def test_minify_strips_comments_but_keeps_literals_and_asi(self):
+        source = (
+            "// 주석\n"
+            "const url = \"http://a/b\";  /* 블록 주석 */\n"
+            "const label = `${ids.map(i => `#${i}`).join(\" \")} // 그대로`;\n"
+            "let re = /a\\/b[/]/g, n = a\n"
+            "++b\n"
+            "function f(x) {\n"
+            "    return x\n"
+            "}\n"
+        )
+        self.assertEqual(minify_js(source), (
+            "const url=\"http://a/b\";const label=`${ids.map(i => `#${i}`).join(\" \")} // 그대로`;"
+            "let re=/a\\/b[/]/g,n=a\n"
+            "++b\n"
+            "function f(x){return x}\n"
+        ))
+
+    def test_bundle_orders_modules_and_hoists_url_imports(self):
+        files = {
+            "js/app/main.js": 'import { add as plus } from "./math.js";\nimport Lib from "https://cdn.example/lib.js";\n'
+                              'console.log(plus(1, 2), Lib);\n',
+            "js/app/math.js": 'import { ONE } from "./constants.js";\nexport function add(a, b) { return a + b + ONE - 1; }\n',
+            "js/app/constants.js": "export const ONE = 1;\n",
+        }
+        bundle = bundle_modules("js/app/main.js", files.__getitem__)
+        self.assertTrue(bundle.startswith('import Lib from "https://cdn.example/lib.js";\n'))
+        self.assertNotIn("export ", bundle)
+        self.assertLess(bundle.index("__pm_js_app_constants_js = "), bundle.index("__pm_js_app_math_js = "))
+        self.assertIn("const { add: plus } = __pm_js_app_math_js;", bundle)
+
+        files["js/app/constants.js"] = "export default 1;\n"
+        with self.assertRaises(ValueError):
+            bundle_modules("js/app/main.js", files.__getitem__)
+
+    @unittest.skipUnless(shutil.which("node"), "node가 없습니다.")
+    def test_posemodule_bundle_is_valid_javascript(self):
+        static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
+
+        def read(name):
+            with open(os.path.join(static_dir, name), encoding="utf-8") as f:
+                return f.read()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pose.bundle.mjs")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(minify_js(bundle_modules("js/posemodule/main.js", read)))
+            completed = subprocess.run(["node", "--check", path], capture_output=True, text=True)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    def test_collectstatic_serves_hashed_precompressed_bundle(self):
+        # collectstatic 전에는 원본 ES 모듈
+        self.assertIn('src="/static/js/posemodule/main.js"', self.client.get("/pose/").content.decode())
+
+        with tempfile.TemporaryDirectory() as static_root, override_settings(STATIC_ROOT=static_root):
+            call_command("collectstatic", interactive=False, verbosity=0, ignore_patterns=["admin"])
+            # whitenoise는 미들웨어를 만들 때 STATIC_ROOT를 읽으므로 새 클라이언트로 요청합니다.
+            client = Client()
+            html = client.get("/pose/").content.decode()
+            script = re.search(r'<script type="module" src="(/static/js/pose\.bundle\.[0-9a-f]{12}\.js)"', html)[1]
+            self.assertIn(f'<link rel="modulepreload" href="{script}">', html)
+            for extension in ("", ".gz", ".br"):
+                self.assertTrue(os.path.exists(os.path.join(static_root, script[len("/static/"):] + extension)))
+
+            response = client.get(script, HTTP_ACCEPT_ENCODING="gzip, br")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertIn("immutable", response["Cache-Control"])
+
+    def test_client_timing_validates_label(self):
+        post = lambda data: self.client.post("/client_timing/", json.dumps(data), content_type="text/plain")
+        with mock.patch.object(metrics, "TIME_TO_FIRST_FRAME", metrics.LabeledHistogram("t", "", "assets")) as histogram:
+            self.assertEqual(post({"ttff_ms": 1800, "assets": "bundle"}).status_code, 204)
+            self.assertEqual(post({"ttff_ms": 1800, "assets": "other"}).status_code, 400)
+            self.assertEqual(post({"ttff_ms": "NaN", "assets": "bundle"}).status_code, 400)
+        self.assertEqual(histogram.labels("bundle").count, 1)
+        self.assertEqual(list(histogram.children), ["bundle"])
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = Session.objects.create(session_id="s1", start_time=timezone.now())
+
+    def add_score(self, total_time, days_ago=0):
+        score = Score.objects.create(session=self.session, total_time=total_time)
+        if days_ago:
+            score.created_at = timezone.now() - timedelta(days=days_ago)
+            Score.objects.filter(pk=score.pk).update(created_at=score.created_at)
+        return score
+
+    def test_steady_state_costs_no_queries(self):
+        for total_time in (30.0, 20.0, 40.0):
+            self.add_score(total_time)
+        leaderboard.get_top("all")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/get_scores/")
+            self.client.get("/score/")
+        self.assertEqual([s["score"] for s in response.json()["scores"]], [20.0, 30.0, 40.0])
+        self.assertEqual(response.json()["scores"][0]["session_id"], "s1")
+
+    def test_record_keeps_top_k_incrementally(self):
+        with mock.patch.object(leaderboard, "LEADERBOARD_SIZE", 3):
+            for total_time in (30.0, 20.0, 40.0):
+                self.add_score(total_time)
+            self.assertEqual(len(leaderboard.get_top("all")), 3)
+
+            leaderboard.record(self.add_score(10.0))
+            leaderboard.record(self.add_score(50.0))
+            with self.assertNumQueries(0):
+                top = leaderboard.get_top("all")
+        self.assertEqual([s["total_time"] for s in top], [10.0, 20.0, 30.0])
+
+    def test_record_skips_score_already_in_rebuilt_cache(self):
+        score = self.add_score(30.0)
+        leaderboard.get_top("all")
+
+        leaderboard.record(score)
+        self.assertEqual([s["id"] for s in leaderboard.get_top("all")], [score.pk])
+
+    def test_submit_score_updates_cached_leaderboard(self):
+        self.add_score(30.0)
+        leaderboard.get_top("all")
+        leaderboard.get_top("today")
+
+        with mock.patch.object(ingest, "SCORE_INGEST_MODE", "sync"):
+            response = self.client.post("/submit_score/", json.dumps({"score": 12.5}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(leaderboard.get_top("all")[0]["total_time"], 12.5)
+            self.assertEqual(leaderboard.get_top("today")[0]["total_time"], 12.5)
+
+    async def test_async_views_use_async_orm_on_cache_miss(self):
+        client = AsyncClient()
+        with mock.patch.object(ingest, "SCORE_INGEST_MODE", "sync"):
+            response = await client.post("/submit_score/", {"score": 15.0, "success_count": 2},
+                                         content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        await cache.aclear()
+
+        response = await client.get("/get_scores/?period=today")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual([s["score"] for s in json.loads(response.content)["scores"]], [15.0])
+        self.assertEqual((await leaderboard.aget_top("today"))[0]["total_time"], 15.0)
+
+    def test_period_filters(self):
+        self.add_score(10.0, days_ago=30)
+        self.add_score(20.0)
+
+        self.assertEqual([s["total_time"] for s in leaderboard.get_top("all")], [10.0, 20.0])
+        self.assertEqual([s["total_time"] for s in leaderboard.get_top("today")], [20.0])
+        self.assertEqual(self.client.get("/get_scores/?period=month").status_code, 400)
+
+    def test_deleting_score_invalidates_cache(self):
+        score = self.add_score(10.0)
+        self.add_score(20.0)
+        leaderboard.get_top("all")
+
+        score.delete()
+        self.assertEqual([s["total_time"] for s in leaderboard.get_top("all")], [20.0])
+
+
+def score_record(session_id="s1", total_time=20.0):
+    return {
+        "session_id": session_id, "ip_address": "127.0.0.1", "user_agent": "test",
+        "total_time": total_time, "set1_time": None, "set2_time": None,
+        "success_count": 2, "average_hold_time": None, "created_at": timezone.now().isoformat(),
+    }
+
+
+class ScoreIngestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spool_dir = tmp.name
+
+    def spool_lines(self):
+        lines = []
+        for path in glob.glob(os.path.join(self.spool_dir, "*.jsonl")):
+            with open(path) as f:
+                lines.extend(f.read().splitlines())
+        return lines
+
+    def test_buffered_submit_answers_before_writing(self):
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        with mock.patch.object(ingest, "SCORE_INGEST_MODE", "buffered"), \
+                mock.patch.object(ingest, "_ingestor", ingestor):
+            response = self.client.post("/submit_score/", json.dumps({"score": 15, "success_count": 2}),
+                                        content_type="application/json")
+
+        self.assertEqual(response.json()["status"], "success")
+        self.assertEqual(Score.objects.count(), 0)
+        self.assertEqual(len(self.spool_lines()), 1)
+
+        self.assertEqual(ingestor.flush(), 1)
+        score = Score.objects.select_related("session").get()
+        self.assertEqual(score.total_time, 15.0)
+        self.assertEqual(score.session.session_id, self.client.session.session_key)
+        self.assertEqual(self.spool_lines(), [])
+
+    def test_write_batch_upserts_sessions_in_bulk(self):
+        Session.objects.create(session_id="existing", start_time=timezone.now())
+        records = [score_record("existing", 30.0), score_record("new", 10.0), score_record("new", 20.0)]
+
+        # 세션 조회, 새 세션 생성과 재조회, 점수 bulk_create (+ 트랜잭션 savepoint)
+        with self.assertNumQueries(6):
+            write_batch(records)
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertEqual(Score.objects.filter(session__session_id="new").count(), 2)
+
+    def test_write_batch_updates_cached_leaderboard_without_returned_pks(self):
+        leaderboard.get_top("all")
+        records = [score_record("a", 12.0), score_record("a", 11.0), score_record("b", 13.0)]
+
+        # MySQL처럼 bulk_create가 pk를 채우지 않아도 캐시를 지우지 않고 점수를 끼워 넣습니다.
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):
+            scores = write_batch(records)
+
+        self.assertTrue(all(score.pk is not None for score in scores))
+        cached = cache.get(leaderboard.cache_key("all"))
+        self.assertEqual([entry["id"] for entry in cached],
+                         list(Score.objects.order_by("total_time").values_list("id", flat=True)))
+        self.assertEqual([entry["total_time"] for entry in cached], [11.0, 12.0, 13.0])
+
+    def test_unflushed_spool_is_recovered_after_crash(self):
+        crashed = ScoreIngestor(self.spool_dir, autostart=False)
+        crashed.submit(score_record("a", 10.0))
+        crashed.submit(score_record("b", 11.0))
+        crashed._segment.file.close()  # 프로세스 종료로 잠금이 풀린 상태
+
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        self.assertEqual(ingestor.pending(), 2)
+        self.assertEqual(ingestor.flush(), 2)
+        self.assertEqual(Score.objects.count(), 2)
+        self.assertEqual(self.spool_lines(), [])
+
+    def test_live_spool_is_not_adopted(self):
+        owner = ScoreIngestor(self.spool_dir, autostart=False)
+        owner.submit(score_record())
+
+        self.assertEqual(ScoreIngestor(self.spool_dir, autostart=False).pending(), 0)
+        self.assertEqual(owner.flush(), 1)
+
+    def test_rejected_record_does_not_block_later_records(self):
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        bad = dict(score_record("a", 12.0), success_count=10 ** 20)
+        ingestor.submit(bad)
+        ingestor.submit(score_record("b", 13.0))
+
+        self.assertEqual(ingestor.flush(), 1)
+        self.assertEqual(ingestor.pending(), 0)
+        self.assertEqual(list(Score.objects.values_list("total_time", flat=True)), [13.0])
+        self.assertEqual(self.spool_lines(), [])
+        with open(os.path.join(self.spool_dir, ingest.DEAD_LETTER_DIR, "scores.jsonl")) as f:
+            self.assertEqual([json.loads(line)["record"] for line in f], [bad])
+
+    def test_unavailable_db_keeps_records_for_next_flush(self):
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        ingestor.submit(score_record("a", 12.0))
+        ingestor.submit(score_record("b", 13.0))
+
+        with mock.patch.object(ingest, "write_batch", side_effect=OperationalError("server has gone away")):
+            with self.assertRaises(OperationalError):
+                ingestor.flush()
+        self.assertEqual(ingestor.pending(), 2)
+        self.assertEqual(len(self.spool_lines()), 2)
+        self.assertEqual(ingestor.flush(), 2)
+        self.assertEqual(self.spool_lines(), [])
+
+    def test_drained_worker_flushes_state_and_scores(self):
+        cache.clear()
+        store = HybridStateStore(flush_interval=60)
+        store.release("pose_state:a", {"target_pose": "tree"}, ttl=30)
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        ingestor.submit(score_record("a", 12.0))
+
+        # fork 워커는 os._exit로 끝나 atexit가 실행되지 않으므로 drain이 직접 저장해야 합니다.
+        with mock.patch.object(state, "_state_store", store), mock.patch.object(ingest, "_ingestor", ingestor):
+            flush_write_behind()
+
+        self.assertEqual(cache.get("pose_state:a"), {"target_pose": "tree"})
+        self.assertEqual(Score.objects.count(), 1)
+        self.assertEqual(self.spool_lines(), [])
+
+    def test_cache_failure_after_commit_does_not_write_scores_again(self):
+        leaderboard.get_top("all")
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        for total_time in (12.0, 13.0, 14.0):
+            ingestor.submit(score_record("a", total_time))
+
+        with mock.patch.object(leaderboard, "record_many", side_effect=ConnectionError("redis down")):
+            for _ in range(3):
+                ingestor.flush()
+
+        self.assertEqual(Score.objects.count(), 3)
+        self.assertEqual(ingestor.pending(), 0)
+        self.assertEqual(self.spool_lines(), [])
+        self.assertIsNone(cache.get(leaderboard.cache_key("all")))
+
+    def test_writer_thread_drops_unusable_db_connection(self):
+        ingestor = ScoreIngestor(self.spool_dir, autostart=False)
+        ingestor.submit(score_record("a", 12.0))
+        connection.ensure_connection()
+
+        # 서버가 끊은 연결: 쿼리가 실패해 errors_occurred가 켜지고 ping(is_usable)도 실패합니다.
+        def lost_connection(records):
+            connection.errors_occurred = True
+            raise OperationalError("server has gone away")
+
+        with mock.patch.object(ingest, "write_batch", side_effect=lost_connection), \
+                mock.patch.object(connection, "get_autocommit", return_value=True), \
+                mock.patch.object(connection, "is_usable", return_value=False), \
+                mock.patch.object(connection, "close") as close, \
+                mock.patch.object(connection, "close_at", None), \
+                mock.patch.object(connection, "errors_occurred", False):
+            ingestor._flush_in_thread()
+
+        # 쓸 수 있던 flush 전 연결은 그대로 두고, 끊긴 연결만 닫아 다음 flush가 새로 연결하게 합니다.
+        close.assert_called_once()
+        self.assertEqual(ingestor.pending(), 1)
+
+    def test_rejects_invalid_score(self):
+        for body in ({"score": "fast"}, {"score": "nan"}, {"score": 10, "success_count": "two"},
+                     {"score": 10, "set1_time": "inf"}, {"score": 10, "average_hold_time": "nan"},
+                     {"score": 10, "success_count": 10 ** 20}, {"score": 10, "success_count": -1},
+                     {"score": 10, "success_count": 1e400}):
+            response = self.client.post("/submit_score/", json.dumps(body), content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+
+
+class StubExtractor:
+    """MediaPipe 대신 이미지 바이트로부터 결정적인 랜드마크를 만드는 추출기 ("none"으로 시작하면 감지 실패)"""
+
+    def __init__(self, shift=0.0):
+        self.shift = shift
+
+    def extract(self, image_bytes):
+        if image_bytes.startswith(b"none"):
+            return None
+        offset = sum(image_bytes) % 97 / 1000 + self.shift
+        return np.array(SAMPLE_COORDS).reshape(13, 3) + offset
+
+    def close(self):
+        pass
+
+
+class DatasetBuilderTests(SimpleTestCase):
+    EXTRACTOR = "motiontrack.tests:StubExtractor"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.data_dir = os.path.join(self.root, "train")
+        self.output = os.path.join(self.root, "filtered_data.csv")
+        for name, content in [("tree/a.jpg", b"tree-a"), ("tree/b.png", b"tree-b"),
+                              ("chair/c.jpg", b"chair-c"), ("chair/d.jpg", b"none"), ("chair/notes.txt", b"x")]:
+            self.write_image(name, content)
+
+    def write_image(self, name, content):
+        path = os.path.join(self.data_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def build(self, workers=0, **options):
+        return build_dataset(self.data_dir, self.output, os.path.join(self.root, "training_data"),
+                             extractor=self.EXTRACTOR,
+                             extractor_options=options, cache_dir=os.path.join(self.root, "cache"),
+                             workers=workers, log=lambda message: None)
+
+    def read_output(self):
+        with open(self.output) as f:
+            return f.read()
+
+    def test_builds_features_with_serving_extractor(self):
+        stats = self.build()
+
+        self.assertEqual(stats, {"images": 4, "rows": 3, "cached": 0, "extracted": 4, "undetected": 1})
+        lines = self.read_output().splitlines()
+        self.assertEqual(lines[0].split(","), FEATURE_NAMES + ["label"])
+        row = lines[1].split(",")
+        self.assertEqual(row[-1], "chair")
+        expected = extract_features(StubExtractor().extract(b"chair-c"))[0]
+        np.testing.assert_allclose(np.array(row[:-1], dtype=float), expected)
+
+    def test_rerun_only_extracts_new_or_changed_images(self):
+        self.build()
+        self.assertEqual(self.build()["extracted"], 0)
+
+        self.write_image("tree/e.jpg", b"tree-e")
+        self.write_image("tree/a.jpg", b"tree-a-edited")
+        stats = self.build()
+        self.assertEqual((stats["cached"], stats["extracted"]), (3, 2))
+        # 추출기 설정이 바뀌면 캐시를 공유하지 않습니다.
+        self.assertEqual(self.build(shift=0.01)["extracted"], 5)
+
+    def test_columnar_training_data_round_trip(self):
+        self.build()
+        features, labels, manifest = load_training_data(os.path.join(self.root, "training_data"))
+
+        self.assertIsInstance(features, np.memmap)
+        self.assertEqual(features.dtype, np.float32)
+        self.assertEqual(features.shape, (3, FEATURE_DIM))
+        self.assertEqual(labels.tolist(), ["chair", "tree", "tree"])
+        self.assertEqual(manifest["feature_names"], FEATURE_NAMES)
+        csv_rows = np.loadtxt(self.output, delimiter=",", skiprows=1, usecols=range(FEATURE_DIM))
+        np.testing.assert_allclose(features, csv_rows, rtol=1e-6)
+
+    def test_rejects_training_data_with_other_schema(self):
+        self.build()
+        manifest_path = os.path.join(self.root, "training_data", MANIFEST_FILE)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["torso_size_multiplier"] = 2.0
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        with self.assertRaisesRegex(ValueError, "torso_size_multiplier"):
+            load_training_data(os.path.join(self.root, "training_data"))
+
+    def test_process_pool_matches_single_process(self):
+        self.build(workers=0)
+        single = self.read_output()
+        os.remove(self.output)
+        shutil.rmtree(os.path.join(self.root, "cache"))
+
+        stats = self.build(workers=2)
+        self.assertEqual(stats["extracted"], 4)
+        self.assertEqual(self.read_output(), single)
+
+
+class ModelLoaderTests(SimpleTestCase):
+    def test_import_does_not_load_model(self):
+        code = ("import sys, django; django.setup(); import motiontrack.routing, motiontrack.urls; "
+                "from dnn import model_loader; "
+                "print(model_loader._loaded is None, 'tensorflow' in sys.modules, 'sklearn' in sys.modules)")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                                check=True).stdout.split()
+        self.assertEqual(output, ["True", "False", "False"])
+
+    def test_concurrent_first_access_loads_once(self):
+        calls = []
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.05)
+            return model_loader.LoadedModel("model", "encoder")
+
+        with mock.patch.object(model_loader, "_loaded", None), \
+                mock.patch.object(model_loader, "load_model_files", slow_load):
+            threads = [threading.Thread(target=model_loader.get_model) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(model_loader.get_model(), "model")
+        self.assertEqual(len(calls), 1)
+
+    def test_ready_endpoint_waits_for_warm_up(self):
+        with mock.patch.object(model_loader, "_ready", threading.Event()):
+            self.assertEqual(self.client.get("/ready/").status_code, 503)
+            model_loader.warm_up()
+            response = self.client.get("/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["ready"])
+
+    def test_label_classes_match_label_encoder(self):
+        with open(model_loader.LABEL_ENCODER_PATH, "rb") as f:
+            encoder = pickle.load(f)
+        classes = model_loader.load_label_encoder()
+        self.assertIsInstance(classes, model_loader.LabelClasses)
+        self.assertEqual(classes.inverse_transform([0, 2, 3]).tolist(), encoder.inverse_transform([0, 2, 3]).tolist())
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.registry = ModelRegistry(self.root)
+        self.files = {name: os.path.join(model_loader.MODEL_DIR, name) for name in (WEIGHTS_FILE, LABEL_CLASSES_FILE)}
+
+    def test_promote_and_rollback(self):
+        for version in ("v1", "v2"):
+            self.registry.register(version, self.files)
+            self.registry.activate(version)
+        self.assertEqual(self.registry.versions(), ["v1", "v2"])
+        self.assertEqual(self.registry.active_version(), "v2")
+
+        self.assertEqual(self.registry.rollback(), "v1")
+        self.assertEqual(self.registry.active_version(), "v1")
+        with self.assertRaises(RegistryError):
+            self.registry.rollback()
+
+    def test_corrupt_or_incompatible_version_is_rejected(self):
+        self.registry.register("v1", self.files)
+        with open(os.path.join(self.registry.version_dir("v1"), WEIGHTS_FILE), "ab") as f:
+            f.write(b"\0")
+        with self.assertRaises(RegistryError):
+            self.registry.activate("v1")
+
+        self.registry.register("v2", self.files)
+        manifest_path = os.path.join(self.registry.version_dir("v2"), "manifest.json")
+        manifest = self.registry.manifest("v2")
+        manifest["feature_schema"]["landmark_indices"] = [0]
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+        with self.assertRaises(RegistryError):
+            self.registry.activate("v2")
+        self.assertIsNone(self.registry.active_version())
+
+    def test_reload_swaps_model_while_in_flight_frames_keep_old_one(self):
+        for version in ("v1", "v2"):
+            self.registry.register(version, self.files)
+        self.registry.activate("v1")
+        with mock.patch.object(model_loader, "REGISTRY_DIR", self.root), \
+                mock.patch.object(model_loader, "_loaded", None), \
+                mock.patch.object(model_loader, "_failed_version", None):
+            in_flight = model_loader.get_loaded()
+            self.assertEqual(in_flight.version, "v1")
+            self.assertFalse(model_loader.reload_if_changed())
+
+            self.registry.activate("v2")
+            self.assertTrue(model_loader.reload_if_changed())
+            self.assertEqual(model_loader.get_loaded().version, "v2")
+            self.assertEqual(in_flight.model.predict(np.zeros((1, FEATURE_DIM))).shape, (1, len(POSES)))
+
+            # 활성화 이후 파일이 손상된 버전은 로드하지 않고 기존 모델을 유지합니다.
+            self.registry.register("v3", self.files)
+            self.registry.activate("v3")
+            os.remove(os.path.join(self.registry.version_dir("v3"), WEIGHTS_FILE))
+            with self.assertLogs("dnn.model_loader", "ERROR"):
+                self.assertFalse(model_loader.reload_if_changed())
+            self.assertEqual(model_loader.get_loaded().version, "v2")
+
+    def test_management_command(self):
+        with mock.patch.object(model_loader, "REGISTRY_DIR", self.root):
+            call_command("pose_model", "register", "v1", "--promote", stdout=io.StringIO())
+            call_command("pose_model", "register", "v2", "--promote", stdout=io.StringIO())
+            call_command("pose_model", "rollback", stdout=io.StringIO())
+        self.assertEqual(self.registry.active_version(), "v1")
+        self.assertIn("label_encoder.pkl", self.registry.manifest("v1")["files"])
+
+
+class NumpyPoseModelParityTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from tensorflow.keras.models import load_model
+
+        cls.keras_model = load_model(model_loader.MODEL_PATH, compile=False)
+        cls.frames = np.concatenate([sample_frames(), sample_frames(noise=0.15, seed=1)])
+
+    def test_exported_weights_match_keras(self):
+        numpy_model = NumpyPoseModel.load(model_loader.WEIGHTS_PATH)
+        expected = self.keras_model.predict(self.frames, verbose=0)
+        np.testing.assert_allclose(numpy_model.predict(self.frames), expected, atol=1e-5)
+
+    def test_export_round_trip(self):
+        from dnn.export_weights import fold_model
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "weights.npz")
+            fold_model(self.keras_model).save(path)
+            numpy_model = NumpyPoseModel.load(path)
+
+        self.assertEqual(len(numpy_model.kernels), 4)
+        self.assertEqual(numpy_model.input_dim, 63)
+        expected = self.keras_model.predict(self.frames[:1], verbose=0)
+        np.testing.assert_allclose(numpy_model.predict(self.frames[0]), expected, atol=1e-5)
+
+
+class BenchmarkHarnessTests(SimpleTestCase):
+    async def test_short_run_reports_latency_and_stages(self):
+        samples = {}
+        original_infer, original_send = AsyncPoseConsumer.infer, AsyncPoseConsumer.send
+        with stage_timing(AsyncPoseConsumer, samples):
+            result = await run_benchmark(
+                lambda: InProcessConnection(AsyncPoseConsumer.as_asgi()), players=3, fps=10, duration=0.5,
+            )
+
+        self.assertGreater(result["frames_sent"], 0)
+        self.assertEqual(result["frames_answered"] + result["dropped_frames"], result["frames_sent"])
+        self.assertGreater(result["latency_ms"]["count"], 0)
+        self.assertGreater(len(samples["inference"]), 0)
+        # 측정이 끝나면 원래 메서드로 복구
+        self.assertIs(AsyncPoseConsumer.infer, original_infer)
+        self.assertIs(AsyncPoseConsumer.send, original_send)
@@ -10,6 +10,9 @@ urlpatterns = [
     path('submit_score/', views.submit_score, name='submit_score'),
     path('score/', views.score, name='score'),
     path('get_scores/', views.get_scores, name='get_scores'),
+    path('client_timing/', views.client_timing, name='client_timing'),  # 첫 프레임까지 시간 (브라우저 측정)
+    path('metrics/', views.metrics, name='metrics'),  # Prometheus 수집용
+    path('ready/', views.ready, name='ready'),        # 로드밸런서 readiness probe
 ]
 
 if settings.DEBUG:
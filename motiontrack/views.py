@@ -1,60 +1,46 @@
 # views.py
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
-from django.utils import timezone
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from .models import Score, Session
+from dnn import model_loader
+from . import leaderboard, metrics as pose_metrics
+from .ingest import abuild_record, aingest
+from .inference import INFERENCE_MODE
+from .static_assets import entry_script
 import json
 
 
+async def ajson_response(data, status=200):
+    """JsonResponse와 같지만 인코딩은 이벤트 루프 밖(스레드)에서 합니다. (크기가 요청마다 다른 응답용)"""
+    body = await sync_to_async(json.dumps, thread_sensitive=False)(data, cls=DjangoJSONEncoder)
+    return HttpResponse(body, status=status, content_type="application/json")
+
+
 def home(request):
     return render(request, 'home.html')
 
 
 def pose(request):
-    return render(request, 'pose.html')
+    # collectstatic으로 번들을 만들었으면 해시 이름의 번들 하나를, 아니면 원본 ES 모듈(main.js)을 불러옵니다.
+    return render(request, 'pose.html', {'pose_script': entry_script('js/posemodule/main.js')})
 
 
+# submit_score, score, get_scores는 async 뷰입니다. ASGI에서 동기 뷰처럼 스레드 풀을 차지하지 않고,
+# DB·캐시는 async ORM/캐시 API로, 블로킹 파일 쓰기와 JSON 인코딩은 스레드에서 처리합니다.
 @csrf_exempt
-def submit_score(request):
+async def submit_score(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            total_time = float(data.get("score"))
+            # 추가 정보(set1_time, set2_time, success_count, average_hold_time)도 함께 검증
+            record = await abuild_record(request, data)
         except (TypeError, ValueError, json.JSONDecodeError):
             return JsonResponse({"error": "Invalid score value"}, status=400)
 
-        # 추가 정보가 필요한 경우 아래에서 처리 가능 (set1_time, set2_time, 등)
-        set1_time = data.get("set1_time")
-        set2_time = data.get("set2_time")
-        success_count = int(data.get("success_count", 0))
-        average_hold_time = data.get("average_hold_time")
-
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
-
-        ip = request.META.get('REMOTE_ADDR')
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-
-        session_obj, created = Session.objects.get_or_create(
-            session_id=session_key,
-            defaults={
-                'start_time': timezone.now(),
-                'ip_address': ip,
-                'user_agent': user_agent,
-            }
-        )
-
-        Score.objects.create(
-            session=session_obj,
-            total_time=total_time,
-            set1_time=set1_time if set1_time else None,
-            set2_time=set2_time if set2_time else None,
-            success_count=success_count,
-            average_hold_time=average_hold_time if average_hold_time else None
-        )
+        # POSE_SCORE_INGEST="buffered"이면 스풀에만 쓰고 바로 응답 (DB 저장은 ingest.py가 모아서 처리)
+        await aingest(record)
 
         # POST 요청에 대한 JSON 응답으로 score 페이지 URL 반환
         return JsonResponse({"status": "success", "redirect_url": "/score/"})
@@ -62,20 +48,63 @@ def submit_score(request):
         return JsonResponse({"error": "Invalid request method"}, status=400)
 
 
-def score(request):
-    # DB에서 총 걸린 시간(total_time)이 낮은 순으로 상위 10개 점수를 조회하여 score.html로 전달
-    scores = Score.objects.all().order_by('total_time')[:10]
-    return render(request, 'score.html', {'scores': scores})
-
-
-def get_scores(request):
-    # Ajax를 위한 JSON 응답 (필요 시)
-    scores = Score.objects.all().order_by('total_time')[:10]
+async def score(request):
+    # 총 걸린 시간(total_time)이 낮은 순으로 상위 10개 점수를 캐시된 리더보드에서 가져와 score.html로 전달
+    period = request.GET.get('period', leaderboard.DEFAULT_PERIOD)
+    if period not in leaderboard.PERIODS:
+        period = leaderboard.DEFAULT_PERIOD
+    scores = await leaderboard.aget_top(period)
+    return render(request, 'score.html', {
+        'scores': scores,
+        'period': period,
+        'periods': leaderboard.PERIODS,
+    })
+
+
+async def get_scores(request):
+    # Ajax를 위한 JSON 응답 (?period=today|week|all)
+    period = request.GET.get('period', leaderboard.DEFAULT_PERIOD)
+    if period not in leaderboard.PERIODS:
+        return JsonResponse({"error": "Invalid period"}, status=400)
     score_list = []
-    for s in scores:
+    for s in await leaderboard.aget_top(period):
         score_list.append({
-            "score": s.total_time,
-            "created_at": s.created_at.isoformat(),
-            "session_id": s.session.session_id,
+            "score": s["total_time"],
+            "created_at": s["created_at"].isoformat(),
+            "session_id": s["session_id"],
         })
-    return JsonResponse({"scores": score_list})
+    return await ajson_response({"scores": score_list, "period": period})
+
+
+@csrf_exempt
+def client_timing(request):
+    # pose 페이지가 navigator.sendBeacon으로 한 번 보내는 첫 프레임까지의 시간 (static/js/posemodule/timing.js)
+    if request.method != 'POST':
+        return JsonResponse({"error": "Invalid request method"}, status=400)
+    try:
+        data = json.loads(request.body)
+        seconds = float(data["ttff_ms"]) / 1000
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({"error": "Invalid timing"}, status=400)
+    # 레이블 값이 늘어나지 않도록 정해진 값만 받습니다.
+    if data.get("assets") not in ("bundle", "modules") or not 0 <= seconds < 600:
+        return JsonResponse({"error": "Invalid timing"}, status=400)
+    pose_metrics.TIME_TO_FIRST_FRAME.labels(data["assets"]).observe(seconds)
+    return HttpResponse(status=204)
+
+
+def metrics(request):
+    # PoseConsumer 계측값 (Prometheus 텍스트 형식, 워커 프로세스별 값)
+    if not pose_metrics.REGISTRY.enabled:
+        raise Http404("metrics disabled")
+    return HttpResponse(pose_metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def ready(request):
+    # 모델 워밍업이 끝난 워커만 트래픽을 받도록 readiness probe에 응답 (준비 전에는 503)
+    # "remote" 모드의 WebSocket 워커는 모델을 로드하지 않으므로 바로 준비 완료
+    if INFERENCE_MODE == "remote":
+        return JsonResponse({"ready": True, "inference": "remote"})
+    if not model_loader.is_ready():
+        return JsonResponse({"ready": False}, status=503)
+    return JsonResponse({"ready": True, "warmup_s": round(model_loader.warmup_seconds, 3)})
@@ -3,15 +3,26 @@ import { initPoseWebSocket } from "./socket.js";
 import { testSupport, onResults } from "./posehandler.js";
 import { setupUIControls, getFollowMode } from "./uicontrols.js";
 import { runSuccessEffect } from "./effect.js";  // 효과 모듈 임포트
+import { reportFirstFrame } from "./timing.js";
 
 // 게임 시작 시 시작 시간 및 세트 카운트 초기화
 let gameStartTime = Date.now();
 let setCount = 0;
+let waiting = false;
 
 const { socket, sendPose } = initPoseWebSocket(data => {
   if (data.error) return console.error(data.error);
   const scene = document.querySelector("a-scene");
 
+  // 대기실: 게임이 시작될 때까지 목표 자리에 대기 순번을 표시하고, 기다린 시간은 기록에서 뺍니다.
+  if (data.control === "queue") {
+    waiting = true;
+    data = { target: `WAIT #${data.position}` };
+  } else if (waiting && data.target) {
+    waiting = false;
+    gameStartTime = Date.now();
+  }
+
   // TARGET TEXT (상단 고정 위치)
   let targetEl = document.getElementById("targetText");
   if (!targetEl) {
@@ -117,6 +128,7 @@ window.addEventListener('load', () => {
   });
 
   pose.onResults(results => {
+    reportFirstFrame();
     const followMode = getFollowMode();
     onResults(results, canvasCtx, canvasElement, fpsControl, grid, followMode);
 
@@ -149,3 +149,53 @@ export function numericalJacobian(f, x, dt, epsilon = 1e-5) {
   }
   return J;
 }
+
+// 서버 특징 추출기(dnn/features.py)와 같은 63차원 특징: 정규화 좌표 (39) + 2D 각도 (12) + 3D 각도 (12)
+// 계산 방식이 바뀌면 dnn/features.py의 FEATURE_SCHEMA_VERSION과 함께 올립니다.
+export const FEATURE_SCHEMA_VERSION = 1;
+const TORSO_SIZE_MULTIPLIER = 2.5;
+// (중심 관절, 이웃 i, 이웃 j) — dnn/features.py의 CONNECTIONS 조합 순서와 동일
+const ANGLE_TRIPLETS = [
+  [1, 0, 3], [1, 0, 7], [1, 3, 7],
+  [2, 0, 4], [2, 0, 8], [2, 4, 8],
+  [3, 1, 5], [4, 2, 6], [7, 1, 9], [8, 2, 10], [9, 7, 11], [10, 8, 12]
+];
+
+function jointAngle(points, [c, i, j], dims) {
+  let n1 = 0, n2 = 0;
+  const v1 = [], v2 = [];
+  for (let d = 0; d < dims; d++) {
+    v1[d] = points[i * 3 + d] - points[c * 3 + d];
+    v2[d] = points[j * 3 + d] - points[c * 3 + d];
+    n1 += v1[d] * v1[d];
+    n2 += v2[d] * v2[d];
+  }
+  n1 = Math.sqrt(n1) + 1e-8;
+  n2 = Math.sqrt(n2) + 1e-8;
+  let cosine = 0;
+  for (let d = 0; d < dims; d++) cosine += (v1[d] / n1) * (v2[d] / n2);
+  return Math.acos(Math.min(1, Math.max(-1, cosine)));
+}
+
+// coords: 13개 관절의 [x, y, z, ...] (39개) → 63개 특징
+export function computeFeatures(coords) {
+  const cx = (coords[7 * 3] + coords[8 * 3]) / 2;
+  const cy = (coords[7 * 3 + 1] + coords[8 * 3 + 1]) / 2;
+  const sx = (coords[1 * 3] + coords[2 * 3]) / 2;
+  const sy = (coords[1 * 3 + 1] + coords[2 * 3 + 1]) / 2;
+  let maxDistance = Math.hypot(sx - cx, sy - cy) * TORSO_SIZE_MULTIPLIER;
+  for (let k = 0; k < 13; k++) {
+    maxDistance = Math.max(maxDistance, Math.hypot(coords[k * 3] - cx, coords[k * 3 + 1] - cy));
+  }
+  const normalized = [];
+  for (let k = 0; k < 13; k++) {
+    normalized.push(
+      (coords[k * 3] - cx) / maxDistance,
+      (coords[k * 3 + 1] - cy) / maxDistance,
+      coords[k * 3 + 2] / maxDistance
+    );
+  }
+  return normalized
+    .concat(ANGLE_TRIPLETS.map(t => jointAngle(normalized, t, 2)))
+    .concat(ANGLE_TRIPLETS.map(t => jointAngle(normalized, t, 3)));
+}
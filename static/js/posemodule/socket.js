@@ -1,27 +1,107 @@
 // socket.js
+import { FEATURE_SCHEMA_VERSION, computeFeatures } from "./mathutils.js";
+
+const SESSION_STORAGE_KEY = "poseSession";
+const RECONNECT_DELAY_MS = 1000;
+// 서버 워커가 종료(drain)되며 닫은 연결 (serve_asgi의 DRAIN_CLOSE_CODE). 정상 종료지만 다른 워커로 재연결합니다.
+const DRAIN_CLOSE_CODE = 4001;
+
+// 바이너리 프레임 (motiontrack/protocol.py와 동일한 레이아웃, 리틀 엔디언)
+// [u8 version][u8 encoding][u16 reserved][u32 seq][f64 timestamp ms][float32 × 39]
+// 특징 모드: encoding=2, reserved=특징 스키마 버전, payload는 float32 × 39 좌표 + float32 × 63 특징
+const BINARY_VERSION = 1;
+const ENCODING_FLOAT32 = 0;
+const ENCODING_FLOAT32_FEATURES = 2;
+const HEADER_SIZE = 16;
+const COORDS_PER_FRAME = 39;
+
+function encodeBinaryFrame(coords, seq, features = null) {
+  const values = features ? coords.concat(features) : coords;
+  const buffer = new ArrayBuffer(HEADER_SIZE + values.length * 4);
+  const view = new DataView(buffer);
+  view.setUint8(0, BINARY_VERSION);
+  view.setUint8(1, features ? ENCODING_FLOAT32_FEATURES : ENCODING_FLOAT32);
+  view.setUint16(2, features ? FEATURE_SCHEMA_VERSION : 0, true);
+  view.setUint32(4, seq, true);
+  view.setFloat64(8, Date.now(), true);
+  for (let i = 0; i < values.length; i++) {
+    view.setFloat32(HEADER_SIZE + i * 4, values[i], true);
+  }
+  return buffer;
+}
+
 export function initPoseWebSocket(onData) {
   const protocol = window.location.protocol === "https:" ? "wss://" : "ws://";
-  const socketUrl = `${protocol}${window.location.host}/ws/pose_data/`;
-  const socket = new WebSocket(socketUrl);
+  const baseUrl = `${protocol}${window.location.host}/ws/pose_data/`;
+  let socket = null;
+  // 서버가 알려주는 허용 전송률. 이보다 빠른 프레임은 보내지 않습니다.
+  let maxFps = 20;
+  let lastSentAt = 0;
+  // 서버가 시작 메시지에서 같은 버전의 바이너리 프레임을 알려줄 때만 사용하고, 아니면 JSON으로 보냅니다.
+  let useBinary = false;
+  // 서버가 같은 스키마 버전의 클라이언트 특징을 받는다고 알려주면 63차원 특징을 직접 계산해 함께 보냅니다.
+  let useFeatures = false;
+  // 서버 대기실에서 자리를 기다리는 동안에는 프레임을 보내지 않습니다.
+  let queued = false;
+  let seq = 0;
+
+  // 서버가 발급한 세션 토큰으로 재연결하면 서버 워커가 재시작되어도 게임 상태가 복구됩니다.
+  function connect() {
+    const session = sessionStorage.getItem(SESSION_STORAGE_KEY);
+    socket = new WebSocket(session ? `${baseUrl}?session=${session}` : baseUrl);
+    useBinary = false;
+    useFeatures = false;
+    queued = false;
 
-  socket.onopen = () => console.log("WebSocket connected!");
-  socket.onerror = err => console.error("WebSocket Error:", err);
-  socket.onclose = () => console.log("WebSocket closed.");
+    socket.onopen = () => console.log("WebSocket connected!");
+    socket.onerror = err => console.error("WebSocket Error:", err);
+    socket.onclose = event => {
+      console.log("WebSocket closed.");
+      if (!event.wasClean || event.code === DRAIN_CLOSE_CODE) setTimeout(connect, RECONNECT_DELAY_MS);
+    };
 
-  socket.onmessage = event => {
-    const data = JSON.parse(event.data);
-    console.log("🛰 Received from server:", data.pose);
-    onData?.(data);
-  };
+    socket.onmessage = event => {
+      const data = JSON.parse(event.data);
+      if (data.session) sessionStorage.setItem(SESSION_STORAGE_KEY, data.session);
+      if (data.max_fps) maxFps = data.max_fps;
+      if ("binary" in data) useBinary = data.binary === BINARY_VERSION;
+      // 서버 검사에서 특징이 다르다고 판단되면 "features": null이 오고, 이후에는 좌표만 보냅니다.
+      if ("features" in data) useFeatures = data.features === FEATURE_SCHEMA_VERSION;
+      // 서버 heartbeat에는 바로 응답합니다. (POSE_IDLE_TIMEOUT 동안 아무것도 보내지 않으면 서버가 연결을 닫음)
+      if (data.control === "ping") {
+        socket.send(JSON.stringify({ control: "pong" }));
+        return;
+      }
+      // 전송률 제어 메시지는 게임 화면으로 넘기지 않습니다.
+      if (data.control === "rate") return;
+      // 대기실 순번 ({"control": "queue", "position": n})은 게임 화면에 넘겨 표시하고, 게임 시작 메시지가 오면 전송을 시작합니다.
+      queued = data.control === "queue" || (queued && !data.target);
+      console.log("🛰 Received from server:", data.pose);
+      onData?.(data);
+    };
+  }
 
   function sendPose(data) {
-    const payload = JSON.stringify(data);
-    if (socket.readyState === WebSocket.OPEN) {
-      socket.send(payload);
+    // 연결 중에는 프레임을 쌓지 않고, 연결된 뒤에는 maxFps 간격으로만 전송합니다.
+    if (socket.readyState !== WebSocket.OPEN || queued) return;
+    const now = performance.now();
+    if (now - lastSentAt < 1000 / maxFps) return;
+    lastSentAt = now;
+    seq = (seq + 1) >>> 0;
+    const valid = data.coords?.length === COORDS_PER_FRAME;
+    const features = useFeatures && valid ? computeFeatures(data.coords) : null;
+    if (useBinary && valid) {
+      socket.send(encodeBinaryFrame(data.coords, seq, features));
+    } else if (features) {
+      socket.send(JSON.stringify({ ...data, features, schema: FEATURE_SCHEMA_VERSION, seq }));
     } else {
-      socket.addEventListener("open", () => socket.send(payload), { once: true });
+      socket.send(JSON.stringify({ ...data, seq }));
     }
   }
 
-  return { socket, sendPose };
+  // 새 페이지(새 게임)에서는 이전 세션을 이어받지 않습니다.
+  sessionStorage.removeItem(SESSION_STORAGE_KEY);
+  connect();
+
+  return { get socket() { return socket; }, sendPose };
 }
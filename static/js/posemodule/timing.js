@@ -0,0 +1,14 @@
+// 첫 프레임까지 걸린 시간 측정
+// 페이지 로드 시작(navigation start)부터 첫 카메라 프레임의 포즈 결과까지의 시간을 서버(/client_timing/)에 한 번 보냅니다.
+// collectstatic으로 만든 번들로 실행 중인지, 원본 ES 모듈로 실행 중인지도 함께 보내 두 경우를 비교할 수 있게 합니다.
+const ASSETS = import.meta.url.includes(".bundle.") ? "bundle" : "modules";
+let reported = false;
+
+export function reportFirstFrame() {
+  if (reported) return;
+  reported = true;
+  const body = JSON.stringify({ ttff_ms: Math.round(performance.now()), assets: ASSETS });
+  if (!navigator.sendBeacon?.("/client_timing/", body)) {
+    fetch("/client_timing/", { method: "POST", body, keepalive: true }).catch(() => {});
+  }
+}